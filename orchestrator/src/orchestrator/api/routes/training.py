@@ -1,23 +1,30 @@
-import base64
 import uuid
 
 from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import FileResponse
 from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from orchestrator.db.engine import get_session
 from orchestrator.db.repositories import ModelRepository, TrainingJobRepository
 from orchestrator.schemas.training import CreateTrainingJobRequest, TrainingJobResponse
+from orchestrator.services.model_store import ModelStore, RedisModelStore
 
 router = APIRouter(prefix="/api/v1/training", tags=["training"])
 
-# Redis instance will be set by the app lifespan
+# Redis instances will be set by the app lifespan
 _redis: Redis | None = None
+_model_store: ModelStore | None = None
 
 
-def set_redis(redis: Redis) -> None:
-    global _redis
+def set_redis(
+    redis: Redis, blob_redis: Redis | None = None, model_store: ModelStore | None = None,
+) -> None:
+    global _redis, _model_store
     _redis = redis
+    if model_store is None:
+        model_store = RedisModelStore(blob_redis if blob_redis is not None else redis)
+    _model_store = model_store
 
 
 def _get_repo(session: AsyncSession = Depends(get_session)) -> TrainingJobRepository:
@@ -142,24 +149,28 @@ async def download_model(
     job_id: uuid.UUID,
     session: AsyncSession = Depends(get_session),
 ):
-    if not _redis:
+    if not _model_store:
         raise HTTPException(status_code=503, detail="Redis not available")
 
     # Try to find model_id from the job
     job_repo = TrainingJobRepository(session)
     job = await job_repo.get(job_id)
     model_key_id = str(job.model_id) if job and job.model_id else str(job_id)
-
-    encoded = await _redis.get(f"model:{model_key_id}:global")
-    if not encoded:
-        # Fallback: try with job_id directly (backward compat)
-        encoded = await _redis.get(f"model:{job_id}:global")
-    if not encoded:
+    filename = f"model-{job_id}.bin"
+
+    for candidate in dict.fromkeys((model_key_id, str(job_id))):
+        # Versioned file store: let the server stream the file itself
+        path = await _model_store.local_path(candidate)
+        if path is not None:
+            return FileResponse(path, media_type="application/octet-stream", filename=filename)
+        model_bytes = await _model_store.get(candidate)
+        if model_bytes:
+            break
+    else:
         raise HTTPException(status_code=404, detail="Model not found")
 
-    model_bytes = base64.b64decode(encoded)
     return Response(
-        content=model_bytes,
+        content=bytes(model_bytes),
         media_type="application/octet-stream",
-        headers={"Content-Disposition": f"attachment; filename=model-{job_id}.bin"},
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
     )
@@ -27,9 +27,31 @@ class Settings(BaseSettings):
     # Heartbeat
     heartbeat_interval_seconds: int = 1
     heartbeat_timeout_multiplier: int = 5
+    # Write-behind flush period for heartbeat telemetry (keep below the heartbeat timeout)
+    device_state_flush_interval_seconds: float = 2.0
 
     # Training
     training_round_timeout_seconds: int = 180
+    # Device leases outlive the round timeout by this much, so a crashed
+    # coordinator's devices are freed shortly after its round would have ended
+    device_lease_grace_seconds: int = 60
+    # Largest gradient payload accepted by SubmitGradientsStream: this
+    # multiple of the model's size, and never more than the byte cap
+    max_gradient_upload_model_multiple: float = 2.0
+    max_gradient_upload_bytes: int = 64 * 1024 * 1024
+
+    # Offloading of CPU-bound work from the event loop: threads for numpy
+    # sections, processes for protobuf (0 runs it on the threads instead)
+    executor_threads: int = 4
+    executor_processes: int = 0
+    loop_lag_interval_seconds: float = 0.5
+
+    # Model storage: "file" (versioned blobs on disk) or "redis" (single blob per model)
+    model_store_backend: str = "file"
+    model_storage_dir: str = "models"
+    model_store_keep_last: int = 5
+    # In-process cache of model versions served by DownloadModel
+    model_cache_max_bytes: int = 256 * 1024 * 1024
 
     # Security - TLS
     tls_enabled: bool = False
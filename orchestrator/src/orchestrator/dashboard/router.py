@@ -53,6 +53,10 @@ def _get_redis():
     return _training_module._redis
 
 
+def _get_model_store():
+    return _training_module._model_store
+
+
 # --- Pages ---
 
 @router.get("", response_class=HTMLResponse)
@@ -237,6 +241,7 @@ async def clear_finished_jobs(request: Request, session: AsyncSession = Depends(
     repo = TrainingJobRepository(session)
     model_repo = ModelRepository(session)
     redis = _get_redis()
+    model_store = _get_model_store()
 
     all_jobs = await repo.list_all()
     terminal = ("completed", "stopped", "failed")
@@ -246,7 +251,8 @@ async def clear_finished_jobs(request: Request, session: AsyncSession = Depends(
             # Clean up Redis data
             if redis:
                 if job.model_id:
-                    await redis.delete(f"model:{job.model_id}:global")
+                    if model_store:
+                        await model_store.delete(str(job.model_id))
                     await redis.delete(f"model:{job.model_id}:meta")
                 await redis.delete(f"training:{job.id}:stop")
             if job.model_id:
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from orchestrator.db.models import Device, Model, TrainingJob
@@ -102,6 +102,21 @@ class DeviceRepository:
             device.last_seen_at = datetime.now(timezone.utc)
             await self.session.commit()
 
+    async def bulk_update_status(
+        self, device_ids: list[uuid.UUID], status: str,
+        from_statuses: tuple[str, ...] | None = None,
+    ) -> int:
+        """Set `status` on many devices in one UPDATE; returns the number of rows changed."""
+        if not device_ids:
+            return 0
+        stmt = update(Device).where(Device.id.in_(device_ids))
+        if from_statuses:
+            stmt = stmt.where(Device.status.in_(from_statuses))
+        stmt = stmt.values(status=status).execution_options(synchronize_session=False)
+        result = await self.session.execute(stmt)
+        await self.session.commit()
+        return result.rowcount
+
 
 class TrainingJobRepository:
     def __init__(self, session: AsyncSession) -> None:
@@ -5,6 +5,7 @@ import structlog
 
 from orchestrator.db.engine import async_session
 from orchestrator.services.device_manager import DeviceManager
+from orchestrator.services.heartbeat_monitor import HeartbeatMonitor
 
 logger = structlog.get_logger()
 
@@ -12,6 +13,9 @@ logger = structlog.get_logger()
 class DeviceRegistryServicer:
     """gRPC service for device registration and management."""
 
+    def __init__(self, heartbeat_monitor: HeartbeatMonitor | None = None) -> None:
+        self.monitor = heartbeat_monitor
+
     async def Register(self, request, context):
         from orchestrator.generated import common_pb2, device_pb2
 
@@ -53,6 +57,8 @@ class DeviceRegistryServicer:
                 battery_state=battery_state,
                 metrics=metrics,
             )
+            if self.monitor:
+                await self.monitor.touch(device.id)
 
             return device_pb2.RegisterResponse(
                 device_id=common_pb2.DeviceId(value=str(device.id)),
@@ -66,6 +72,8 @@ class DeviceRegistryServicer:
             manager = DeviceManager(session)
             device_id = uuid.UUID(request.device_id.value)
             deleted = await manager.unregister_device(device_id)
+            if self.monitor:
+                await self.monitor.forget(device_id)
             if not deleted:
                 context.set_code(grpc.StatusCode.NOT_FOUND)
                 context.set_details("Device not found")
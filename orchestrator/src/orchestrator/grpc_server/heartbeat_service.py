@@ -3,7 +3,6 @@ import uuid
 import structlog
 from redis.asyncio import Redis
 
-from orchestrator.db.engine import async_session
 from orchestrator.services.heartbeat_monitor import HeartbeatMonitor
 
 logger = structlog.get_logger()
@@ -44,13 +43,12 @@ class HeartbeatServiceServicer:
                     battery_state = battery_state_map.get(request.metrics.battery.state)
                     is_low_power_mode = request.metrics.battery.is_low_power_mode
 
-            async with async_session() as session:
-                await self.monitor.process_heartbeat(
-                    session, device_id, metrics,
-                    battery_level=battery_level,
-                    battery_state=battery_state,
-                    is_low_power_mode=is_low_power_mode,
-                )
+            await self.monitor.process_heartbeat(
+                device_id, metrics,
+                battery_level=battery_level,
+                battery_state=battery_state,
+                is_low_power_mode=is_low_power_mode,
+            )
 
             command = await self.monitor.get_pending_command(str(device_id))
 
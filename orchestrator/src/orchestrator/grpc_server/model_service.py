@@ -1,20 +1,51 @@
-import base64
 import json
+import uuid
 
 import grpc
 import structlog
 from redis.asyncio import Redis
 
-from orchestrator.observability.metrics import GRADIENT_SUBMISSIONS_TOTAL
+from orchestrator.config import settings
+from orchestrator.observability.metrics import (
+    GRADIENT_SUBMISSIONS_TOTAL,
+    LATE_GRADIENT_SUBMISSIONS_TOTAL,
+)
+from orchestrator.services.executors import run_proto
+from orchestrator.services.model_cache import CachedBlob, ModelBlobCache
+from orchestrator.services.model_delta import build_weight_payload
+from orchestrator.services.model_store import ModelStore, ModelVersion, RedisModelStore
+from orchestrator.services.redis_blobs import (
+    GRADIENT_ENCODING_WIRE,
+    append_gradient_upload,
+    commit_gradient_upload,
+    encode_gradient_entry,
+    gradient_entry_prefix,
+    gradient_upload_key,
+    is_round_closed,
+    push_gradient_entry,
+    record_late_device,
+)
 
 logger = structlog.get_logger()
 
 CHUNK_SIZE = 32 * 1024  # 32KB
+# Streamed gradient chunks are coalesced up to this size per APPEND
+UPLOAD_FLUSH_BYTES = 1024 * 1024
 
 
 class ModelServiceServicer:
-    def __init__(self, redis: Redis) -> None:
+    def __init__(
+        self, redis: Redis, blob_redis: Redis | None = None, model_store: ModelStore | None = None,
+    ) -> None:
         self.redis = redis
+        # Raw-bytes client (no decode_responses) for gradient entries
+        self.blob_redis = blob_redis if blob_redis is not None else redis
+        self.model_store = (
+            model_store if model_store is not None else RedisModelStore(self.blob_redis)
+        )
+        # Full models keyed (model_id, digest or Redis revision), weight payloads keyed
+        # (model_id, digest, client digest)
+        self._model_cache = ModelBlobCache(settings.model_cache_max_bytes)
 
     async def UploadModel(self, request_iterator, context):
         from orchestrator.generated import model_pb2
@@ -36,8 +67,8 @@ class ModelServiceServicer:
             return model_pb2.UploadModelResponse()
 
         model_bytes = b"".join(chunks)
-        encoded = base64.b64encode(model_bytes).decode()
-        await self.redis.set(f"model:{model_id}:global", encoded)
+        version = int(metadata.version) if metadata.version.isdigit() else 0
+        await self.model_store.put(model_id, model_bytes, version=version)
 
         meta_dict = {
             "model_id": metadata.model_id,
@@ -58,77 +89,271 @@ class ModelServiceServicer:
         from orchestrator.generated import model_pb2
 
         model_id = request.model_id
-        encoded = await self.redis.get(f"model:{model_id}:global")
-
-        if not encoded:
+        head = await self.model_store.head(model_id)
+        blob = await self._current_blob(model_id, head)
+        if blob is None:
             context.set_code(grpc.StatusCode.NOT_FOUND)
             context.set_details(f"Model {model_id} not found")
             return
 
-        model_bytes = base64.b64decode(encoded)
-        meta_raw = await self.redis.get(f"model:{model_id}:meta")
-        meta_dict = json.loads(meta_raw) if meta_raw else {}
+        # Clients that report the version they hold only get the weights
+        # (diffed against their version when it is still retained)
+        payload = blob
+        payload_format = model_pb2.MODEL_PAYLOAD_FORMAT_UNSPECIFIED
+        hyperparameters = {}
+        if request.current_version and head is not None:
+            try:
+                payload, is_diff = await self._weight_payload(
+                    model_id, head, request.current_version
+                )
+            except ValueError:
+                logger.warning("weight_payload_failed_sending_full_model", model_id=model_id)
+            else:
+                payload_format = (
+                    model_pb2.MODEL_PAYLOAD_FORMAT_WEIGHT_DIFF
+                    if is_diff else model_pb2.MODEL_PAYLOAD_FORMAT_WEIGHTS
+                )
+                if payload.meta.get("learning_rate") is not None:
+                    hyperparameters["learning_rate"] = repr(payload.meta["learning_rate"])
 
         # Send metadata first
         yield model_pb2.DownloadModelChunk(
             metadata=model_pb2.ModelMetadata(
                 model_id=model_id,
-                name=meta_dict.get("name", ""),
-                version=meta_dict.get("version", ""),
-                framework=meta_dict.get("framework", ""),
-                size_bytes=len(model_bytes),
+                name=blob.meta.get("name", ""),
+                version=blob.meta.get("version", ""),
+                framework=blob.meta.get("framework", ""),
+                size_bytes=payload.size,
+                hyperparameters=hyperparameters,
+                digest=head.digest if head else "",
+                payload_format=payload_format,
             )
         )
 
-        # Send data in chunks
-        for i in range(0, len(model_bytes), CHUNK_SIZE):
-            yield model_pb2.DownloadModelChunk(
-                chunk=model_bytes[i : i + CHUNK_SIZE]
-            )
+        # Send data in chunks, shared with every concurrent download
+        for chunk in payload.chunks:
+            yield model_pb2.DownloadModelChunk(chunk=chunk)
+
+        logger.debug(
+            "model_downloaded",
+            model_id=model_id,
+            device_id=request.device_id.value,
+            payload_format=payload_format,
+            size=payload.size,
+        )
+
+    async def _current_blob(self, model_id: str, head: ModelVersion | None) -> CachedBlob | None:
+        """The current model, chunked, shared by every download of the same content."""
+        revision = head.digest if head is not None else await self.model_store.revision(model_id)
+        if revision is None:
+            # Blob written outside the store (legacy key): nothing to cache it on
+            return await self._load_model_blob(model_id, None)
+        return await self._model_cache.get_or_load(
+            (model_id, revision), lambda: self._load_model_blob(model_id, head),
+        )
+
+    async def _load_model_blob(self, model_id: str, head: ModelVersion | None) -> CachedBlob | None:
+        model_bytes = await self.model_store.get(model_id, head.version if head else None)
+        if not model_bytes:
+            return None
+        meta_raw = await self.redis.get(f"model:{model_id}:meta")
+        meta = json.loads(meta_raw) if meta_raw else {}
+        if head is not None:
+            # The meta key is rewritten after the blob; trust the version record
+            meta["version"] = str(head.version)
+        return CachedBlob.from_bytes(model_bytes, CHUNK_SIZE, meta)
+
+    async def _weight_payload(
+        self, model_id: str, head: ModelVersion, client_digest: str,
+    ) -> tuple[CachedBlob, bool]:
+        """Encoded weights of `head` for a client holding `client_digest`."""
+        base = await self.model_store.find(model_id, client_digest)
+        blob = await self._model_cache.get_or_load(
+            (model_id, head.digest, base.digest if base else ""),
+            lambda: self._build_weight_payload(model_id, head, base),
+        )
+        return blob, base is not None
 
-        logger.debug("model_downloaded", model_id=model_id, device_id=request.device_id.value)
+    async def _build_weight_payload(
+        self, model_id: str, head: ModelVersion, base: ModelVersion | None,
+    ) -> CachedBlob:
+        model_bytes = await self.model_store.get(model_id, head.version)
+        base_bytes = await self.model_store.get(model_id, base.version) if base else None
+        if model_bytes is None or (base is not None and base_bytes is None):
+            raise ValueError("Model version no longer retained")
+        # Parsing + diffing a multi-MB spec holds the GIL: keep it off the event
+        # loop. The store hands out mmap views, which cannot be pickled to a worker
+        return await run_proto(
+            _encode_weight_payload,
+            bytes(model_bytes), bytes(base_bytes) if base_bytes is not None else None,
+        )
 
     async def SubmitGradients(self, request, context):
         from orchestrator.generated import model_pb2
 
         device_id = request.device_id.value
-        model_id = request.model_id
-        training_round = request.training_round
-
-        # Validate inputs
-        if not device_id or not model_id or not training_round:
+        error = _submission_error(
+            device_id, request.model_id, request.training_round,
+            request.num_samples, len(request.gradients),
+        )
+        if error:
             context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
-            context.set_details("Missing device_id, model_id, or training_round")
+            context.set_details(error)
             return model_pb2.SubmitGradientsResponse(accepted=False)
-
-        if not request.gradients:
-            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
-            context.set_details("Empty gradients payload")
+        if await self._reject_late(device_id, request.model_id, request.training_round, context):
             return model_pb2.SubmitGradientsResponse(accepted=False)
 
-        if request.num_samples <= 0:
-            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
-            context.set_details("num_samples must be > 0")
-            return model_pb2.SubmitGradientsResponse(accepted=False)
+        # Store the payload as sent (float16+lz4 stays compressed) behind a
+        # small JSON header; the aggregator decodes it
+        entry = encode_gradient_entry(
+            device_id, request.gradients, request.num_samples, dict(request.metrics),
+            encoding=GRADIENT_ENCODING_WIRE,
+        )
+        await self._push_gradients(
+            device_id, request.model_id, request.training_round, request.num_samples, entry,
+        )
+        return model_pb2.SubmitGradientsResponse(accepted=True)
 
-        # Validate gradient binary format (must have at least a layer count header)
-        if len(request.gradients) < 4:
+    async def SubmitGradientsStream(self, request_iterator, context):
+        from orchestrator.generated import model_pb2
+
+        def reject(details: str):
             context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
-            context.set_details("Gradient data too small to be valid")
+            context.set_details(details)
             return model_pb2.SubmitGradientsResponse(accepted=False)
 
-        # Decompress gradients (float16+lz4 → float32, or passthrough for legacy)
-        from orchestrator.services.gradient_codec import decompress_gradients
-        gradients_bytes = decompress_gradients(request.gradients)
-
-        # Store gradient entry as base64-encoded JSON
-        entry = json.dumps({
-            "device_id": device_id,
-            "gradients": base64.b64encode(gradients_bytes).decode(),
-            "num_samples": request.num_samples,
-            "metrics": dict(request.metrics),
-        })
-        await self.redis.rpush(f"gradients:{model_id}:{training_round}", entry)
+        header = None
+        upload_key: str | None = None
+        pending = bytearray()
+        received = 0
+        staged = 0
+        committed = False
+        try:
+            async for message in request_iterator:
+                if message.HasField("header"):
+                    if header is not None:
+                        return reject("Duplicate upload header")
+                    header = message.header
+                    error = _submission_error(
+                        header.device_id.value, header.model_id, header.training_round,
+                        header.num_samples, header.total_size,
+                    )
+                    if error:
+                        return reject(error)
+                    if await self._reject_late(
+                        header.device_id.value, header.model_id, header.training_round, context,
+                    ):
+                        return model_pb2.SubmitGradientsResponse(accepted=False)
+                    limit = await self._upload_limit(header.model_id)
+                    if header.total_size > limit:
+                        return reject(
+                            f"Gradient payload of {header.total_size} bytes exceeds the "
+                            f"{limit} byte limit"
+                        )
+                    # Chunks are staged in Redis as they arrive; only up to
+                    # UPLOAD_FLUSH_BYTES of the entry is ever held here
+                    upload_key = gradient_upload_key(
+                        f"gradients:{header.model_id}:{header.training_round}", uuid.uuid4().hex,
+                    )
+                    pending += gradient_entry_prefix(
+                        header.device_id.value, header.num_samples, dict(header.metrics),
+                        encoding=GRADIENT_ENCODING_WIRE,
+                    )
+                elif upload_key is None:
+                    return reject("Gradient chunk before upload header")
+                else:
+                    chunk = message.chunk
+                    received += len(chunk)
+                    if received > header.total_size:
+                        return reject("Gradient stream exceeds the declared total_size")
+                    pending += chunk
+                    if len(pending) >= UPLOAD_FLUSH_BYTES:
+                        staged = await append_gradient_upload(
+                            self.blob_redis, upload_key, pending, _upload_ttl(),
+                        )
+                        pending.clear()
+
+            if header is None:
+                return reject("Missing upload header")
+            if received != header.total_size:
+                return reject(
+                    f"Gradient stream ended after {received} of {header.total_size} bytes"
+                )
+            staged = await append_gradient_upload(
+                self.blob_redis, upload_key, pending, _upload_ttl()
+            )
+            pending.clear()
+            # The round may have closed while the payload was streaming in
+            if await self._reject_late(
+                header.device_id.value, header.model_id, header.training_round, context,
+            ):
+                return model_pb2.SubmitGradientsResponse(accepted=False)
+
+            gradients_key = f"gradients:{header.model_id}:{header.training_round}"
+            committed = await commit_gradient_upload(
+                self.blob_redis, gradients_key, upload_key, header.device_id.value,
+            )
+            if not committed:
+                context.set_code(grpc.StatusCode.ABORTED)
+                context.set_details("Gradient upload expired before it completed")
+                return model_pb2.SubmitGradientsResponse(accepted=False)
+            self._count_gradients(
+                header.device_id.value, header.model_id, header.training_round,
+                header.num_samples, staged,
+            )
+            return model_pb2.SubmitGradientsResponse(accepted=True)
+        finally:
+            if upload_key is not None and not committed:
+                await self.blob_redis.delete(upload_key)
+
+    async def _upload_limit(self, model_id: str) -> int:
+        """Largest accepted gradient payload: a multiple of the model size, within the cap."""
+        limit = settings.max_gradient_upload_bytes
+        head = await self.model_store.head(model_id)
+        size = head.size_bytes if head is not None else None
+        if size is None:
+            meta_raw = await self.redis.get(f"model:{model_id}:meta")
+            if meta_raw:
+                size = json.loads(meta_raw).get("size_bytes")
+        if size:
+            limit = min(limit, int(settings.max_gradient_upload_model_multiple * size))
+        return limit
+
+    async def _reject_late(
+        self, device_id: str, model_id: str, training_round: str, context,
+    ) -> bool:
+        """Reject a submission for a round the coordinator already closed."""
+        if not await is_round_closed(self.redis, model_id, training_round):
+            return False
+        LATE_GRADIENT_SUBMISSIONS_TOTAL.inc()
+        # The straggler is done training: the coordinator may release it now
+        await record_late_device(
+            self.redis, model_id, device_id,
+            settings.training_round_timeout_seconds + settings.device_lease_grace_seconds,
+        )
+        logger.info(
+            "late_gradients_discarded",
+            device_id=device_id,
+            model_id=model_id,
+            round=training_round,
+        )
+        context.set_code(grpc.StatusCode.FAILED_PRECONDITION)
+        context.set_details(f"Training round {training_round} is closed")
+        return True
+
+    async def _push_gradients(
+        self, device_id: str, model_id: str, training_round: str, num_samples: int,
+        entry: bytes | bytearray,
+    ) -> None:
+        await push_gradient_entry(
+            self.blob_redis, f"gradients:{model_id}:{training_round}", entry, device_id,
+        )
+        self._count_gradients(device_id, model_id, training_round, num_samples, len(entry))
+
+    @staticmethod
+    def _count_gradients(
+        device_id: str, model_id: str, training_round: str, num_samples: int, size: int,
+    ) -> None:
         GRADIENT_SUBMISSIONS_TOTAL.inc()
 
         logger.info(
@@ -136,7 +361,32 @@ class ModelServiceServicer:
             device_id=device_id,
             model_id=model_id,
             round=training_round,
-            num_samples=request.num_samples,
+            num_samples=num_samples,
+            size=size,
         )
 
-        return model_pb2.SubmitGradientsResponse(accepted=True)
+
+def _upload_ttl() -> int:
+    """Staged uploads outlive any round they could still be accepted for."""
+    return settings.training_round_timeout_seconds + settings.device_lease_grace_seconds
+
+
+def _submission_error(
+    device_id: str, model_id: str, training_round: str, num_samples: int, size: int,
+) -> str | None:
+    """Why a gradient submission is invalid, or None."""
+    if not device_id or not model_id or not training_round:
+        return "Missing device_id, model_id, or training_round"
+    if size == 0:
+        return "Empty gradients payload"
+    if num_samples <= 0:
+        return "num_samples must be > 0"
+    # Must have at least a layer count header
+    if size < 4:
+        return "Gradient data too small to be valid"
+    return None
+
+
+def _encode_weight_payload(model: bytes, base_model: bytes | None) -> CachedBlob:
+    payload, learning_rate = build_weight_payload(model, base_model)
+    return CachedBlob.from_bytes(payload, CHUNK_SIZE, {"learning_rate": learning_rate})
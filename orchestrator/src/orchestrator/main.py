@@ -42,8 +42,14 @@ async def main() -> None:
         model_pb2_grpc,
     )
 
-    # Redis
+    # Redis: text client for flags/metadata, separate raw-bytes pool for model
+    # blobs and gradient entries (no base64 round-trips)
     redis = Redis.from_url(settings.redis_url, decode_responses=True)
+    blob_redis = Redis.from_url(settings.redis_url)
+
+    from orchestrator.services.model_store import create_model_store
+
+    model_store = create_model_store(redis, blob_redis)
 
     # Services
     from orchestrator.services.heartbeat_monitor import HeartbeatMonitor
@@ -56,14 +62,14 @@ async def main() -> None:
     from orchestrator.grpc_server.model_service import ModelServiceServicer
     from orchestrator.grpc_server.server import create_grpc_server
 
-    device_service = DeviceRegistryServicer()
+    device_service = DeviceRegistryServicer(heartbeat_monitor)
     heartbeat_service = HeartbeatServiceServicer(heartbeat_monitor, redis)
-    model_service = ModelServiceServicer(redis)
+    model_service = ModelServiceServicer(redis, blob_redis, model_store)
 
     # Training coordinator
     from orchestrator.services.training_coordinator import TrainingCoordinator
 
-    training_coordinator = TrainingCoordinator(redis, heartbeat_monitor)
+    training_coordinator = TrainingCoordinator(redis, heartbeat_monitor, blob_redis, model_store)
 
     grpc_server = await create_grpc_server(
         device_service,
@@ -90,7 +96,7 @@ async def main() -> None:
     # Share Redis with training routes
     from orchestrator.api.routes.training import set_redis
 
-    set_redis(redis)
+    set_redis(redis, blob_redis, model_store)
     uvicorn_config = uvicorn.Config(
         app,
         host=settings.api_host,
@@ -99,6 +105,8 @@ async def main() -> None:
     )
     uvicorn_server = uvicorn.Server(uvicorn_config)
 
+    from orchestrator.services.executors import monitor_loop_lag, shutdown_executors
+
     # Shutdown event
     shutdown_event = asyncio.Event()
 
@@ -119,7 +127,9 @@ async def main() -> None:
     tasks = [
         asyncio.create_task(uvicorn_server.serve(), name="uvicorn"),
         asyncio.create_task(heartbeat_monitor.run_stale_device_checker(), name="heartbeat"),
+        asyncio.create_task(heartbeat_monitor.run_state_flusher(), name="device_state_flusher"),
         asyncio.create_task(training_coordinator.run(), name="training_coordinator"),
+        asyncio.create_task(monitor_loop_lag(), name="loop_lag_monitor"),
         asyncio.create_task(shutdown_event.wait(), name="shutdown"),
     ]
 
@@ -133,6 +143,7 @@ async def main() -> None:
     await mdns.unregister()
     await grpc_server.stop(grace=5)
     await redis.aclose()
+    await blob_redis.aclose()
 
     for task in pending:
         task.cancel()
@@ -140,6 +151,7 @@ async def main() -> None:
             await task
         except asyncio.CancelledError:
             pass
+    shutdown_executors()
 
     logger.info("shutdown_complete")
 
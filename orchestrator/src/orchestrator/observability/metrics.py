@@ -47,7 +47,48 @@ GRADIENT_SUBMISSIONS_TOTAL = Counter(
     "eo_gradient_submissions_total",
     "Total number of gradient submissions received",
 )
+LATE_GRADIENT_SUBMISSIONS_TOTAL = Counter(
+    "eo_late_gradient_submissions_total",
+    "Gradient submissions rejected because their round had already closed",
+)
+EXECUTOR_TASK_DURATION = Histogram(
+    "eo_executor_task_duration_seconds",
+    "Duration of CPU-bound work offloaded from the event loop, including queueing",
+    ["pool"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+EVENT_LOOP_LAG = Histogram(
+    "eo_event_loop_lag_seconds",
+    "How late the event loop wakes up from a timed sleep",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
 HEARTBEATS_TOTAL = Counter(
     "eo_heartbeats_total",
     "Total number of heartbeats processed",
 )
+DEVICE_STATE_FLUSH_BATCH_SIZE = Histogram(
+    "eo_device_state_flush_batch_size",
+    "Number of devices written per write-behind telemetry flush",
+    buckets=(1, 10, 50, 100, 500, 1000, 5000, 10000),
+)
+DEVICE_STATE_FLUSH_LAG = Histogram(
+    "eo_device_state_flush_lag_seconds",
+    "Age of the oldest buffered heartbeat when its telemetry flush completes",
+    buckets=(0.5, 1, 2, 5, 10, 30, 60),
+)
+MODEL_CACHE_HITS_TOTAL = Counter(
+    "eo_model_cache_hits_total",
+    "Model downloads served from the in-process serialized model cache",
+)
+MODEL_CACHE_MISSES_TOTAL = Counter(
+    "eo_model_cache_misses_total",
+    "Model downloads that had to load the model from the store",
+)
+MODEL_CACHE_EVICTIONS_TOTAL = Counter(
+    "eo_model_cache_evictions_total",
+    "Model versions evicted from the serialized model cache",
+)
+MODEL_CACHE_BYTES = Gauge(
+    "eo_model_cache_bytes",
+    "Bytes of model data held by the serialized model cache",
+)
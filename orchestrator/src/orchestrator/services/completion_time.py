@@ -0,0 +1,167 @@
+"""Per-device completion-time prediction for straggler-aware rounds.
+
+Every round, the time from dispatch to a device's submission is split into
+download / train / upload (devices report `download_seconds` and
+`train_seconds` among their metrics; the remainder, including command
+delivery, counts as upload) and folded into exponentially weighted moving
+averages
+
+  ewma = alpha * observed + (1 - alpha) * ewma
+
+kept per device and per cohort (device_model + chip) in the Redis hash
+`device_timing:{architecture}`, so a device without history is predicted
+from its cohort. Devices that had not reported when a round closed only
+contribute the time they were waited for, and only if that is more than
+their estimate.
+
+Arrival times come from the round's notification stream: its entry IDs are
+Redis-clock milliseconds, compared against Redis TIME taken at dispatch.
+
+With `TrainingJob.config["deadline"]` enabled, devices predicted to take
+longer than `max_seconds` are not selected, and each round waits for
+`slack` times the `percentile` of its devices' predicted times, within
+[min_seconds, training_round_timeout_seconds]. Devices without a prediction
+count as the full timeout.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from redis.asyncio import Redis
+
+if TYPE_CHECKING:
+    from orchestrator.db.models import Device
+
+
+@dataclass
+class DeadlineConfig:
+    """Per-job adaptive deadline settings, read from `TrainingJob.config["deadline"]`."""
+
+    enabled: bool = False
+    percentile: float = 0.9
+    slack: float = 1.25
+    min_seconds: float = 10.0
+    # Devices predicted slower than this are not selected (None: the round timeout)
+    max_seconds: float | None = None
+    alpha: float = 0.3
+
+    @classmethod
+    def from_job_config(cls, config: dict | None) -> DeadlineConfig:
+        if not config:
+            return cls()
+        cfg = config.get("deadline", {})
+        if not cfg:
+            return cls()
+        percentile = cfg.get("percentile", 0.9)
+        if not 0.0 < percentile <= 1.0:
+            raise ValueError("deadline percentile must be in (0, 1]")
+        alpha = cfg.get("alpha", 0.3)
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError("deadline alpha must be in (0, 1]")
+        return cls(
+            enabled=cfg.get("enabled", False),
+            percentile=percentile,
+            slack=cfg.get("slack", 1.25),
+            min_seconds=cfg.get("min_seconds", 10.0),
+            max_seconds=cfg.get("max_seconds"),
+            alpha=alpha,
+        )
+
+    def round_deadline(self, predictions: list[float | None], timeout: float) -> float:
+        """Seconds to wait for devices with these predicted completion times."""
+        if not predictions:
+            return timeout
+        values = sorted(timeout if p is None else p for p in predictions)
+        at_percentile = values[max(0, math.ceil(self.percentile * len(values)) - 1)]
+        return min(timeout, max(self.min_seconds, at_percentile * self.slack))
+
+
+def device_timing_key(architecture: str) -> str:
+    return f"device_timing:{architecture}"
+
+
+def _cohort(device: Device) -> str:
+    return f"cohort:{device.device_model}|{getattr(device, 'chip', None) or ''}"
+
+
+class CompletionTimeTracker:
+    """EWMA completion times per device and per cohort, for one architecture."""
+
+    def __init__(self, redis: Redis, architecture: str, alpha: float = 0.3) -> None:
+        self.redis = redis
+        self.key = device_timing_key(architecture)
+        self.alpha = alpha
+
+    async def _load(self, fields: list[str]) -> dict[str, dict]:
+        if not fields:
+            return {}
+        values = await self.redis.hmget(self.key, fields)
+        return {f: json.loads(v) for f, v in zip(fields, values, strict=True) if v is not None}
+
+    async def predict(self, devices: list[Device]) -> dict[str, float]:
+        """Predicted seconds from dispatch to submission, by device id (known ones only)."""
+        fields = sorted({f"device:{d.id}" for d in devices} | {_cohort(d) for d in devices})
+        stats = await self._load(fields)
+        predictions = {}
+        for device in devices:
+            entry = stats.get(f"device:{device.id}") or stats.get(_cohort(device))
+            if entry is not None:
+                predictions[str(device.id)] = entry["total"]
+        return predictions
+
+    async def record(
+        self, devices: list[Device], elapsed: dict[str, float], metrics: dict[str, dict],
+        waited: float | None = None,
+    ) -> None:
+        """Fold one round's observations in.
+
+        `elapsed` holds seconds from dispatch to submission per device id and
+        `metrics` the metrics each device reported. Devices missing from
+        `elapsed` were still running after `waited` seconds.
+        """
+        fields = sorted({f"device:{d.id}" for d in devices} | {_cohort(d) for d in devices})
+        stats = await self._load(fields)
+        updates: dict[str, dict] = {}
+        for device in devices:
+            device_id = str(device.id)
+            for field in (f"device:{device_id}", _cohort(device)):
+                current = updates.get(field) or stats.get(field)
+                if device_id in elapsed:
+                    updated = self._observe(current, elapsed[device_id], metrics.get(device_id, {}))
+                elif waited is not None and (current is None or waited > current["total"]):
+                    # Censored: all we know is that it takes longer than `waited`
+                    updated = self._observe(current, waited, {})
+                else:
+                    continue
+                updates[field] = updated
+        if updates:
+            await self.redis.hset(
+                self.key, mapping={f: json.dumps(v) for f, v in updates.items()},
+            )
+
+    def _observe(self, current: dict | None, total: float, metrics: dict) -> dict:
+        phases = {}
+        download = metrics.get("download_seconds")
+        train = metrics.get("train_seconds")
+        if download is not None and train is not None:
+            phases = {
+                "download": float(download),
+                "train": float(train),
+                "upload": max(0.0, total - float(download) - float(train)),
+            }
+        observed = {"total": total, **phases}
+        if current is None:
+            return {**observed, "samples": 1}
+        updated = dict(current)
+        for name, value in observed.items():
+            previous = current.get(name)
+            updated[name] = value if previous is None else (
+                self.alpha * value + (1.0 - self.alpha) * previous
+            )
+        updated["samples"] = current.get("samples", 0) + 1
+        return updated
+
@@ -189,13 +189,17 @@ def _create_cifar10_model(
     return spec.SerializeToString()
 
 
-def set_learning_rate(mlmodel_bytes: bytes, lr: float) -> bytes:
-    """Modify the SGD learning rate in an existing .mlmodel protobuf."""
+def parse_spec(mlmodel_bytes: bytes):
+    """Parse .mlmodel protobuf bytes into a Model_pb2.Model spec."""
     from coremltools.proto import Model_pb2
 
     spec = Model_pb2.Model()
     spec.ParseFromString(mlmodel_bytes)
+    return spec
+
 
+def set_spec_learning_rate(spec, lr: float) -> None:
+    """Set the SGD learning rate of a parsed spec in place."""
     nn = _get_nn(spec)
     if nn.updateParams.HasField("optimizer"):
         sgd = nn.updateParams.optimizer.sgdOptimizer
@@ -203,6 +207,18 @@ def set_learning_rate(mlmodel_bytes: bytes, lr: float) -> bytes:
         sgd.learningRate.range.minValue = lr
         sgd.learningRate.range.maxValue = lr
 
+
+def get_spec_learning_rate(spec) -> float | None:
+    nn = _get_nn(spec)
+    if nn.updateParams.HasField("optimizer"):
+        return nn.updateParams.optimizer.sgdOptimizer.learningRate.defaultValue
+    return None
+
+
+def set_learning_rate(mlmodel_bytes: bytes, lr: float) -> bytes:
+    """Modify the SGD learning rate in an existing .mlmodel protobuf."""
+    spec = parse_spec(mlmodel_bytes)
+    set_spec_learning_rate(spec, lr)
     return spec.SerializeToString()
 
 
@@ -213,16 +229,36 @@ def _get_nn(spec):
     return spec.neuralNetwork
 
 
-def extract_weights(mlmodel_bytes: bytes) -> dict[str, np.ndarray]:
-    """Extract weight arrays from .mlmodel protobuf bytes.
+# WeightParams.floatValue is field 1, a packed repeated float (wire type 2)
+_FLOAT_VALUE_TAG = 0x0A
 
-    Dynamically reads all innerProduct layers instead of hardcoding names.
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _write_float_values(params, values: np.ndarray) -> None:
+    """Replace WeightParams.floatValue by merging a hand-built packed field.
+
+    Parsing the packed bytes is a memcpy, whereas `.tolist()` + `extend()`
+    boxes every float into a Python object. Other fields (isUpdatable,
+    quantization, ...) are left untouched.
     """
-    from coremltools.proto import Model_pb2
+    payload = np.ascontiguousarray(values, dtype="<f4").tobytes()
+    params.ClearField("floatValue")
+    if payload:
+        params.MergeFromString(
+            bytes((_FLOAT_VALUE_TAG,)) + _varint(len(payload)) + payload
+        )
 
-    spec = Model_pb2.Model()
-    spec.ParseFromString(mlmodel_bytes)
 
+def extract_spec_weights(spec) -> dict[str, np.ndarray]:
+    """Read every innerProduct layer of a parsed spec into weight arrays."""
     weights = {}
     nn = _get_nn(spec)
 
@@ -241,29 +277,29 @@ def extract_weights(mlmodel_bytes: bytes) -> dict[str, np.ndarray]:
     return weights
 
 
-def inject_weights(mlmodel_bytes: bytes, weights: dict[str, np.ndarray]) -> bytes:
-    """Replace weights in .mlmodel protobuf bytes and return new bytes."""
-    from coremltools.proto import Model_pb2
-
-    spec = Model_pb2.Model()
-    spec.ParseFromString(mlmodel_bytes)
-
+def inject_spec_weights(spec, weights: dict[str, np.ndarray]) -> None:
+    """Overwrite innerProduct weights of a parsed spec in place."""
     nn = _get_nn(spec)
     for layer in nn.layers:
         if layer.HasField("innerProduct"):
             w_key = f"{layer.name}_weight"
             b_key = f"{layer.name}_bias"
             if w_key in weights:
-                ip = layer.innerProduct
-                del ip.weights.floatValue[:]
-                ip.weights.floatValue.extend(
-                    weights[w_key].astype(np.float32).flatten().tolist()
-                )
+                _write_float_values(layer.innerProduct.weights, weights[w_key])
             if b_key in weights:
-                ip = layer.innerProduct
-                del ip.bias.floatValue[:]
-                ip.bias.floatValue.extend(
-                    weights[b_key].astype(np.float32).flatten().tolist()
-                )
+                _write_float_values(layer.innerProduct.bias, weights[b_key])
+
 
+def extract_weights(mlmodel_bytes: bytes) -> dict[str, np.ndarray]:
+    """Extract weight arrays from .mlmodel protobuf bytes.
+
+    Dynamically reads all innerProduct layers instead of hardcoding names.
+    """
+    return extract_spec_weights(parse_spec(mlmodel_bytes))
+
+
+def inject_weights(mlmodel_bytes: bytes, weights: dict[str, np.ndarray]) -> bytes:
+    """Replace weights in .mlmodel protobuf bytes and return new bytes."""
+    spec = parse_spec(mlmodel_bytes)
+    inject_spec_weights(spec, weights)
     return spec.SerializeToString()
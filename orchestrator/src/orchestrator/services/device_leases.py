@@ -0,0 +1,200 @@
+"""Cluster-wide device leases, so concurrent jobs never double-book a device.
+
+A device belongs to at most one job at a time: `device_lease:{device_id}`
+holds the job id with a TTL. Leases are taken by a Lua script that claims
+every still-free device of a request in one atomic step, so two jobs racing
+for the same devices split them instead of both dispatching to them. They
+are renewed while a round retries and released when it ends; leases of a
+crashed coordinator simply expire.
+
+Running jobs register their priority and device cap in `device_leases:jobs`
+(a sorted set scored by registration expiry) and `device_leases:config`.
+Each job may lease at most its share of the online fleet: devices are split
+in proportion to priority, water-filling so that jobs capped below their
+share (by `max_devices` or their own target) leave the remainder to the
+others. Ties are broken by job id, so every coordinator computes the same
+partition.
+
+Per job via `TrainingJob.config["leases"]`, e.g.
+{"priority": 2, "max_devices": 20}.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import dataclass
+
+from redis.asyncio import Redis
+
+LEASE_JOBS_KEY = "device_leases:jobs"
+LEASE_CONFIG_KEY = "device_leases:config"
+
+# Claim every key that is free or already ours; returns the claimed indices
+_ACQUIRE = """
+local claimed = {}
+for i, key in ipairs(KEYS) do
+    local owner = redis.call('GET', key)
+    if not owner or owner == ARGV[1] then
+        redis.call('SET', key, ARGV[1], 'PX', ARGV[2])
+        table.insert(claimed, i - 1)
+    end
+end
+return claimed
+"""
+
+_RENEW = """
+for _, key in ipairs(KEYS) do
+    if redis.call('GET', key) == ARGV[1] then
+        redis.call('PEXPIRE', key, ARGV[2])
+    end
+end
+return 0
+"""
+
+_RELEASE = """
+for _, key in ipairs(KEYS) do
+    if redis.call('GET', key) == ARGV[1] then
+        redis.call('DEL', key)
+    end
+end
+return 0
+"""
+
+
+def device_lease_key(device_id: str) -> str:
+    return f"device_lease:{device_id}"
+
+
+@dataclass
+class DeviceLeaseConfig:
+    """Per-job arbitration settings, read from `TrainingJob.config["leases"]`."""
+
+    priority: int = 1
+    max_devices: int | None = None
+
+    @classmethod
+    def from_job_config(cls, config: dict | None) -> DeviceLeaseConfig:
+        if not config:
+            return cls()
+        cfg = config.get("leases", {})
+        if not cfg:
+            return cls()
+        priority = cfg.get("priority", 1)
+        if priority < 1:
+            raise ValueError("lease priority must be >= 1")
+        max_devices = cfg.get("max_devices")
+        if max_devices is not None and max_devices < 1:
+            raise ValueError("lease max_devices must be >= 1")
+        return cls(priority=priority, max_devices=max_devices)
+
+
+def fair_shares(jobs: dict[str, tuple[int, int | None]], pool_size: int) -> dict[str, int]:
+    """Split `pool_size` devices among jobs {job_id: (priority, cap)}.
+
+    Proportional to priority; a job whose cap is below its proportional
+    share gets its cap and the rest is split again among the others.
+    Rounding leftovers go to the highest priority first, then by job id.
+    """
+    shares = {job_id: 0 for job_id in jobs}
+    pending = sorted(jobs, key=lambda j: (-jobs[j][0], j))
+    remaining = pool_size
+    while pending and remaining > 0:
+        weight = sum(jobs[j][0] for j in pending)
+        capped = [
+            j for j in pending
+            if jobs[j][1] is not None and jobs[j][1] <= remaining * jobs[j][0] / weight
+        ]
+        if capped:
+            for j in capped:
+                shares[j] = jobs[j][1]
+                remaining -= jobs[j][1]
+                pending.remove(j)
+            continue
+        for j in pending:
+            shares[j] = remaining * jobs[j][0] // weight
+        for j in pending[: remaining - sum(shares[j] for j in pending)]:
+            shares[j] += 1
+        break
+    return shares
+
+
+class DeviceLeaseManager:
+    def __init__(self, redis: Redis) -> None:
+        self.redis = redis
+        self._acquire = redis.register_script(_ACQUIRE)
+        self._renew = redis.register_script(_RENEW)
+        self._release = redis.register_script(_RELEASE)
+
+    async def register(
+        self, job_id: str, priority: int, max_devices: int | None, ttl: float,
+    ) -> None:
+        """Announce (or refresh) a running job for `ttl` seconds."""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zadd(LEASE_JOBS_KEY, {job_id: int((time.time() + ttl) * 1000)})
+            pipe.hset(LEASE_CONFIG_KEY, job_id, json.dumps([priority, max_devices]))
+            await pipe.execute()
+
+    async def unregister(self, job_id: str) -> None:
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zrem(LEASE_JOBS_KEY, job_id)
+            pipe.hdel(LEASE_CONFIG_KEY, job_id)
+            await pipe.execute()
+
+    async def active_jobs(self) -> dict[str, tuple[int, int | None]]:
+        """{job_id: (priority, cap)} of every job whose registration has not expired."""
+        await self.redis.zremrangebyscore(LEASE_JOBS_KEY, "-inf", int(time.time() * 1000))
+        job_ids = [
+            j.decode() if isinstance(j, bytes) else j
+            for j in await self.redis.zrange(LEASE_JOBS_KEY, 0, -1)
+        ]
+        if not job_ids:
+            return {}
+        configs = await self.redis.hmget(LEASE_CONFIG_KEY, job_ids)
+        jobs = {}
+        for job_id, raw in zip(job_ids, configs, strict=True):
+            priority, cap = json.loads(raw) if raw else (1, None)
+            jobs[job_id] = (priority, cap)
+        return jobs
+
+    async def device_limit(self, job_id: str, pool_size: int) -> int:
+        """Devices `job_id` may lease out of an online pool of `pool_size`."""
+        jobs = await self.active_jobs()
+        if job_id not in jobs:
+            return pool_size
+        return fair_shares(jobs, pool_size)[job_id]
+
+    async def owners(self, device_ids: list[str]) -> dict[str, str | None]:
+        """Job currently leasing each device, None if it is free."""
+        if not device_ids:
+            return {}
+        owners = await self.redis.mget([device_lease_key(d) for d in device_ids])
+        return {
+            device_id: owner.decode() if isinstance(owner, bytes) else owner
+            for device_id, owner in zip(device_ids, owners, strict=True)
+        }
+
+    async def leased_by_others(self, job_id: str, device_ids: list[str]) -> set[str]:
+        return {
+            device_id for device_id, owner in (await self.owners(device_ids)).items()
+            if owner is not None and owner != job_id
+        }
+
+    async def acquire(self, job_id: str, device_ids: list[str], ttl: float) -> list[str]:
+        """Lease every device not held by another job; returns the ones leased."""
+        if not device_ids:
+            return []
+        claimed = await self._acquire(
+            keys=[device_lease_key(d) for d in device_ids], args=[job_id, int(ttl * 1000)],
+        )
+        return [device_ids[int(i)] for i in claimed]
+
+    async def renew(self, job_id: str, device_ids: list[str], ttl: float) -> None:
+        if device_ids:
+            await self._renew(
+                keys=[device_lease_key(d) for d in device_ids], args=[job_id, int(ttl * 1000)],
+            )
+
+    async def release(self, job_id: str, device_ids: list[str]) -> None:
+        if device_ids:
+            await self._release(keys=[device_lease_key(d) for d in device_ids], args=[job_id])
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import math
 from dataclasses import dataclass, field
 from typing import TYPE_CHECKING
 
@@ -26,6 +27,10 @@ class SchedulerConfig:
     max_thermal_pressure: float = 0.70
     max_cpu_usage: float = 0.90
     weights: dict[str, float] = field(default_factory=lambda: dict(_DEFAULT_WEIGHTS))
+    # Dispatch to target * over_select_factor devices and close the round
+    # once quorum_fraction of the target has reported
+    over_select_factor: float = 1.0
+    quorum_fraction: float = 1.0
 
     @classmethod
     def from_job_config(cls, config: dict | None) -> SchedulerConfig:
@@ -35,6 +40,12 @@ class SchedulerConfig:
         if not sched:
             return cls()
         weights = {**_DEFAULT_WEIGHTS, **sched.get("weights", {})}
+        over_select_factor = sched.get("over_select_factor", 1.0)
+        if over_select_factor < 1.0:
+            raise ValueError("over_select_factor must be >= 1.0")
+        quorum_fraction = sched.get("quorum_fraction", 1.0)
+        if not 0.0 < quorum_fraction <= 1.0:
+            raise ValueError("quorum_fraction must be in (0, 1]")
         return cls(
             enabled=sched.get("enabled", False),
             target_devices=sched.get("target_devices"),
@@ -43,8 +54,22 @@ class SchedulerConfig:
             max_thermal_pressure=sched.get("max_thermal_pressure", 0.70),
             max_cpu_usage=sched.get("max_cpu_usage", 0.90),
             weights=weights,
+            over_select_factor=over_select_factor,
+            quorum_fraction=quorum_fraction,
         )
 
+    def quorum(self, num_selected: int, min_devices: int) -> int:
+        """Reports needed to close a round dispatched to `num_selected` devices.
+
+        The target is `target_devices` (at least `min_devices`) when the
+        scheduler picks a target, else every selected device; the round
+        closes once `quorum_fraction` of it has reported.
+        """
+        target = num_selected
+        if self.enabled and self.target_devices is not None:
+            target = min(num_selected, max(self.target_devices, min_devices))
+        return max(1, min(num_selected, math.ceil(self.quorum_fraction * target)))
+
 
 def _get_metric(device: Device, key: str, default: float | None = None) -> float | None:
     metrics = getattr(device, "metrics", None) or {}
@@ -112,13 +137,39 @@ def _score_device(device: Device, cfg: SchedulerConfig, pool_max_ne: int, pool_m
     return total
 
 
+def _drop_predicted_stragglers(
+    devices: list[Device], predicted_seconds: dict[str, float], max_seconds: float,
+    min_devices: int,
+) -> list[Device]:
+    """Devices predicted to finish within max_seconds (unknown ones included),
+    topped up with the fastest of the rest if fewer than min_devices remain."""
+    fast = [d for d in devices if predicted_seconds.get(str(d.id), 0.0) <= max_seconds]
+    if len(fast) >= min_devices:
+        return fast
+    slow = sorted(
+        (d for d in devices if predicted_seconds.get(str(d.id), 0.0) > max_seconds),
+        key=lambda d: predicted_seconds[str(d.id)],
+    )
+    return fast + slow[: min_devices - len(fast)]
+
+
 def select_devices(
     devices: list[Device], cfg: SchedulerConfig, min_devices: int,
+    predicted_seconds: dict[str, float] | None = None, max_seconds: float | None = None,
 ) -> list[Device] | None:
+    """Devices to dispatch, best first, or None if too few are eligible.
+
+    With `predicted_seconds` (see completion_time) and `max_seconds`, devices
+    predicted to miss that deadline are left out.
+    """
     if not cfg.enabled:
+        if predicted_seconds and max_seconds is not None:
+            return _drop_predicted_stragglers(devices, predicted_seconds, max_seconds, min_devices)
         return devices
 
     eligible = [d for d in devices if _is_eligible(d, cfg)]
+    if predicted_seconds and max_seconds is not None:
+        eligible = _drop_predicted_stragglers(eligible, predicted_seconds, max_seconds, min_devices)
     if len(eligible) < min_devices:
         return None
 
@@ -135,6 +186,7 @@ def select_devices(
     target = cfg.target_devices
     if target is None:
         return scored
-    # Clamp target to at least min_devices
+    # Clamp target to at least min_devices, then over-select so stragglers
+    # beyond the quorum do not hold the round open
     target = max(target, min_devices)
-    return scored[:target]
+    return scored[: math.ceil(target * cfg.over_select_factor)]
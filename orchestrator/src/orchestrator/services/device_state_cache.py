@@ -0,0 +1,139 @@
+"""Write-behind cache for device telemetry reported by heartbeats.
+
+Heartbeats only touch this in-memory map; a background flusher writes every
+dirty device to the `devices` table in one executemany UPDATE every
+`device_state_flush_interval_seconds`. Only the latest state per device is
+kept, so N heartbeats from a device between two flushes cost one row update.
+
+Status is resolved in SQL at flush time: a device that is currently
+"training" stays "training", anything else becomes "online".
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+
+import structlog
+from sqlalchemy import JSON, Float, String, bindparam, case, func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from orchestrator.config import settings
+from orchestrator.db.engine import async_session
+from orchestrator.db.models import Device
+from orchestrator.observability.metrics import (
+    DEVICE_STATE_FLUSH_BATCH_SIZE,
+    DEVICE_STATE_FLUSH_LAG,
+)
+
+logger = structlog.get_logger()
+
+_devices = Device.__table__
+
+# NULL parameters keep the stored value (a heartbeat without battery info must
+# not wipe the last known battery level).
+_FLUSH_STMT = (
+    update(_devices)
+    .where(_devices.c.id == bindparam("b_id"))
+    .values(
+        status=case((_devices.c.status == "training", _devices.c.status), else_="online"),
+        battery_level=func.coalesce(
+            bindparam("b_battery_level", type_=Float), _devices.c.battery_level
+        ),
+        battery_state=func.coalesce(
+            bindparam("b_battery_state", type_=String), _devices.c.battery_state
+        ),
+        metrics=func.coalesce(
+            bindparam("b_metrics", type_=JSON(none_as_null=True)), _devices.c.metrics
+        ),
+        last_seen_at=bindparam("b_last_seen_at"),
+    )
+)
+
+
+@dataclass
+class DeviceState:
+    last_seen_at: datetime
+    dirty_since: float = field(default_factory=time.monotonic)
+    battery_level: float | None = None
+    battery_state: str | None = None
+    metrics: dict | None = None
+
+
+class DeviceStateCache:
+    def __init__(self) -> None:
+        self._dirty: dict[uuid.UUID, DeviceState] = {}
+
+    def __len__(self) -> int:
+        return len(self._dirty)
+
+    def record(
+        self, device_id: uuid.UUID, metrics: dict | None = None,
+        battery_level: float | None = None, battery_state: str | None = None,
+        is_low_power_mode: bool | None = None,
+    ) -> None:
+        now = datetime.now(UTC)
+        state = self._dirty.get(device_id)
+        if state is None:
+            state = DeviceState(last_seen_at=now)
+            self._dirty[device_id] = state
+        state.last_seen_at = now
+        if battery_level is not None:
+            state.battery_level = battery_level
+        if battery_state is not None:
+            state.battery_state = battery_state
+        if metrics and is_low_power_mode is not None:
+            metrics = {**metrics, "is_low_power_mode": is_low_power_mode}
+        if metrics:
+            state.metrics = metrics
+
+    async def flush(self, session: AsyncSession) -> int:
+        """Write all dirty devices in one batch; returns the number of rows sent."""
+        if not self._dirty:
+            return 0
+        pending, self._dirty = self._dirty, {}
+
+        rows = [
+            {
+                "b_id": device_id,
+                "b_battery_level": state.battery_level,
+                "b_battery_state": state.battery_state,
+                "b_metrics": state.metrics,
+                "b_last_seen_at": state.last_seen_at,
+            }
+            for device_id, state in pending.items()
+        ]
+        oldest = min(state.dirty_since for state in pending.values())
+        try:
+            await session.execute(_FLUSH_STMT, rows)
+            await session.commit()
+        except Exception:
+            # Put back whatever a newer heartbeat has not already superseded
+            for device_id, state in pending.items():
+                self._dirty.setdefault(device_id, state)
+            raise
+
+        DEVICE_STATE_FLUSH_BATCH_SIZE.observe(len(rows))
+        DEVICE_STATE_FLUSH_LAG.observe(time.monotonic() - oldest)
+        return len(rows)
+
+    async def run_flusher(self) -> None:
+        interval = settings.device_state_flush_interval_seconds
+        logger.info("device_state_flusher_started", interval=interval)
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                await self._flush_once()
+        finally:
+            # Persist the last heartbeats on shutdown
+            await self._flush_once()
+
+    async def _flush_once(self) -> None:
+        try:
+            async with async_session() as session:
+                await self.flush(session)
+        except Exception:
+            logger.exception("device_state_flush_error")
@@ -0,0 +1,100 @@
+"""Executors for CPU-bound work that must not run on the event loop.
+
+The event loop serves gRPC heartbeats, the API and the dashboard; a
+synchronous aggregation or evaluation step on it stalls all of them (long
+enough, with large models, for the stale-device checker to mark devices
+offline). Such work is offloaded instead:
+
+- `run_cpu`: a thread pool for numpy sections (aggregation, optimizer
+  steps, evaluation), which spend most of their time in BLAS or
+  vectorized kernels that release the GIL.
+- `run_proto`: a process pool for protobuf parsing/serialization, which
+  holds the GIL. Only used with `EO_EXECUTOR_PROCESSES > 0` (functions and
+  arguments must be picklable); otherwise it falls back to the thread pool.
+
+Pools are created on first use and sized by `EO_EXECUTOR_THREADS` /
+`EO_EXECUTOR_PROCESSES`. `monitor_loop_lag` records how late the loop
+wakes up from a sleep, so any work still blocking it shows up in
+`eo_event_loop_lag_seconds`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import TypeVar
+
+import structlog
+
+from orchestrator.config import settings
+from orchestrator.observability.metrics import EVENT_LOOP_LAG, EXECUTOR_TASK_DURATION
+
+logger = structlog.get_logger()
+
+T = TypeVar("T")
+
+_thread_pool: ThreadPoolExecutor | None = None
+_process_pool: ProcessPoolExecutor | None = None
+
+
+def _threads() -> ThreadPoolExecutor:
+    global _thread_pool
+    if _thread_pool is None:
+        _thread_pool = ThreadPoolExecutor(
+            max_workers=settings.executor_threads, thread_name_prefix="eo-cpu",
+        )
+    return _thread_pool
+
+
+def _processes() -> Executor:
+    global _process_pool
+    if settings.executor_processes <= 0:
+        return _threads()
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=settings.executor_processes)
+    return _process_pool
+
+
+async def _run(pool: Executor, label: str, fn: Callable[..., T], *args, **kwargs) -> T:
+    start = time.perf_counter()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(
+            pool, functools.partial(fn, *args, **kwargs),
+        )
+    finally:
+        EXECUTOR_TASK_DURATION.labels(pool=label).observe(time.perf_counter() - start)
+
+
+async def run_cpu(fn: Callable[..., T], *args, **kwargs) -> T:
+    """Run numpy-heavy `fn` in the thread pool."""
+    return await _run(_threads(), "thread", fn, *args, **kwargs)
+
+
+async def run_proto(fn: Callable[..., T], *args, **kwargs) -> T:
+    """Run protobuf-heavy `fn` in the process pool (or the thread pool if disabled)."""
+    pool = _processes()
+    label = "process" if isinstance(pool, ProcessPoolExecutor) else "thread"
+    return await _run(pool, label, fn, *args, **kwargs)
+
+
+def shutdown_executors() -> None:
+    global _thread_pool, _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+    if _thread_pool is not None:
+        _thread_pool.shutdown(wait=False, cancel_futures=True)
+        _thread_pool = None
+
+
+async def monitor_loop_lag(interval: float | None = None) -> None:
+    """Observe how late the event loop wakes up from a fixed sleep, forever."""
+    interval = interval if interval is not None else settings.loop_lag_interval_seconds
+    logger.info("loop_lag_monitor_started", interval=interval)
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(0.0, time.perf_counter() - start - interval))
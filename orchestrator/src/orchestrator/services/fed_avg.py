@@ -11,9 +11,37 @@ Binary format (shared with Swift):
 Layer names: hidden_weight, hidden_bias, output_weight, output_bias
 """
 
+from __future__ import annotations
+
 import struct
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from functools import partial
 
 import numpy as np
+import structlog
+
+from orchestrator.services.flat_params import FlatLayout
+from orchestrator.services.gradient_codec import (
+    accumulate_encoded_into,
+    decode_gradients_into,
+    decompress_gradients,
+    encoded_shapes,
+    is_encoded,
+    iter_layers,
+    write_layers_into,
+)
+from orchestrator.services.robust_aggregation import (
+    DEFAULT_CHUNK_BYTES,
+    ROBUST_RULES,
+    clip_norm,
+    clip_rows,
+    coordinate_median,
+    multi_krum,
+    trimmed_mean,
+)
+
+logger = structlog.get_logger()
 
 LAYER_NAMES = ["hidden_weight", "hidden_bias", "output_weight", "output_bias"]
 
@@ -41,44 +69,319 @@ def serialize_weight_deltas(
     return b"".join(parts)
 
 
+def iter_weight_deltas(data: bytes) -> Iterator[tuple[str, np.ndarray]]:
+    """Yield (layer_name, values) pairs as read-only views into `data` (no copies)."""
+    return iter_layers(data, "<f4")
+
+
 def deserialize_weight_deltas(data: bytes) -> dict[str, np.ndarray]:
     """Deserialize weight deltas from compact binary format."""
-    offset = 0
-    (layer_count,) = struct.unpack_from("<I", data, offset)
-    offset += 4
+    return {name: values.copy() for name, values in iter_weight_deltas(data)}
 
-    result = {}
-    for _ in range(layer_count):
-        (name_len,) = struct.unpack_from("<I", data, offset)
-        offset += 4
-        name = data[offset : offset + name_len].decode("utf-8")
-        offset += name_len
-        (elem_count,) = struct.unpack_from("<I", data, offset)
-        offset += 4
-        values = np.frombuffer(data, dtype=np.float32, count=elem_count, offset=offset).copy()
-        offset += elem_count * 4
-        result[name] = values
 
-    return result
+def decode_weight_deltas_into(
+    data: bytes, layout: FlatLayout, out: np.ndarray, scale: float = 1.0,
+) -> None:
+    """Write a payload's values, times `scale`, into the flat vector `out`.
+
+    Layers are validated against `layout`; layers the payload does not carry
+    are zeroed so `out` never keeps values from a previous payload. Top-k and
+    quantized payloads (gradient codecs 0x02/0x03) are decoded into a zeroed
+    `out`.
+    """
+    if is_encoded(data):
+        out[:] = 0.0
+        accumulate_encoded_into(data, layout, out, scale)
+        return
+    write_layers_into(iter_weight_deltas(data), layout, out, scale)
+
+
+class FedAvgAccumulator:
+    """Running FedAvg: folds weight deltas in as they arrive.
+
+    Keeps a single sample-weighted sum in one contiguous float32 vector laid
+    out by `layout`, so memory stays at one model-sized buffer (plus a scratch
+    buffer of the same size) no matter how many devices report. Each payload
+    is scaled straight from its wire bytes into the scratch buffer and added
+    with one whole-vector op; nothing is allocated per layer or per device.
+
+    Top-k and quantized payloads are decoded straight into the sum (top-k
+    touching only its k entries per layer), without the scratch copy.
+
+    With `clip_norm`, every payload goes through the scratch buffer and is
+    scaled down to that L2 norm before it is weighted and added.
+
+    Without an explicit layout, one is derived from the first payload.
+    """
+
+    def __init__(self, layout: FlatLayout | None = None, clip_norm: float | None = None) -> None:
+        self.layout = layout
+        self.clip_norm = clip_norm
+        self._sum: np.ndarray | None = None
+        self._scratch: np.ndarray | None = None
+        self.total_samples = 0
+        self.count = 0
+        self.clipped = 0
+
+    def add(self, grad_bytes: bytes, num_samples: int, wire: bool = False) -> None:
+        """Fold one device's serialized deltas into the running sum.
+
+        `wire` marks a payload stored exactly as the device sent it (possibly
+        float16+lz4); it is decoded here, straight into the sum.
+        """
+        if num_samples <= 0:
+            return
+        encoded = is_encoded(grad_bytes)
+        if self.layout is None:
+            if encoded:
+                self.layout = FlatLayout.from_shapes(encoded_shapes(grad_bytes))
+            else:
+                self.layout = FlatLayout.from_payload(
+                    decompress_gradients(grad_bytes) if wire else grad_bytes,
+                )
+        if self._sum is None:
+            self._sum = self.layout.zeros()
+            self._scratch = self.layout.zeros()
+
+        if self.clip_norm is not None:
+            if wire:
+                decode_gradients_into(grad_bytes, self.layout, self._scratch)
+            else:
+                decode_weight_deltas_into(grad_bytes, self.layout, self._scratch)
+            self.clipped += clip_norm(self._scratch, self.clip_norm)
+            self._scratch *= np.float32(num_samples)
+            np.add(self._sum, self._scratch, out=self._sum)
+        elif wire:
+            decode_gradients_into(
+                grad_bytes, self.layout, self._sum, scale=num_samples, accumulate=True,
+            )
+        elif encoded:
+            accumulate_encoded_into(grad_bytes, self.layout, self._sum, scale=num_samples)
+        else:
+            decode_weight_deltas_into(grad_bytes, self.layout, self._scratch, scale=num_samples)
+            np.add(self._sum, self._scratch, out=self._sum)
+        self.total_samples += num_samples
+        self.count += 1
+
+    def result_vector(self) -> np.ndarray | None:
+        """Weighted average as one flat vector, or None if nothing was folded in."""
+        if self._sum is None or self.total_samples == 0:
+            return None
+        return self._sum / np.float32(self.total_samples)
+
+    def result(self) -> dict[str, np.ndarray]:
+        """Weighted average as per-layer views into a flat vector."""
+        vec = self.result_vector()
+        if vec is None:
+            return {}
+        return self.layout.unflatten(vec)
+
+
+class MatrixAccumulator:
+    """Batched FedAvg: stacks client deltas into one (N x P) float32 matrix.
+
+    Each payload is decoded straight into its row of a preallocated matrix and
+    the weighted average is a single `weights @ matrix` GEMV at round close.
+    Costs N model-sized rows of memory instead of one, but keeps every client
+    delta around for statistics across clients (median, trimmed mean, ...).
+    For the plain mean it is no faster than FedAvgAccumulator: decoding the
+    payloads dominates either way (see scripts/bench_aggregation.py).
+
+    `reducer` replaces the weighted average with a robust rule over the
+    matrix (see robust_aggregation); `clip_norm` scales rows down to that L2
+    norm before either.
+
+    Exposes the same add/result interface as FedAvgAccumulator.
+    """
+
+    def __init__(
+        self, layout: FlatLayout, capacity: int = 8,
+        reducer: Callable[[np.ndarray], np.ndarray] | None = None,
+        clip_norm: float | None = None,
+    ) -> None:
+        self.layout = layout
+        self.reducer = reducer
+        self.clip_norm = clip_norm
+        self._matrix = np.empty((max(capacity, 1), layout.size), dtype=np.float32)
+        self._samples: list[int] = []
+        self.clipped = 0
+
+    @property
+    def count(self) -> int:
+        return len(self._samples)
+
+    @property
+    def total_samples(self) -> int:
+        return sum(self._samples)
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """The (count x P) matrix of client deltas collected so far."""
+        return self._matrix[: self.count]
+
+    @property
+    def sample_counts(self) -> np.ndarray:
+        return np.asarray(self._samples, dtype=np.float32)
+
+    def add(self, grad_bytes: bytes, num_samples: int, wire: bool = False) -> None:
+        """Decode one device's serialized deltas into the next matrix row."""
+        if num_samples <= 0:
+            return
+        if self.count == self._matrix.shape[0]:
+            grown = np.empty((self.count * 2, self.layout.size), dtype=np.float32)
+            grown[: self.count] = self._matrix
+            self._matrix = grown
+
+        if wire:
+            decode_gradients_into(grad_bytes, self.layout, self._matrix[self.count])
+        else:
+            decode_weight_deltas_into(grad_bytes, self.layout, self._matrix[self.count])
+        self._samples.append(num_samples)
+
+    def result_vector(self) -> np.ndarray | None:
+        """Aggregate as one flat vector, or None if nothing was added."""
+        if self.count == 0:
+            return None
+        if self.clip_norm is not None:
+            self.clipped = clip_rows(self.matrix, self.clip_norm)
+        if self.reducer is not None:
+            return self.reducer(self.matrix)
+        weights = self.sample_counts
+        weights /= weights.sum()
+        return weights @ self.matrix
+
+    def result(self) -> dict[str, np.ndarray]:
+        """Weighted average as per-layer views into a flat vector."""
+        vec = self.result_vector()
+        if vec is None:
+            return {}
+        return self.layout.unflatten(vec)
+
+
+AGGREGATION_MODES = ("streaming", "matrix")
+AGGREGATION_RULES = ("mean", *ROBUST_RULES)
+
+
+@dataclass
+class AggregationConfig:
+    """Per-job aggregation settings, read from `TrainingJob.config["aggregation"]`.
+
+    mode:
+      "streaming" -- fold each payload into a running sum as it arrives (default)
+      "matrix"    -- stack all payloads and reduce them at round close; needed
+                     by the robust rules, not a speedup for the mean
+    rule:
+      "mean" (sample-weighted FedAvg, default), or one of the Byzantine-robust
+      rules "median", "trimmed_mean" (trim_fraction per end) and "krum"
+      (multi-Krum tolerating num_byzantine clients, averaging num_selected).
+      Robust rules need every client delta and imply mode "matrix". Krum
+      needs 2 * num_byzantine + 3 reports; rounds that close with fewer
+      fall back to the median.
+    clip_norm:
+      optional L2 bound each client delta is scaled down to; works in both modes.
+    """
+
+    mode: str = "streaming"
+    rule: str = "mean"
+    trim_fraction: float = 0.1
+    num_byzantine: int = 0
+    num_selected: int | None = None
+    clip_norm: float | None = None
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES
+
+    @classmethod
+    def from_job_config(
+        cls, config: dict | None, min_devices: int | None = None
+    ) -> AggregationConfig:
+        if not config:
+            return cls()
+        agg = config.get("aggregation", {})
+        if not agg:
+            return cls()
+        rule = agg.get("rule", "mean")
+        if rule not in AGGREGATION_RULES:
+            raise ValueError(
+                f"Unknown aggregation rule: {rule!r}. Available: {list(AGGREGATION_RULES)}"
+            )
+        mode = agg.get("mode", "streaming" if rule == "mean" else "matrix")
+        if mode not in AGGREGATION_MODES:
+            raise ValueError(
+                f"Unknown aggregation mode: {mode!r}. Available: {list(AGGREGATION_MODES)}"
+            )
+        if rule != "mean" and mode != "matrix":
+            raise ValueError(f"Aggregation rule {rule!r} requires mode 'matrix'")
+        trim_fraction = agg.get("trim_fraction", 0.1)
+        if not 0.0 <= trim_fraction < 0.5:
+            raise ValueError("trim_fraction must be in [0, 0.5)")
+        clip = agg.get("clip_norm")
+        if clip is not None and clip <= 0:
+            raise ValueError("clip_norm must be > 0")
+        num_byzantine = agg.get("num_byzantine", 0)
+        if num_byzantine < 0:
+            raise ValueError("num_byzantine must be >= 0")
+        if rule == "krum" and min_devices is not None and min_devices < 2 * num_byzantine + 3:
+            raise ValueError(
+                f"Krum with num_byzantine={num_byzantine} needs min_devices >= "
+                f"{2 * num_byzantine + 3}, got {min_devices}"
+            )
+        return cls(
+            mode=mode,
+            rule=rule,
+            trim_fraction=trim_fraction,
+            num_byzantine=num_byzantine,
+            num_selected=agg.get("num_selected"),
+            clip_norm=clip,
+            chunk_bytes=agg.get("chunk_bytes", DEFAULT_CHUNK_BYTES),
+        )
+
+    def make_reducer(self) -> Callable[[np.ndarray], np.ndarray] | None:
+        """Robust reduction of the client matrix, or None for the weighted mean."""
+        if self.rule == "median":
+            return partial(coordinate_median, chunk_bytes=self.chunk_bytes)
+        if self.rule == "trimmed_mean":
+            return partial(
+                trimmed_mean, trim_fraction=self.trim_fraction, chunk_bytes=self.chunk_bytes
+            )
+        if self.rule == "krum":
+            return self._krum
+        return None
+
+    def _krum(self, matrix: np.ndarray) -> np.ndarray:
+        needed = 2 * self.num_byzantine + 3
+        if matrix.shape[0] < needed:
+            # A quorum or timeout close can leave too few reports for Krum
+            logger.warning(
+                "krum_too_few_clients_using_median", clients=matrix.shape[0], needed=needed,
+            )
+            return coordinate_median(matrix, chunk_bytes=self.chunk_bytes)
+        return multi_krum(matrix, self.num_byzantine, self.num_selected, self.chunk_bytes)[0]
+
+    def make_accumulator(
+        self, layout: FlatLayout, expected: int,
+    ) -> FedAvgAccumulator | MatrixAccumulator:
+        if self.mode == "matrix":
+            return MatrixAccumulator(
+                layout, capacity=expected, reducer=self.make_reducer(), clip_norm=self.clip_norm,
+            )
+        return FedAvgAccumulator(layout, clip_norm=self.clip_norm)
 
 
 def aggregate_gradients(gradients: list[tuple[bytes, int]]) -> dict[str, np.ndarray]:
     """FedAvg: weighted average of gradient deltas from multiple devices."""
-    total_samples = sum(n for _, n in gradients)
-    if total_samples == 0:
-        return {}
-
-    accumulated: dict[str, np.ndarray] = {}
+    accumulator = FedAvgAccumulator()
     for grad_bytes, num_samples in gradients:
-        deltas = deserialize_weight_deltas(grad_bytes)
-        weight = num_samples / total_samples
-        for name, values in deltas.items():
-            if name in accumulated:
-                accumulated[name] += values * weight
-            else:
-                accumulated[name] = values * weight
+        accumulator.add(grad_bytes, num_samples)
+    return accumulator.result()
 
-    return accumulated
+
+def aggregate_gradients_matrix(
+    gradients: list[tuple[bytes, int]], layout: FlatLayout,
+) -> np.ndarray | None:
+    """Batched FedAvg over a full round: stack all payloads, reduce with one GEMV."""
+    accumulator = MatrixAccumulator(layout, capacity=len(gradients))
+    for grad_bytes, num_samples in gradients:
+        accumulator.add(grad_bytes, num_samples)
+    return accumulator.result_vector()
 
 
 def apply_gradients(
@@ -102,3 +405,9 @@ def apply_gradients(
         else:
             result[name] = w.copy()
     return result
+
+
+def apply_gradients_flat(weights: np.ndarray, grads: np.ndarray) -> np.ndarray:
+    """Flat-vector counterpart of apply_gradients: adds the averaged delta in place."""
+    np.add(weights, grads, out=weights)
+    return weights
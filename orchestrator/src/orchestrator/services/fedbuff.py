@@ -0,0 +1,115 @@
+"""Asynchronous buffered federated training (FedBuff, Nguyen et al. 2022).
+
+In synchronous rounds the slowest selected device gates everyone. In async
+mode devices are kept busy instead: every idle device is handed the latest
+model, and its delta goes into a buffer as soon as it arrives. Every
+`buffer_size` contributions the server applies one update and bumps the
+model version; devices that finished keep training on whatever is newest.
+
+A device that trained on version `v` while the server moved on to `v + τ`
+contributes a stale delta; it is scaled by
+
+  s(τ) = 1 / (1 + τ) ** staleness_exponent
+
+and dropped altogether past `max_staleness`. Staleness is derived from the
+training round the device echoes back: a device dispatched for round `r`
+trained on model version `r - 1`.
+
+Enabled per job via `TrainingJob.config["async"]`, e.g.
+{"enabled": true, "buffer_size": 10}; `num_rounds` then counts server
+updates.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from orchestrator.services.fed_avg import FedAvgAccumulator, MatrixAccumulator
+
+# Longest the async loop blocks before re-checking stop flags, timeouts and
+# newly idle devices
+ASYNC_POLL_SECONDS = 5.0
+
+
+@dataclass
+class AsyncTrainingConfig:
+    """Per-job async settings, read from `TrainingJob.config["async"]`."""
+
+    enabled: bool = False
+    buffer_size: int = 10
+    # Devices training at once; None keeps every eligible online device busy
+    concurrency: int | None = None
+    staleness_exponent: float = 0.5
+    max_staleness: int = 10
+
+    @classmethod
+    def from_job_config(cls, config: dict | None) -> AsyncTrainingConfig:
+        if not config:
+            return cls()
+        cfg = config.get("async", {})
+        if not cfg:
+            return cls()
+        buffer_size = cfg.get("buffer_size", 10)
+        if buffer_size < 1:
+            raise ValueError("async buffer_size must be >= 1")
+        concurrency = cfg.get("concurrency")
+        if concurrency is not None and concurrency < 1:
+            raise ValueError("async concurrency must be >= 1")
+        max_staleness = cfg.get("max_staleness", 10)
+        if max_staleness < 0:
+            raise ValueError("async max_staleness must be >= 0")
+        return cls(
+            enabled=cfg.get("enabled", False),
+            buffer_size=buffer_size,
+            concurrency=concurrency,
+            staleness_exponent=cfg.get("staleness_exponent", 0.5),
+            max_staleness=max_staleness,
+        )
+
+    def staleness_weight(self, staleness: int) -> float:
+        return 1.0 / (1.0 + max(staleness, 0)) ** self.staleness_exponent
+
+
+class StalenessBuffer:
+    """Buffers contributions of one server update, scaled by their staleness.
+
+    Each delta is folded into `accumulator` with weight s(τ)·num_samples, and
+    the result is normalized by the unscaled sample total, so stale updates
+    are damped rather than merely reweighted against each other:
+
+      Δ = Σ s(τ_i)·n_i·Δ_i / Σ n_i
+    """
+
+    def __init__(
+        self, accumulator: FedAvgAccumulator | MatrixAccumulator, config: AsyncTrainingConfig,
+    ) -> None:
+        self.accumulator = accumulator
+        self.config = config
+        self.raw_samples = 0
+        self.staleness: list[int] = []
+
+    @property
+    def count(self) -> int:
+        return self.accumulator.count
+
+    def add(
+        self, grad_bytes: bytes, num_samples: int, wire: bool = False, staleness: int = 0
+    ) -> None:
+        if num_samples <= 0:
+            return
+        before = self.accumulator.count
+        self.accumulator.add(
+            grad_bytes, num_samples * self.config.staleness_weight(staleness), wire=wire,
+        )
+        if self.accumulator.count > before:
+            self.raw_samples += num_samples
+            self.staleness.append(staleness)
+
+    def result_vector(self) -> np.ndarray | None:
+        vec = self.accumulator.result_vector()
+        if vec is None or self.raw_samples == 0:
+            return None
+        vec *= np.float32(self.accumulator.total_samples / self.raw_samples)
+        return vec
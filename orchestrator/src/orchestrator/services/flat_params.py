@@ -0,0 +1,104 @@
+"""Flat, contiguous parameter-vector representation of a model.
+
+All layers of a model live back to back in one float32 vector. A FlatLayout
+maps each layer name to its [offset, offset + size) slice and its shape, so
+aggregation math runs as a few whole-vector numpy ops instead of one small
+op (and allocation) per layer per device.
+
+Layer order follows ModelArchitecture.layer_names, which is also the order
+layers appear in the binary weight-delta format.
+"""
+
+from __future__ import annotations
+
+import struct
+from dataclasses import dataclass, field
+from functools import cache
+
+import numpy as np
+
+from orchestrator.services.model_registry import get_architecture
+
+
+@dataclass(frozen=True)
+class LayerSlice:
+    name: str
+    offset: int
+    size: int
+    shape: tuple[int, ...]
+
+    @property
+    def stop(self) -> int:
+        return self.offset + self.size
+
+
+@dataclass(frozen=True)
+class FlatLayout:
+    layers: tuple[LayerSlice, ...]
+    size: int
+    _by_name: dict[str, LayerSlice] = field(init=False, repr=False, compare=False)
+
+    @classmethod
+    def from_shapes(cls, shapes: dict[str, tuple[int, ...]]) -> FlatLayout:
+        layers = []
+        offset = 0
+        for name, shape in shapes.items():
+            size = int(np.prod(shape))
+            layers.append(LayerSlice(name, offset, size, tuple(shape)))
+            offset += size
+        return cls(tuple(layers), offset)
+
+    @classmethod
+    def from_payload(cls, data: bytes) -> FlatLayout:
+        """Build a 1-D layout from the layer headers of a weight-delta payload."""
+        shapes: dict[str, tuple[int, ...]] = {}
+        offset = 0
+        (layer_count,) = struct.unpack_from("<I", data, offset)
+        offset += 4
+        for _ in range(layer_count):
+            (name_len,) = struct.unpack_from("<I", data, offset)
+            offset += 4
+            name = data[offset : offset + name_len].decode("utf-8")
+            offset += name_len
+            (elem_count,) = struct.unpack_from("<I", data, offset)
+            offset += 4 + elem_count * 4
+            shapes[name] = (elem_count,)
+        return cls.from_shapes(shapes)
+
+    def __post_init__(self) -> None:
+        # frozen dataclass: populate the derived lookup table directly
+        object.__setattr__(self, "_by_name", {layer.name: layer for layer in self.layers})
+
+    @property
+    def names(self) -> list[str]:
+        return [layer.name for layer in self.layers]
+
+    def get(self, name: str) -> LayerSlice | None:
+        return self._by_name.get(name)
+
+    def zeros(self) -> np.ndarray:
+        return np.zeros(self.size, dtype=np.float32)
+
+    def flatten(self, weights: dict[str, np.ndarray], out: np.ndarray | None = None) -> np.ndarray:
+        """Copy per-layer arrays into one contiguous vector (layers not given stay zero)."""
+        vec = self.zeros() if out is None else out
+        for layer in self.layers:
+            if layer.name in weights:
+                np.copyto(vec[layer.offset : layer.stop], np.ravel(weights[layer.name]))
+            elif out is not None:
+                vec[layer.offset : layer.stop] = 0.0
+        return vec
+
+    def unflatten(self, vec: np.ndarray) -> dict[str, np.ndarray]:
+        """Per-layer views into `vec` (no copies); writes go straight to the vector."""
+        return {
+            layer.name: vec[layer.offset : layer.stop].reshape(layer.shape)
+            for layer in self.layers
+        }
+
+
+@cache
+def get_layout(architecture: str) -> FlatLayout:
+    """Layout for a registered architecture, derived from its layer_shapes."""
+    arch = get_architecture(architecture)
+    return FlatLayout.from_shapes({name: arch.layer_shapes[name] for name in arch.layer_names})
@@ -1,11 +1,49 @@
-"""Gradient compression codec: float16 quantization + lz4 block compression.
+"""Gradient compression codecs.
 
-Wire format (compressed):
+Version 0x01 -- float16 quantization + lz4 block compression:
   [magic: 1 byte = 0x01]
   [original_size: uint32_le]      # decompressed float16 payload size
   [lz4_block_compressed(float16_binary_payload)]
 
-If the first byte is NOT 0x01, the payload is treated as legacy float32 binary
+Version 0x02 -- top-k sparsification (largest-magnitude entries per layer):
+  [magic: 1 byte = 0x02]["TK"][reserved: 1 byte = 0x00]
+  [layer_count: uint32_le]
+  For each layer:
+    [name_length: uint32_le]
+    [name: utf8_bytes]
+    [element_count: uint32_le]    # dense layer size
+    [k: uint32_le]
+    [indices: uint32_le x k]      # ascending, unique
+    [values: float16_le x k]
+
+  The "TK" tag tells a top-k payload apart from a legacy float32 payload that
+  happens to have 2 layers (whose header starts 02 00 00 00). Clients are
+  expected to keep the dropped mass as an error-feedback residual for their
+  next round.
+
+Version 0x03 -- per-layer affine quantization to 8 or 4 bits:
+  [magic: 1 byte = 0x03]["Q"][bits: 1 byte = 8 or 4][reserved: 1 byte = 0x00]
+  [layer_count: uint32_le]
+  For each layer:
+    [name_length: uint32_le]
+    [name: utf8_bytes]
+    [element_count: uint32_le]
+    [scale: float32_le]
+    [zero_point: float32_le]
+    [codes: uint8 x element_count]              # bits = 8
+            uint8 x ceil(element_count / 2)     # bits = 4, low nibble first
+
+  value = zero_point + code x scale. Codes are rounded stochastically (up
+  with probability equal to the fractional part), so every dequantized value
+  is an unbiased estimate of the original and the rounding noise averages
+  out across clients instead of biasing the update.
+
+Top-k and quantized payloads are NOT densified on receipt: the aggregator
+decodes them straight into its float32 accumulator (see
+accumulate_encoded_into), so no float32 copy of a client's update is ever
+built.
+
+If the payload carries neither magic, it is treated as legacy float32 binary
 (backward compatible).
 
 The float16 binary layout mirrors the float32 format from fed_avg.py:
@@ -17,12 +55,25 @@ The float16 binary layout mirrors the float32 format from fed_avg.py:
     [values: float16_le × element_count]   # 2 bytes per element
 """
 
+from __future__ import annotations
+
 import struct
+from collections.abc import Iterator
+from typing import TYPE_CHECKING
 
 import lz4.block
 import numpy as np
 
+if TYPE_CHECKING:
+    from orchestrator.services.flat_params import FlatLayout, LayerSlice
+
 MAGIC = 0x01
+TOPK_MAGIC = 0x02
+TOPK_HEADER = bytes((TOPK_MAGIC,)) + b"TK\x00"
+QUANT_MAGIC = 0x03
+QUANT_BITS = (8, 4)
+# Elements dequantized per step, bounding the temporary float32 buffer
+_DEQUANT_BLOCK = 1 << 16
 
 
 def compress_gradients(raw_float32_binary: bytes) -> bytes:
@@ -37,64 +88,339 @@ def decompress_gradients(data: bytes) -> bytes:
     """Detect magic byte; decompress lz4 + dequantize float16→float32, or passthrough."""
     if len(data) < 1 or data[0] != MAGIC:
         return data  # legacy float32 passthrough
+    return _dequantize_f16_to_f32(_decompress_f16(data))
 
-    original_size = struct.unpack_from("<I", data, 1)[0]
-    compressed_payload = data[5:]
-    f16_payload = lz4.block.decompress(compressed_payload, uncompressed_size=original_size)
-    return _dequantize_f16_to_f32(f16_payload)
 
+def decode_gradients_into(
+    data: bytes, layout: FlatLayout, out: np.ndarray, scale: float = 1.0,
+    accumulate: bool = False,
+) -> None:
+    """Decode a payload as a device sent it straight into the flat float32 vector `out`.
 
-def _quantize_f32_to_f16(data: bytes) -> bytes:
-    """Convert float32 values to float16 in the binary gradient format."""
-    offset = 0
-    (layer_count,) = struct.unpack_from("<I", data, offset)
-    offset += 4
+    Handles every codec version in one pass: a float16 payload is
+    lz4-decompressed once and each layer is converted and scaled from its
+    float16 view into its slice of `out`, without rebuilding a float32 byte
+    string or parsing anything twice. Layer headers are validated against
+    `layout` as they are read.
+
+    By default `out` is overwritten (layers the payload does not carry are
+    zeroed); with `accumulate` the values are added to it.
+    """
+    if is_encoded(data):
+        if not accumulate:
+            out[:] = 0.0
+        accumulate_encoded_into(data, layout, out, scale)
+    elif data[:1] == bytes((MAGIC,)):
+        write_layers_into(iter_layers(_decompress_f16(data), "<f2"), layout, out, scale, accumulate)
+    else:
+        write_layers_into(iter_layers(data, "<f4"), layout, out, scale, accumulate)
+
+
+def iter_layers(data: bytes, dtype: str = "<f4") -> Iterator[tuple[str, np.ndarray]]:
+    """Yield (layer_name, values) of a dense payload as read-only views into `data`."""
+    for name, _, value_offset, elem_count in _layer_spans(data, np.dtype(dtype).itemsize):
+        yield name, np.frombuffer(data, dtype=dtype, count=elem_count, offset=value_offset)
+
+
+def write_layers_into(
+    layers: Iterator[tuple[str, np.ndarray]], layout: FlatLayout, out: np.ndarray,
+    scale: float = 1.0, accumulate: bool = False,
+) -> None:
+    """Write (or add) per-layer values, times `scale`, into their slices of `out`.
+
+    Every layer is validated before anything is written, so a bad payload
+    never leaves `out` half-updated.
+    """
+    validated = [(_layer_slice(layout, name, values.size), values) for name, values in layers]
+    present: set[str] = set()
+    for layer, values in validated:
+        dst = out[layer.offset : layer.stop]
+        if not accumulate:
+            # Casts run through the ufunc's small internal buffers, never a
+            # full-size temporary; a float32 scalar keeps the math in float32
+            if scale == 1.0:
+                np.copyto(dst, values, casting="unsafe")
+            else:
+                np.multiply(values, np.float32(scale), out=dst, casting="unsafe")
+        elif values.dtype == np.float32 and scale == 1.0:
+            dst += values
+        else:
+            _add_scaled_blocks(dst, values, np.float32(scale))
+        present.add(layer.name)
+    if not accumulate and len(present) != len(layout.layers):
+        for layer in layout.layers:
+            if layer.name not in present:
+                out[layer.offset : layer.stop] = 0.0
+
+
+def is_topk(data: bytes) -> bool:
+    return data[:4] == TOPK_HEADER
 
-    parts: list[bytes] = [struct.pack("<I", layer_count)]
 
+def compress_gradients_topk(raw_float32_binary: bytes, ratio: float = 0.01) -> bytes:
+    """Keep the `ratio` largest-magnitude entries of every layer (at least one)."""
+    layers = list(iter_layers(raw_float32_binary))
+    parts: list[bytes] = [TOPK_HEADER, struct.pack("<I", len(layers))]
+    for name, values in layers:
+        k = min(values.size, max(1, round(values.size * ratio)))
+        if k < values.size:
+            indices = np.argpartition(np.abs(values), values.size - k)[values.size - k :]
+            indices.sort()
+        else:
+            indices = np.arange(values.size)
+        name_bytes = name.encode("utf-8")
+        parts.append(struct.pack("<I", len(name_bytes)))
+        parts.append(name_bytes)
+        parts.append(struct.pack("<II", values.size, k))
+        parts.append(indices.astype("<u4").tobytes())
+        parts.append(values[indices].astype("<f2").tobytes())
+    return b"".join(parts)
+
+
+def iter_topk(data: bytes) -> Iterator[tuple[str, int, np.ndarray, np.ndarray]]:
+    """Yield (layer_name, element_count, indices, float16 values) as views into `data`."""
+    if not is_topk(data):
+        raise ValueError("Not a top-k gradient payload")
+    offset = len(TOPK_HEADER)
+    (layer_count,) = struct.unpack_from("<I", data, offset)
+    offset += 4
     for _ in range(layer_count):
         (name_len,) = struct.unpack_from("<I", data, offset)
         offset += 4
-        name = data[offset : offset + name_len]
+        name = data[offset : offset + name_len].decode("utf-8")
         offset += name_len
-        (elem_count,) = struct.unpack_from("<I", data, offset)
-        offset += 4
+        elem_count, k = struct.unpack_from("<II", data, offset)
+        offset += 8
+        indices = np.frombuffer(data, dtype="<u4", count=k, offset=offset)
+        offset += k * 4
+        values = np.frombuffer(data, dtype="<f2", count=k, offset=offset)
+        offset += k * 2
+        yield name, elem_count, indices, values
+
+
+def scatter_topk_into(
+    data: bytes, layout: FlatLayout, out: np.ndarray, scale: float = 1.0,
+) -> None:
+    """Add a top-k payload's values, times `scale`, into the flat vector `out`.
 
-        values_f32 = np.frombuffer(data, dtype=np.float32, count=elem_count, offset=offset)
-        offset += elem_count * 4
-        values_f16 = values_f32.astype(np.float16)
+    Only the k transmitted entries per layer are touched; the payload is never
+    expanded into a dense per-device buffer. Nothing is written unless every
+    layer is valid.
+    """
+    validated = []
+    for name, elem_count, indices, values in iter_topk(data):
+        layer = _layer_slice(layout, name, elem_count)
+        if np.any(np.diff(indices.astype(np.int64)) <= 0):
+            raise ValueError(f"Layer {name!r} has indices that are not ascending and unique")
+        if indices.size and int(indices[-1]) >= elem_count:
+            raise ValueError(f"Layer {name!r} has an index out of range")
+        validated.append((layer, indices, values))
+    for layer, indices, values in validated:
+        # Indices are unique (checked above), so a fancy-indexed += drops nothing
+        out[layer.offset + indices.astype(np.intp)] += values.astype(np.float32) * np.float32(scale)
 
-        parts.append(struct.pack("<I", name_len))
-        parts.append(name)
-        parts.append(struct.pack("<I", elem_count))
-        parts.append(values_f16.tobytes())
 
+def is_quantized(data: bytes) -> bool:
+    return (
+        len(data) >= 4 and data[0] == QUANT_MAGIC and data[1:2] == b"Q"
+        and data[2] in QUANT_BITS and data[3] == 0
+    )
+
+
+def compress_gradients_quantized(
+    raw_float32_binary: bytes, bits: int = 8, rng: np.random.Generator | None = None,
+) -> bytes:
+    """Quantize every layer to `bits` (8 or 4) with stochastic rounding."""
+    if bits not in QUANT_BITS:
+        raise ValueError(f"Unsupported quantization width: {bits} (expected one of {QUANT_BITS})")
+    rng = rng if rng is not None else np.random.default_rng()
+    levels = (1 << bits) - 1
+
+    layers = list(iter_layers(raw_float32_binary))
+    parts: list[bytes] = [
+        bytes((QUANT_MAGIC,)) + b"Q" + bytes((bits, 0)),
+        struct.pack("<I", len(layers)),
+    ]
+    for name, values in layers:
+        zero_point = values.min() if values.size else np.float32(0.0)
+        step = (
+            np.float32((float(values.max()) - float(zero_point)) / levels)
+            if values.size
+            else np.float32(0.0)
+        )
+        if step > 0:
+            scaled = (values - zero_point) / step
+            scaled += rng.random(values.size, dtype=np.float32)
+            codes = np.clip(np.floor(scaled, out=scaled), 0, levels).astype(np.uint8)
+        else:
+            codes = np.zeros(values.size, dtype=np.uint8)
+        if bits == 4:
+            if codes.size % 2:
+                codes = np.append(codes, np.uint8(0))
+            codes = codes[0::2] | (codes[1::2] << 4)
+        name_bytes = name.encode("utf-8")
+        parts.append(struct.pack("<I", len(name_bytes)))
+        parts.append(name_bytes)
+        parts.append(struct.pack("<Iff", values.size, step, zero_point))
+        parts.append(codes.tobytes())
     return b"".join(parts)
 
 
-def _dequantize_f16_to_f32(data: bytes) -> bytes:
-    """Convert float16 values back to float32 in the binary gradient format."""
-    offset = 0
+def iter_quantized(data: bytes) -> Iterator[tuple[str, int, float, float, np.ndarray, int]]:
+    """Yield (layer_name, element_count, scale, zero_point, codes, bits); codes view `data`."""
+    if not is_quantized(data):
+        raise ValueError("Not a quantized gradient payload")
+    bits = data[2]
+    offset = 4
     (layer_count,) = struct.unpack_from("<I", data, offset)
     offset += 4
+    for _ in range(layer_count):
+        (name_len,) = struct.unpack_from("<I", data, offset)
+        offset += 4
+        name = bytes(data[offset : offset + name_len]).decode("utf-8")
+        offset += name_len
+        elem_count, step, zero_point = struct.unpack_from("<Iff", data, offset)
+        offset += 12
+        code_bytes = elem_count if bits == 8 else (elem_count + 1) // 2
+        codes = np.frombuffer(data, dtype=np.uint8, count=code_bytes, offset=offset)
+        offset += code_bytes
+        yield name, elem_count, step, zero_point, codes, bits
+
+
+def accumulate_quantized_into(
+    data: bytes, layout: FlatLayout, out: np.ndarray, scale: float = 1.0,
+) -> None:
+    """Add a quantized payload's dequantized values, times `scale`, into `out`.
+
+    Dequantization is fused with the accumulation and runs in fixed-size
+    blocks, so memory use does not grow with the layer size. Nothing is
+    written unless every layer is valid.
+    """
+    validated = [
+        (_layer_slice(layout, name, elem_count), elem_count, step, zero_point, codes, bits)
+        for name, elem_count, step, zero_point, codes, bits in iter_quantized(data)
+    ]
+    for layer, elem_count, step, zero_point, codes, bits in validated:
+        dst = out[layer.offset : layer.offset + elem_count]
+        mul = np.float32(step * scale)
+        add = np.float32(zero_point * scale)
+        if bits == 8:
+            _add_scaled_blocks(dst, codes, mul, add)
+            continue
+        block = np.empty(min(_DEQUANT_BLOCK, elem_count), dtype=np.float32)
+        for start in range(0, elem_count, _DEQUANT_BLOCK):
+            stop = min(start + _DEQUANT_BLOCK, elem_count)
+            buf = block[: stop - start]
+            np.multiply(_unpack_nibbles(codes, start, stop), mul, out=buf)
+            buf += add
+            dst[start:stop] += buf
+
+
+def is_encoded(data: bytes) -> bool:
+    """Whether the aggregator has to decode `data` (top-k or quantized) rather than read it."""
+    return is_topk(data) or is_quantized(data)
+
+
+def encoded_shapes(data: bytes) -> dict[str, tuple[int, ...]]:
+    """1-D dense shapes of the layers of a top-k or quantized payload."""
+    if is_topk(data):
+        return {name: (elem_count,) for name, elem_count, _, _ in iter_topk(data)}
+    return {name: (elem_count,) for name, elem_count, *_ in iter_quantized(data)}
+
+
+def accumulate_encoded_into(
+    data: bytes, layout: FlatLayout, out: np.ndarray, scale: float = 1.0,
+) -> None:
+    """Add a top-k or quantized payload, times `scale`, into the flat vector `out`."""
+    if is_topk(data):
+        scatter_topk_into(data, layout, out, scale)
+    else:
+        accumulate_quantized_into(data, layout, out, scale)
 
-    parts: list[bytes] = [struct.pack("<I", layer_count)]
 
+def _layer_slice(layout: FlatLayout, name: str, elem_count: int) -> LayerSlice:
+    layer = layout.get(name)
+    if layer is None:
+        raise ValueError(f"Unexpected layer in gradients: {name!r}")
+    if elem_count != layer.size:
+        raise ValueError(f"Layer {name!r} has {elem_count} values, expected {layer.size}")
+    return layer
+
+
+def _add_scaled_blocks(
+    dst: np.ndarray, values: np.ndarray, mul: np.float32, add: np.float32 | None = None,
+) -> None:
+    """dst += values * mul (+ add), through one block-sized float32 buffer."""
+    block = np.empty(min(_DEQUANT_BLOCK, values.size), dtype=np.float32)
+    for start in range(0, values.size, _DEQUANT_BLOCK):
+        stop = min(start + _DEQUANT_BLOCK, values.size)
+        buf = block[: stop - start]
+        np.multiply(values[start:stop], mul, out=buf, casting="unsafe")
+        if add is not None:
+            buf += add
+        dst[start:stop] += buf
+
+
+def _unpack_nibbles(codes: np.ndarray, start: int, stop: int) -> np.ndarray:
+    """4-bit codes of elements [start, stop); `start` is a multiple of _DEQUANT_BLOCK (even)."""
+    packed = codes[start // 2 : (stop + 1) // 2]
+    unpacked = np.empty(packed.size * 2, dtype=np.uint8)
+    np.bitwise_and(packed, 0x0F, out=unpacked[0::2])
+    np.right_shift(packed, 4, out=unpacked[1::2])
+    return unpacked[: stop - start]
+
+
+def _decompress_f16(data: bytes) -> bytes:
+    (original_size,) = struct.unpack_from("<I", data, 1)
+    try:
+        return lz4.block.decompress(memoryview(data)[5:], uncompressed_size=original_size)
+    except lz4.block.LZ4BlockError as e:
+        raise ValueError(f"Corrupt float16 gradient payload: {e}") from e
+
+
+def _layer_spans(data: bytes, itemsize: int) -> Iterator[tuple[str, int, int, int]]:
+    """Yield (name, header_offset, value_offset, element_count) for each layer."""
+    offset = 0
+    (layer_count,) = struct.unpack_from("<I", data, offset)
+    offset += 4
     for _ in range(layer_count):
+        header_offset = offset
         (name_len,) = struct.unpack_from("<I", data, offset)
         offset += 4
-        name = data[offset : offset + name_len]
+        name = bytes(data[offset : offset + name_len]).decode("utf-8")
         offset += name_len
         (elem_count,) = struct.unpack_from("<I", data, offset)
         offset += 4
+        if offset + elem_count * itemsize > len(data):
+            raise ValueError(f"Layer {name!r} is truncated")
+        yield name, header_offset, offset, elem_count
+        offset += elem_count * itemsize
 
-        values_f16 = np.frombuffer(data, dtype=np.float16, count=elem_count, offset=offset)
-        offset += elem_count * 2
-        values_f32 = values_f16.astype(np.float32)
 
-        parts.append(struct.pack("<I", name_len))
-        parts.append(name)
-        parts.append(struct.pack("<I", elem_count))
-        parts.append(values_f32.tobytes())
+def _convert_layers(data: bytes, src: str, dst: str) -> bytes:
+    """Re-encode the values of a dense payload, writing straight into one output buffer."""
+    src_size, dst_size = np.dtype(src).itemsize, np.dtype(dst).itemsize
+    spans = list(_layer_spans(data, src_size))
+    total = len(data) + sum(count for *_, count in spans) * (dst_size - src_size)
+    out = bytearray(total)
+    out[:4] = data[:4]
+    shift = 0  # output offset minus input offset
+    for _, header_offset, value_offset, elem_count in spans:
+        out[header_offset + shift : value_offset + shift] = data[header_offset:value_offset]
+        np.copyto(
+            np.frombuffer(out, dtype=dst, count=elem_count, offset=value_offset + shift),
+            np.frombuffer(data, dtype=src, count=elem_count, offset=value_offset),
+            casting="unsafe",
+        )
+        shift += elem_count * (dst_size - src_size)
+    return bytes(out)
 
-    return b"".join(parts)
+
+def _quantize_f32_to_f16(data: bytes) -> bytes:
+    """Convert float32 values to float16 in the binary gradient format."""
+    return _convert_layers(data, "<f4", "<f2")
+
+
+def _dequantize_f16_to_f32(data: bytes) -> bytes:
+    """Convert float16 values back to float32 in the binary gradient format."""
+    return _convert_layers(data, "<f2", "<f4")
@@ -1,19 +1,23 @@
 import asyncio
 import json
+import time
 import uuid
 from datetime import datetime, timezone
 
 import structlog
 from redis.asyncio import Redis
-from sqlalchemy.ext.asyncio import AsyncSession
 
 from orchestrator.config import settings
 from orchestrator.db.engine import async_session
 from orchestrator.db.repositories import DeviceRepository
 from orchestrator.observability.metrics import HEARTBEATS_TOTAL
+from orchestrator.services.device_state_cache import DeviceStateCache
 
 logger = structlog.get_logger()
 
+# Sorted set of device_id -> unix time of the last heartbeat; staleness is one range query
+LAST_SEEN_KEY = "heartbeats:last_seen"
+
 
 class HeartbeatMonitor:
     def __init__(self, redis: Redis) -> None:
@@ -21,31 +25,33 @@ class HeartbeatMonitor:
         self.timeout_seconds = (
             settings.heartbeat_interval_seconds * settings.heartbeat_timeout_multiplier
         )
+        self.state_cache = DeviceStateCache()
 
     async def process_heartbeat(
-        self, session: AsyncSession, device_id: uuid.UUID, metrics: dict,
+        self, device_id: uuid.UUID, metrics: dict,
         battery_level: float | None = None, battery_state: str | None = None,
         is_low_power_mode: bool | None = None,
     ) -> None:
+        """Record a heartbeat: liveness goes to Redis, telemetry to the write-behind cache.
+
+        The devices table is updated by the cache's background flusher, not here.
+        """
         HEARTBEATS_TOTAL.inc()
-        key = f"heartbeat:{device_id}"
-        await self.redis.set(key, datetime.now(timezone.utc).isoformat(), ex=self.timeout_seconds)
-
-        repo = DeviceRepository(session)
-        current = await repo.get(device_id)
-        update_kwargs: dict = {}
-        if not current or current.status != "training":
-            update_kwargs["status"] = "online"
-        if battery_level is not None:
-            update_kwargs["battery_level"] = battery_level
-        if battery_state is not None:
-            update_kwargs["battery_state"] = battery_state
-        if update_kwargs:
-            await repo.update(device_id, **update_kwargs)
-        if metrics and is_low_power_mode is not None:
-            metrics = {**metrics, "is_low_power_mode": is_low_power_mode}
-        if metrics:
-            await repo.update_metrics(device_id, metrics)
+        now = datetime.now(timezone.utc)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.set(f"heartbeat:{device_id}", now.isoformat(), ex=self.timeout_seconds)
+            pipe.zadd(LAST_SEEN_KEY, {str(device_id): now.timestamp()})
+            await pipe.execute()
+
+        self.state_cache.record(
+            device_id, metrics,
+            battery_level=battery_level,
+            battery_state=battery_state,
+            is_low_power_mode=is_low_power_mode,
+        )
+
+    async def run_state_flusher(self) -> None:
+        await self.state_cache.run_flusher()
 
     async def get_pending_command(self, device_id: str) -> dict | None:
         key = f"command:{device_id}"
@@ -58,8 +64,19 @@ class HeartbeatMonitor:
         key = f"command:{device_id}"
         await self.redis.rpush(key, json.dumps(command))
 
+    async def touch(self, device_id: uuid.UUID) -> None:
+        """Start tracking a device (e.g. on registration) before its first heartbeat."""
+        await self.redis.zadd(LAST_SEEN_KEY, {str(device_id): time.time()})
+
+    async def forget(self, device_id: uuid.UUID) -> None:
+        await self.redis.zrem(LAST_SEEN_KEY, str(device_id))
+
     async def run_stale_device_checker(self) -> None:
         logger.info("stale_device_checker_started", timeout=self.timeout_seconds)
+        try:
+            await self._seed_last_seen()
+        except Exception:
+            logger.exception("seed_last_seen_error")
         while True:
             try:
                 await self._check_stale_devices()
@@ -67,24 +84,42 @@ class HeartbeatMonitor:
                 logger.exception("stale_device_check_error")
             await asyncio.sleep(settings.heartbeat_interval_seconds)
 
+    async def _seed_last_seen(self) -> None:
+        """Track online/training devices that are not in the sorted set yet.
+
+        Covers devices that went silent while the orchestrator was down or
+        before the sorted set existed; NX keeps fresher heartbeat scores.
+        """
+        async with async_session() as session:
+            repo = DeviceRepository(session)
+            devices = await repo.list_all(status="online") + await repo.list_all(status="training")
+        scores = {}
+        for device in devices:
+            last_seen = device.last_seen_at or datetime.now(timezone.utc)
+            if last_seen.tzinfo is None:
+                last_seen = last_seen.replace(tzinfo=timezone.utc)
+            scores[str(device.id)] = last_seen.timestamp()
+        if scores:
+            await self.redis.zadd(LAST_SEEN_KEY, scores, nx=True)
+
     async def _check_stale_devices(self) -> None:
+        cutoff = time.time() - self.timeout_seconds
+        stale = await self.redis.zrangebyscore(LAST_SEEN_KEY, "-inf", cutoff)
+        if not stale:
+            return
+
+        device_ids = [
+            uuid.UUID(d.decode() if isinstance(d, bytes) else d) for d in stale
+        ]
         async with async_session() as session:
             repo = DeviceRepository(session)
-            online_devices = await repo.list_all(status="online")
-            training_devices = await repo.list_all(status="training")
-            for device in online_devices + training_devices:
-                key = f"heartbeat:{device.id}"
-                last_heartbeat = await self.redis.get(key)
-                if last_heartbeat is None:
-                    # No heartbeat key means device hasn't sent one or it expired
-                    now = datetime.now(timezone.utc)
-                    if device.last_seen_at:
-                        last_seen = device.last_seen_at.replace(tzinfo=timezone.utc) if device.last_seen_at.tzinfo is None else device.last_seen_at
-                        elapsed = (now - last_seen).total_seconds()
-                        if elapsed > self.timeout_seconds:
-                            await repo.update(device.id, status="offline")
-                            logger.info(
-                                "device_marked_offline",
-                                device_id=str(device.id),
-                                elapsed=elapsed,
-                            )
+            marked = await repo.bulk_update_status(
+                device_ids, "offline", from_statuses=("online", "training"),
+            )
+        # Same cutoff: a device that heartbeated since the range query keeps its entry
+        await self.redis.zremrangebyscore(LAST_SEEN_KEY, "-inf", cutoff)
+        logger.info(
+            "devices_marked_offline",
+            count=marked,
+            device_ids=[str(d) for d in device_ids[:20]],
+        )
@@ -0,0 +1,103 @@
+"""In-process LRU cache of model versions, pre-sliced into download chunks.
+
+When a round starts every selected device downloads the same model version
+at once. The cache keeps each version once, already cut into the chunk
+objects the DownloadModel stream sends, so all concurrent streams share one
+set of buffers instead of each loading, decoding and slicing the model.
+
+Keys are immutable version ids, e.g. `(model_id, digest)`: an entry never
+goes stale, it is only evicted (least recently used first) once the cache
+holds more than `max_bytes`. Concurrent misses on the same key share a
+single load.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+from orchestrator.observability.metrics import (
+    MODEL_CACHE_BYTES,
+    MODEL_CACHE_EVICTIONS_TOTAL,
+    MODEL_CACHE_HITS_TOTAL,
+    MODEL_CACHE_MISSES_TOTAL,
+)
+
+
+@dataclass(frozen=True)
+class CachedBlob:
+    chunks: tuple[bytes, ...]
+    size: int
+    meta: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_bytes(
+        cls, data: bytes | memoryview, chunk_size: int, meta: dict | None = None
+    ) -> CachedBlob:
+        view = memoryview(data)
+        chunks = tuple(bytes(view[i : i + chunk_size]) for i in range(0, len(view), chunk_size))
+        return cls(chunks, len(view), meta or {})
+
+
+class ModelBlobCache:
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple, CachedBlob] = OrderedDict()
+        self._bytes = 0
+        self._loading: dict[tuple, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: tuple) -> CachedBlob | None:
+        blob = self._entries.get(key)
+        if blob is not None:
+            self._entries.move_to_end(key)
+        return blob
+
+    def put(self, key: tuple, blob: CachedBlob) -> None:
+        if blob.size > self.max_bytes:
+            return  # would evict everything else and still not fit
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old.size
+        self._entries[key] = blob
+        self._bytes += blob.size
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+            MODEL_CACHE_EVICTIONS_TOTAL.inc()
+        MODEL_CACHE_BYTES.set(self._bytes)
+
+    async def get_or_load(
+        self, key: tuple, loader: Callable[[], Awaitable[CachedBlob | None]],
+    ) -> CachedBlob | None:
+        blob = self.get(key)
+        if blob is not None:
+            MODEL_CACHE_HITS_TOTAL.inc()
+            return blob
+
+        MODEL_CACHE_MISSES_TOTAL.inc()
+        task = self._loading.get(key)
+        if task is None:
+            task = asyncio.create_task(self._load(key, loader))
+            self._loading[key] = task
+        # Shielded: one client hanging up must not cancel the shared load
+        return await asyncio.shield(task)
+
+    async def _load(
+        self, key: tuple, loader: Callable[[], Awaitable[CachedBlob | None]],
+    ) -> CachedBlob | None:
+        try:
+            blob = await loader()
+            if blob is not None:
+                self.put(key, blob)
+            return blob
+        finally:
+            self._loading.pop(key, None)
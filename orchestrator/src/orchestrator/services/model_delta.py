@@ -0,0 +1,100 @@
+"""Weight payloads for incremental model downloads.
+
+Between rounds only the weight values of the global model change; the graph,
+update params and the rest of the protobuf scaffolding stay the same. A
+device that already holds a previous version therefore only needs the
+weights, and usually only their difference to what it has.
+
+Wire format (ModelPayloadFormat WEIGHTS / WEIGHT_DIFF):
+  [magic: 4 bytes = b"EOW\\x01"]
+  [raw_size: uint32_le]              # size of the decompressed planes
+  [lz4_block_compressed(planes)]
+
+`planes` is the bitwise XOR of the new and base float32 weight vectors
+(base = all zeros for WEIGHTS), stored byte plane by byte plane: all first
+bytes, then all second bytes, ... Consecutive weights share sign/exponent
+bits, so the XOR of two nearby versions is mostly zeros in the high planes
+and lz4 compresses it well. The encoding is lossless; the client ends up
+with bit-identical weights.
+
+The weight vector is every innerProduct layer of the spec, in spec order
+(see coreml_model.extract_spec_weights), flattened into one float32 vector.
+"""
+
+from __future__ import annotations
+
+import struct
+
+import lz4.block
+import numpy as np
+
+from orchestrator.services.coreml_model import (
+    extract_spec_weights,
+    get_spec_learning_rate,
+    inject_spec_weights,
+    parse_spec,
+    set_spec_learning_rate,
+)
+from orchestrator.services.flat_params import FlatLayout
+
+WEIGHT_PAYLOAD_MAGIC = b"EOW\x01"
+
+
+def spec_weight_vector(spec) -> tuple[FlatLayout, np.ndarray]:
+    """Flat float32 weight vector of a parsed spec and its layout."""
+    weights = extract_spec_weights(spec)
+    layout = FlatLayout.from_shapes({name: values.shape for name, values in weights.items()})
+    return layout, layout.flatten(weights)
+
+
+def encode_weight_payload(weights: np.ndarray, base: np.ndarray | None = None) -> bytes:
+    """Encode `weights`, as a diff against `base` when given."""
+    bits = np.ascontiguousarray(weights, dtype="<f4").view(np.uint32)
+    if base is not None:
+        if base.shape != weights.shape:
+            raise ValueError(f"Base has {base.size} weights, expected {weights.size}")
+        bits = bits ^ np.ascontiguousarray(base, dtype="<f4").view(np.uint32)
+    planes = bits.view(np.uint8).reshape(-1, 4).T.tobytes()
+    compressed = lz4.block.compress(planes, store_size=False)
+    return b"".join((WEIGHT_PAYLOAD_MAGIC, struct.pack("<I", len(planes)), compressed))
+
+
+def decode_weight_payload(payload: bytes, base: np.ndarray | None = None) -> np.ndarray:
+    """Inverse of encode_weight_payload; `base` must match what the server diffed against."""
+    if payload[:4] != WEIGHT_PAYLOAD_MAGIC:
+        raise ValueError("Not a weight payload")
+    (raw_size,) = struct.unpack_from("<I", payload, 4)
+    if raw_size % 4:
+        raise ValueError(f"Corrupt weight payload: {raw_size} bytes of planes")
+    planes = lz4.block.decompress(payload[8:], uncompressed_size=raw_size)
+    bits = np.frombuffer(planes, dtype=np.uint8).reshape(4, -1).T.copy().view("<u4").ravel()
+    if base is not None:
+        if base.size != bits.size:
+            raise ValueError(f"Payload has {bits.size} weights, base has {base.size}")
+        bits ^= np.ascontiguousarray(base, dtype="<f4").view(np.uint32)
+    return bits.view(np.float32)
+
+
+def build_weight_payload(
+    model: bytes, base_model: bytes | None = None,
+) -> tuple[bytes, float | None]:
+    """Server side: weight payload of `model` (diffed against `base_model`) and its LR."""
+    spec = parse_spec(model)
+    _, weights = spec_weight_vector(spec)
+    base = spec_weight_vector(parse_spec(base_model))[1] if base_model is not None else None
+    return encode_weight_payload(weights, base), get_spec_learning_rate(spec)
+
+
+def apply_weight_payload(
+    base_model: bytes, payload: bytes, diff: bool, learning_rate: float | None = None,
+) -> bytes:
+    """Rebuild the full .mlmodel from the model a client holds and a weight payload."""
+    spec = parse_spec(base_model)
+    layout, base = spec_weight_vector(spec)
+    weights = decode_weight_payload(payload, base if diff else None)
+    if weights.size != layout.size:
+        raise ValueError(f"Payload has {weights.size} weights, model has {layout.size}")
+    inject_spec_weights(spec, layout.unflatten(weights))
+    if learning_rate is not None:
+        set_spec_learning_rate(spec, learning_rate)
+    return spec.SerializeToString()
@@ -0,0 +1,82 @@
+"""In-process state of a job's global model.
+
+The coordinator keeps one ModelState per active job instead of round-tripping
+the .mlmodel through Redis and re-parsing it for every step of a round. It
+holds the parsed CoreML spec, the flat weight vector and the learning rate;
+aggregation updates the vector in place.
+
+The .mlmodel bytes are only rebuilt when someone needs them (devices about to
+download the model for a round, or a checkpoint) and are cached until the
+weights or the learning rate change again.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from orchestrator.services.coreml_model import (
+    extract_spec_weights,
+    get_spec_learning_rate,
+    inject_spec_weights,
+    parse_spec,
+    set_spec_learning_rate,
+)
+from orchestrator.services.fed_avg import apply_gradients_flat
+from orchestrator.services.flat_params import FlatLayout
+from orchestrator.services.server_optimizer import ServerOptimizer
+
+
+class ModelState:
+    def __init__(self, spec, layout: FlatLayout, version: int = 0) -> None:
+        self.spec = spec
+        self.layout = layout
+        self.version = version
+        self.weights = layout.flatten(extract_spec_weights(spec))
+        self.learning_rate = get_spec_learning_rate(spec)
+        # Server-side accuracy of the current weights, once evaluated
+        self.accuracy: float | None = None
+        self._serialized: bytes | None = None
+
+    @classmethod
+    def from_bytes(cls, mlmodel_bytes: bytes, layout: FlatLayout, version: int = 0) -> ModelState:
+        state = cls(parse_spec(mlmodel_bytes), layout, version)
+        # Nothing changed yet: the input bytes are the materialized model
+        state._serialized = mlmodel_bytes
+        return state
+
+    @property
+    def dirty(self) -> bool:
+        return self._serialized is None
+
+    def weights_dict(self) -> dict[str, np.ndarray]:
+        """Per-layer views of the current weight vector."""
+        return self.layout.unflatten(self.weights)
+
+    def set_learning_rate(self, lr: float) -> None:
+        if lr == self.learning_rate:
+            return
+        set_spec_learning_rate(self.spec, lr)
+        self.learning_rate = lr
+        self._serialized = None
+
+    def apply_update(
+        self, averaged_grads: np.ndarray, version: int, optimizer: ServerOptimizer | None = None,
+    ) -> None:
+        """Apply the averaged deltas to the weights in place and bump the version.
+
+        Without a server optimizer the deltas are simply added (FedAvg).
+        """
+        if optimizer is None:
+            apply_gradients_flat(self.weights, averaged_grads)
+        else:
+            optimizer.step(self.weights, averaged_grads)
+        self.version = version
+        self.accuracy = None
+        self._serialized = None
+
+    def to_bytes(self) -> bytes:
+        """The .mlmodel bytes for the current weights, rebuilt at most once per change."""
+        if self._serialized is None:
+            inject_spec_weights(self.spec, self.weights_dict())
+            self._serialized = self.spec.SerializeToString()
+        return self._serialized
@@ -0,0 +1,315 @@
+"""Versioned storage for global model blobs.
+
+Two backends implement ModelStore:
+
+  RedisModelStore -- the original layout: one mutable raw blob per model in
+                     Redis (`model:{model_id}:blob`), no history. A save
+                     counter (`model:{model_id}:rev`) identifies its content.
+  FileModelStore  -- content-addressed, immutable files under
+                     `settings.model_storage_dir` (the `model-storage`
+                     volume), read back through mmap.
+
+FileModelStore layout:
+  {root}/{model_id}/{sha256}.mlmodel   one file per distinct model content
+  model:{model_id}:head                Redis: current version number
+  model:{model_id}:versions            Redis hash: version -> ModelVersion JSON
+
+Only the small head/version records live in Redis, so model blobs no longer
+sit in Redis RAM and downloads never contend with training writes. A version
+is never modified once written; after every put the store keeps the last
+`keep_last` versions plus the best-accuracy one and deletes unreferenced
+files.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import structlog
+from redis.asyncio import Redis
+
+from orchestrator.config import settings
+from orchestrator.services.redis_blobs import (
+    delete_model,
+    load_model,
+    model_exists,
+    model_revision,
+    save_model,
+)
+
+logger = structlog.get_logger()
+
+MODEL_STORE_BACKENDS = ("file", "redis")
+
+_SET_ACCURACY = """
+local raw = redis.call('HGET', KEYS[1], ARGV[1])
+if not raw then
+    return 0
+end
+local record = cjson.decode(raw)
+record['accuracy'] = tonumber(ARGV[2])
+redis.call('HSET', KEYS[1], ARGV[1], cjson.encode(record))
+return 1
+"""
+
+
+@dataclass(frozen=True)
+class ModelVersion:
+    model_id: str
+    version: int
+    digest: str
+    size_bytes: int
+    accuracy: float | None = None
+    created_at: float = 0.0
+
+
+class ModelStore(ABC):
+    @abstractmethod
+    async def put(
+        self, model_id: str, data: bytes, version: int = 0, accuracy: float | None = None,
+    ) -> ModelVersion:
+        """Store `data` as `version` of the model and make it the current one."""
+
+    @abstractmethod
+    async def get(self, model_id: str, version: int | None = None) -> bytes | memoryview | None:
+        """Model bytes for `version` (default: current), or None."""
+
+    @abstractmethod
+    async def exists(self, model_id: str) -> bool: ...
+
+    @abstractmethod
+    async def delete(self, model_id: str) -> None:
+        """Drop every version of the model."""
+
+    async def local_path(self, model_id: str) -> Path | None:
+        """Filesystem path of the current version, if the backend has one."""
+        return None
+
+    async def head(self, model_id: str) -> ModelVersion | None:
+        """Record of the current version, if the backend tracks versions."""
+        return None
+
+    async def find(self, model_id: str, digest: str) -> ModelVersion | None:
+        """A retained version with the given content digest, if any."""
+        return None
+
+    async def revision(self, model_id: str) -> str | None:
+        """Token for the current content of a backend without version records."""
+        return None
+
+    async def set_accuracy(self, model_id: str, version: int, accuracy: float) -> None:
+        """Record the accuracy of a version stored before it was evaluated."""
+        return None
+
+
+class RedisModelStore(ModelStore):
+    def __init__(self, redis: Redis) -> None:
+        # Raw-bytes client (no decode_responses)
+        self.redis = redis
+
+    async def put(
+        self, model_id: str, data: bytes, version: int = 0, accuracy: float | None = None,
+    ) -> ModelVersion:
+        await save_model(self.redis, model_id, data)
+        return ModelVersion(model_id, version, "", len(data), accuracy, time.time())
+
+    async def get(self, model_id: str, version: int | None = None) -> bytes | None:
+        return await load_model(self.redis, model_id)
+
+    async def exists(self, model_id: str) -> bool:
+        return await model_exists(self.redis, model_id)
+
+    async def delete(self, model_id: str) -> None:
+        await delete_model(self.redis, model_id)
+
+    async def revision(self, model_id: str) -> str | None:
+        rev = await model_revision(self.redis, model_id)
+        return f"rev:{rev}" if rev is not None else None
+
+
+class FileModelStore(ModelStore):
+    def __init__(
+        self, root: str | Path, redis: Redis, keep_last: int = 5,
+        legacy_redis: Redis | None = None,
+    ) -> None:
+        self.root = Path(root)
+        self.redis = redis
+        self.keep_last = max(1, keep_last)
+        # Raw-bytes client holding pre-existing Redis blobs, read as a fallback
+        self.legacy_redis = legacy_redis
+
+    @staticmethod
+    def _head_key(model_id: str) -> str:
+        return f"model:{model_id}:head"
+
+    @staticmethod
+    def _versions_key(model_id: str) -> str:
+        return f"model:{model_id}:versions"
+
+    def _blob_path(self, model_id: str, digest: str) -> Path:
+        return self.root / model_id / f"{digest}.mlmodel"
+
+    async def put(
+        self, model_id: str, data: bytes, version: int = 0, accuracy: float | None = None,
+    ) -> ModelVersion:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(model_id, digest)
+        if not path.exists():
+            await asyncio.to_thread(_write_atomic, path, data)
+
+        replaced = await self.record(model_id, version)
+        record = ModelVersion(model_id, version, digest, len(data), accuracy, time.time())
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self._versions_key(model_id), str(version), json.dumps(asdict(record)))
+            pipe.set(self._head_key(model_id), str(version))
+            await pipe.execute()
+
+        if self.legacy_redis is not None:
+            await delete_model(self.legacy_redis, model_id)
+        if replaced is not None and replaced.digest != digest:
+            # The same version re-put with new content (e.g. a new learning rate)
+            await self._unlink_unreferenced(model_id, {replaced.digest})
+        await self.prune(model_id)
+        return record
+
+    async def get(self, model_id: str, version: int | None = None) -> memoryview | bytes | None:
+        record = await self.record(model_id, version)
+        if record is None:
+            if version is None and self.legacy_redis is not None:
+                return await load_model(self.legacy_redis, model_id)
+            return None
+        return _map_readonly(self._blob_path(model_id, record.digest))
+
+    async def exists(self, model_id: str) -> bool:
+        if await self.redis.exists(self._head_key(model_id)):
+            return True
+        if self.legacy_redis is not None:
+            return await model_exists(self.legacy_redis, model_id)
+        return False
+
+    async def delete(self, model_id: str) -> None:
+        await self.redis.delete(self._head_key(model_id), self._versions_key(model_id))
+        await asyncio.to_thread(shutil.rmtree, self.root / model_id, True)
+        if self.legacy_redis is not None:
+            await delete_model(self.legacy_redis, model_id)
+
+    async def local_path(self, model_id: str) -> Path | None:
+        record = await self.record(model_id)
+        if record is None:
+            return None
+        path = self._blob_path(model_id, record.digest)
+        return path if path.exists() else None
+
+    async def head(self, model_id: str) -> ModelVersion | None:
+        return await self.record(model_id)
+
+    async def find(self, model_id: str, digest: str) -> ModelVersion | None:
+        for record in reversed(await self.versions(model_id)):
+            if record.digest == digest:
+                return record
+        return None
+
+    async def record(self, model_id: str, version: int | None = None) -> ModelVersion | None:
+        if version is None:
+            head = await self.redis.get(self._head_key(model_id))
+            if head is None:
+                return None
+            version = int(head)
+        raw = await self.redis.hget(self._versions_key(model_id), str(version))
+        return ModelVersion(**json.loads(raw)) if raw else None
+
+    async def set_accuracy(self, model_id: str, version: int, accuracy: float) -> None:
+        # In place, so a record pruned or replaced meanwhile is not resurrected
+        await self.redis.eval(
+            _SET_ACCURACY, 1, self._versions_key(model_id), str(version), repr(accuracy),
+        )
+
+    async def versions(self, model_id: str) -> list[ModelVersion]:
+        raw = await self.redis.hgetall(self._versions_key(model_id))
+        return sorted(
+            (ModelVersion(**json.loads(value)) for value in raw.values()),
+            key=lambda record: record.version,
+        )
+
+    async def _unlink_unreferenced(self, model_id: str, digests: set[str]) -> None:
+        """Delete the files of `digests` that no remaining version record refers to."""
+        live = {record.digest for record in await self.versions(model_id)}
+        for digest in digests - live:
+            self._blob_path(model_id, digest).unlink(missing_ok=True)
+
+    async def prune(self, model_id: str) -> None:
+        """Keep the last `keep_last` versions, the current one and the best-accuracy one."""
+        records = await self.versions(model_id)
+        if len(records) <= self.keep_last:
+            return
+
+        head = await self.redis.get(self._head_key(model_id))
+        keep = {record.version for record in records[-self.keep_last :]}
+        if head is not None:
+            keep.add(int(head))
+        scored = [record for record in records if record.accuracy is not None]
+        if scored:
+            keep.add(max(scored, key=lambda record: record.accuracy).version)
+
+        dropped = [record for record in records if record.version not in keep]
+        if not dropped:
+            return
+        await self.redis.hdel(self._versions_key(model_id), *(str(r.version) for r in dropped))
+
+        await self._unlink_unreferenced(model_id, {record.digest for record in dropped})
+        logger.debug(
+            "model_versions_pruned",
+            model_id=model_id,
+            dropped=[record.version for record in dropped],
+        )
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def _map_readonly(path: Path) -> memoryview | bytes | None:
+    """Zero-copy view of an immutable blob file (stays valid if the file is pruned)."""
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return b""
+            return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    except FileNotFoundError:
+        return None
+
+
+def create_model_store(redis: Redis, blob_redis: Redis) -> ModelStore:
+    """Build the backend selected by `settings.model_store_backend`."""
+    backend = settings.model_store_backend
+    if backend == "redis":
+        return RedisModelStore(blob_redis)
+    if backend == "file":
+        return FileModelStore(
+            settings.model_storage_dir, redis,
+            keep_last=settings.model_store_keep_last,
+            legacy_redis=blob_redis,
+        )
+    raise ValueError(
+        f"Unknown model store backend: {backend!r} (expected one of {MODEL_STORE_BACKENDS})"
+    )
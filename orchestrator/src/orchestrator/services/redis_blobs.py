@@ -0,0 +1,254 @@
+"""Binary Redis layout for global model blobs and gradient entries.
+
+Model blobs are stored as raw bytes under `model:{model_id}:blob` and must be
+accessed through a Redis client created WITHOUT decode_responses. The legacy
+base64 text value under `model:{model_id}:global` is still read as a
+fallback and is dropped the next time the model is written.
+
+Gradient entries pushed to `gradients:{model_id}:{round}` are framed as:
+  [magic: 4 bytes = b"EOG\\x01"]
+  [header_length: uint32_le]
+  [header: utf8 JSON {"device_id", "num_samples", "metrics", "encoding"}]
+  [gradients: raw bytes]
+
+`encoding` says how to read the gradients: "wire" is the payload exactly as
+the device sent it, possibly still float16+lz4 compressed, and is decoded at
+aggregation time (gradient_codec.decode_gradients_into). Entries without the
+field ("raw") hold float32, top-k or quantized binary.
+
+Legacy entries (a JSON object with base64 "gradients") are still decoded.
+
+Every push is paired with an XADD to the round's notification stream
+`gradients:{model_id}:{round}:events`, which the coordinator blocks on
+(XREAD BLOCK) instead of polling the list length.
+
+Streamed uploads are not assembled in orchestrator memory: their chunks are
+APPENDed to a staging key `gradients:{model_id}:{round}:upload:{token}`
+(expiring, so abandoned uploads vanish) and moved into the list with the
+same notification in one script once complete.
+
+While a synchronous job runs, `model:{model_id}:open_round` holds the round
+currently accepting gradients ("" between rounds). Submissions for any other
+round are late and rejected; without the key every round is accepted. The
+senders of rejected submissions are added to `model:{model_id}:late_devices`,
+so the coordinator knows those stragglers are done and can be released.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import struct
+from dataclasses import dataclass, field
+
+from redis.asyncio import Redis
+
+GRADIENT_ENTRY_MAGIC = b"EOG\x01"
+# Cap per-round notification streams; the list itself is the source of truth
+GRADIENT_EVENTS_MAXLEN = 10_000
+GRADIENT_ENCODING_RAW = "raw"
+GRADIENT_ENCODING_WIRE = "wire"
+
+# Move a staged upload into the round's list and notify, atomically
+_COMMIT_UPLOAD = """
+local entry = redis.call('GET', KEYS[1])
+if not entry then
+    return 0
+end
+redis.call('RPUSH', KEYS[2], entry)
+redis.call('DEL', KEYS[1])
+redis.call('XADD', KEYS[3], 'MAXLEN', '~', ARGV[2], '*', 'device_id', ARGV[1])
+return 1
+"""
+
+
+def model_blob_key(model_id: str) -> str:
+    return f"model:{model_id}:blob"
+
+
+def legacy_model_key(model_id: str) -> str:
+    return f"model:{model_id}:global"
+
+
+def model_revision_key(model_id: str) -> str:
+    # Bumped on every save and kept across deletes, so a revision number is
+    # never reused for different content
+    return f"model:{model_id}:rev"
+
+
+async def load_model(redis: Redis, model_id: str) -> bytes | None:
+    """Return the global model bytes, falling back to the legacy base64 key."""
+    data = await redis.get(model_blob_key(model_id))
+    if data is not None:
+        return data
+    encoded = await redis.get(legacy_model_key(model_id))
+    if encoded:
+        return base64.b64decode(encoded)
+    return None
+
+
+async def save_model(redis: Redis, model_id: str, data: bytes) -> None:
+    """Store the global model as raw bytes and retire the legacy base64 copy."""
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.set(model_blob_key(model_id), data)
+        pipe.delete(legacy_model_key(model_id))
+        pipe.incr(model_revision_key(model_id))
+        await pipe.execute()
+
+
+async def model_revision(redis: Redis, model_id: str) -> int | None:
+    """Revision of the raw blob, None if it was never saved through save_model."""
+    rev = await redis.get(model_revision_key(model_id))
+    return int(rev) if rev is not None else None
+
+
+async def model_exists(redis: Redis, model_id: str) -> bool:
+    return bool(await redis.exists(model_blob_key(model_id), legacy_model_key(model_id)))
+
+
+async def delete_model(redis: Redis, model_id: str) -> None:
+    await redis.delete(model_blob_key(model_id), legacy_model_key(model_id))
+
+
+def open_round_key(model_id: str) -> str:
+    return f"model:{model_id}:open_round"
+
+
+async def set_open_round(redis: Redis, model_id: str, training_round: str) -> None:
+    """Accept gradients for `training_round` only ("" closes the current round)."""
+    await redis.set(open_round_key(model_id), training_round)
+
+
+async def is_round_closed(redis: Redis, model_id: str, training_round: str) -> bool:
+    """True if rounds are tracked for `model_id` and `training_round` is not the open one."""
+    current = await redis.get(open_round_key(model_id))
+    if current is None:
+        return False
+    if isinstance(current, bytes):
+        current = current.decode()
+    return current != training_round
+
+
+def late_devices_key(model_id: str) -> str:
+    return f"model:{model_id}:late_devices"
+
+
+async def record_late_device(redis: Redis, model_id: str, device_id: str, ttl: int) -> None:
+    """Note that `device_id` finished a round that had already closed."""
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.sadd(late_devices_key(model_id), device_id)
+        pipe.expire(late_devices_key(model_id), ttl)
+        await pipe.execute()
+
+
+async def pop_late_devices(redis: Redis, model_id: str, device_ids: list[str]) -> set[str]:
+    """Which of `device_ids` have submitted late since the last call; forgets them."""
+    if not device_ids:
+        return set()
+    flags = await redis.smismember(late_devices_key(model_id), device_ids)
+    late = [device_id for device_id, flag in zip(device_ids, flags, strict=True) if flag]
+    if late:
+        await redis.srem(late_devices_key(model_id), *late)
+    return set(late)
+
+
+def gradient_events_key(gradients_key: str) -> str:
+    return f"{gradients_key}:events"
+
+
+async def push_gradient_entry(
+    redis: Redis, gradients_key: str, entry: bytes | bytearray, device_id: str,
+) -> None:
+    """Append a gradient entry and wake up anyone blocked on the round's stream."""
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.rpush(gradients_key, entry)
+        pipe.xadd(
+            gradient_events_key(gradients_key), {"device_id": device_id},
+            maxlen=GRADIENT_EVENTS_MAXLEN, approximate=True,
+        )
+        await pipe.execute()
+
+
+def gradient_upload_key(gradients_key: str, token: str) -> str:
+    return f"{gradients_key}:upload:{token}"
+
+
+async def append_gradient_upload(
+    redis: Redis, upload_key: str, data: bytes | bytearray, ttl: int
+) -> int:
+    """Append the next part of a streamed entry; returns its staged size."""
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.append(upload_key, bytes(data))
+        pipe.expire(upload_key, ttl)
+        size, _ = await pipe.execute()
+    return size
+
+
+async def commit_gradient_upload(
+    redis: Redis, gradients_key: str, upload_key: str, device_id: str,
+) -> bool:
+    """Push a fully staged entry like push_gradient_entry; False if it expired."""
+    moved = await redis.eval(
+        _COMMIT_UPLOAD, 3, upload_key, gradients_key, gradient_events_key(gradients_key),
+        device_id, GRADIENT_EVENTS_MAXLEN,
+    )
+    return bool(moved)
+
+
+@dataclass
+class GradientEntry:
+    device_id: str
+    gradients: bytes
+    num_samples: int
+    metrics: dict = field(default_factory=dict)
+    encoding: str = GRADIENT_ENCODING_RAW
+
+    @property
+    def is_wire(self) -> bool:
+        return self.encoding == GRADIENT_ENCODING_WIRE
+
+
+def encode_gradient_entry(
+    device_id: str, gradients: bytes, num_samples: int, metrics: dict | None = None,
+    encoding: str = GRADIENT_ENCODING_RAW,
+) -> bytes:
+    prefix = gradient_entry_prefix(device_id, num_samples, metrics, encoding)
+    return prefix + gradients
+
+
+def gradient_entry_prefix(
+    device_id: str, num_samples: int, metrics: dict | None = None,
+    encoding: str = GRADIENT_ENCODING_RAW,
+) -> bytes:
+    """Magic and header of an entry; the gradient bytes follow directly."""
+    fields = {
+        "device_id": device_id,
+        "num_samples": num_samples,
+        "metrics": metrics or {},
+    }
+    if encoding != GRADIENT_ENCODING_RAW:
+        fields["encoding"] = encoding
+    header = json.dumps(fields).encode("utf-8")
+    return b"".join((GRADIENT_ENTRY_MAGIC, struct.pack("<I", len(header)), header))
+
+
+def decode_gradient_entry(raw: bytes | str) -> GradientEntry:
+    """Decode a framed binary entry, or a legacy JSON/base64 one."""
+    if isinstance(raw, bytes) and raw[:4] == GRADIENT_ENTRY_MAGIC:
+        (header_len,) = struct.unpack_from("<I", raw, 4)
+        header = json.loads(raw[8 : 8 + header_len])
+        return GradientEntry(
+            device_id=header.get("device_id", "unknown"),
+            gradients=raw[8 + header_len :],
+            num_samples=header.get("num_samples", 0),
+            metrics=header.get("metrics", {}),
+            encoding=header.get("encoding", GRADIENT_ENCODING_RAW),
+        )
+
+    entry = json.loads(raw)
+    return GradientEntry(
+        device_id=entry.get("device_id", "unknown"),
+        gradients=base64.b64decode(entry.get("gradients", "")),
+        num_samples=entry.get("num_samples", 0),
+        metrics=entry.get("metrics", {}),
+    )
@@ -0,0 +1,106 @@
+"""Byzantine-robust reductions over the stacked client matrix.
+
+A weighted mean lets a single client move the global model arbitrarily far.
+These rules bound the influence of any minority of clients instead:
+
+  median        coordinate-wise median
+  trimmed_mean  per coordinate, drop the `k` largest and `k` smallest values
+                (k = trim_fraction * n) and average the rest
+  krum          multi-Krum: score every client by the summed squared distance
+                to its n - f - 2 nearest neighbours and average the
+                `num_selected` best-scored ones
+
+Sample counts are ignored: a misbehaving client controls its reported
+num_samples just as much as its update.
+
+All rules work on the (n x P) matrix of MatrixAccumulator and walk it in
+column chunks of at most `chunk_bytes`, so their temporaries (sorted /
+partitioned copies) stay bounded however large the model is. Norm clipping
+(clip_rows) is independent of the rule and also works for the streaming
+accumulator.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+
+import numpy as np
+
+ROBUST_RULES = ("median", "trimmed_mean", "krum")
+DEFAULT_CHUNK_BYTES = 64 * 1024 * 1024
+
+
+def column_chunks(
+    n_rows: int, n_cols: int, chunk_bytes: int = DEFAULT_CHUNK_BYTES
+) -> Iterator[slice]:
+    """Column slices of an (n_rows x n_cols) float32 matrix, each at most ~chunk_bytes."""
+    cols = max(1, chunk_bytes // (max(n_rows, 1) * 4))
+    for start in range(0, n_cols, cols):
+        yield slice(start, min(start + cols, n_cols))
+
+
+def clip_norm(vec: np.ndarray, max_norm: float) -> bool:
+    """Scale `vec` in place to L2 norm `max_norm` if it is longer; True if it was clipped."""
+    norm = float(np.sqrt(np.dot(vec, vec)))
+    if norm <= max_norm:
+        return False
+    vec *= np.float32(max_norm / norm)
+    return True
+
+
+def clip_rows(matrix: np.ndarray, max_norm: float) -> int:
+    """Clip every row of `matrix` in place to L2 norm `max_norm`; returns how many were clipped."""
+    return sum(clip_norm(row, max_norm) for row in matrix)
+
+
+def coordinate_median(matrix: np.ndarray, chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> np.ndarray:
+    n, p = matrix.shape
+    out = np.empty(p, dtype=np.float32)
+    for cols in column_chunks(n, p, chunk_bytes):
+        np.median(matrix[:, cols], axis=0, out=out[cols])
+    return out
+
+
+def trimmed_mean(
+    matrix: np.ndarray, trim_fraction: float, chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+) -> np.ndarray:
+    n, p = matrix.shape
+    k = int(trim_fraction * n)
+    if n - 2 * k < 1:
+        raise ValueError(f"Trimming {k} values from each end leaves nothing of {n} clients")
+    out = np.empty(p, dtype=np.float32)
+    for cols in column_chunks(n, p, chunk_bytes):
+        block = matrix[:, cols]
+        if k:
+            # Rows k .. n-k-1 hold exactly the middle values, in no particular order
+            block = np.partition(block, (k, n - k - 1), axis=0)[k : n - k]
+        np.mean(block, axis=0, out=out[cols])
+    return out
+
+
+def multi_krum(
+    matrix: np.ndarray, num_byzantine: int, num_selected: int | None = None,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Average of the `num_selected` (default n - f) best Krum-scored rows, and their indices."""
+    n, p = matrix.shape
+    f = num_byzantine
+    if n < 2 * f + 3:
+        raise ValueError(f"Krum with f={f} needs at least {2 * f + 3} clients, got {n}")
+
+    # Pairwise squared distances from the Gram matrix, accumulated chunk by chunk
+    gram = np.zeros((n, n), dtype=np.float64)
+    for cols in column_chunks(n, p, chunk_bytes):
+        block = matrix[:, cols].astype(np.float64)
+        gram += block @ block.T
+    sq_norms = np.diag(gram)
+    dist = np.maximum(sq_norms[:, None] + sq_norms[None, :] - 2.0 * gram, 0.0)
+    np.fill_diagonal(dist, np.inf)
+
+    scores = np.sort(dist, axis=1)[:, : n - f - 2].sum(axis=1)
+    m = num_selected if num_selected else n - f
+    selected = np.argsort(scores, kind="stable")[: max(1, min(m, n))]
+
+    weights = np.zeros(n, dtype=np.float32)
+    weights[selected] = 1.0 / selected.size
+    return weights @ matrix, selected
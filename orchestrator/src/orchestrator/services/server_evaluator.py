@@ -3,13 +3,17 @@
 Performs a pure-numpy forward pass through the federated model
 and computes accuracy + cross-entropy loss on a held-out test set.
 
-Supports MNIST and CIFAR-10 architectures.
+Supports MNIST and CIFAR-10 architectures. Evaluation is called from the
+executor thread pool, so the first-time test set load (a download plus a
+parse) never runs on the event loop; a lock keeps concurrent jobs from
+loading the same dataset twice.
 """
 
 from __future__ import annotations
 
 import pickle
 import tarfile
+import threading
 import urllib.request
 from pathlib import Path
 
@@ -26,6 +30,7 @@ class ServerEvaluator:
 
     def __init__(self) -> None:
         self._datasets: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        self._load_lock = threading.Lock()
 
     @classmethod
     def get_instance(cls) -> ServerEvaluator:
@@ -36,6 +41,11 @@ class ServerEvaluator:
     def _load_mnist(self) -> None:
         if "mnist" in self._datasets:
             return
+        with self._load_lock:
+            if "mnist" not in self._datasets:
+                self._fetch_mnist()
+
+    def _fetch_mnist(self) -> None:
         from sklearn.datasets import fetch_openml
 
         logger.info("server_evaluator_loading_mnist_test_data")
@@ -48,7 +58,11 @@ class ServerEvaluator:
     def _load_cifar10(self) -> None:
         if "cifar10" in self._datasets:
             return
+        with self._load_lock:
+            if "cifar10" not in self._datasets:
+                self._fetch_cifar10()
 
+    def _fetch_cifar10(self) -> None:
         cache_dir = Path.home() / ".cache" / "edgeorchestra"
         cache_dir.mkdir(parents=True, exist_ok=True)
         cache_path = cache_dir / "cifar-10-python.tar.gz"
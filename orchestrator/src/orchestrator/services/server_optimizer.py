@@ -0,0 +1,244 @@
+"""Server-side optimizers applied to the aggregated round delta.
+
+Plain FedAvg adds the weighted-average client delta to the global weights.
+Treating that delta as a pseudo-gradient and feeding it to a server
+optimizer (Reddi et al., "Adaptive Federated Optimization") converges in
+far fewer rounds when device data is non-IID:
+
+  fedavg   w += Δ
+  fedavgm  v = β·v + Δ;                           w += η·v
+  fedadam  m = β1·m + (1-β1)·Δ;  v = β2·v + (1-β2)·Δ²;           w += η·m / (√v + τ)
+  fedyogi  m = β1·m + (1-β1)·Δ;  v = v - (1-β2)·Δ²·sign(v - Δ²); w += η·m / (√v + τ)
+
+Selected per job via `TrainingJob.config["server_optimizer"]`, e.g.
+{"name": "fedadam", "lr": 0.01}. The state vectors are checkpointed in Redis
+(`training:{job_id}:optimizer`) together with the model version they belong
+to, so a resumed job picks them up only if they match the model it resumes
+from.
+"""
+
+from __future__ import annotations
+
+import io
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+import numpy as np
+import structlog
+from redis.asyncio import Redis
+
+logger = structlog.get_logger()
+
+SERVER_OPTIMIZERS = ("fedavg", "fedavgm", "fedadam", "fedyogi")
+
+
+@dataclass
+class ServerOptimizerConfig:
+    """Per-job server optimizer, read from `TrainingJob.config["server_optimizer"]`."""
+
+    name: str = "fedavg"
+    lr: float = 1.0
+    momentum: float = 0.9
+    beta1: float = 0.9
+    beta2: float = 0.99
+    tau: float = 1e-3
+
+    @classmethod
+    def from_job_config(cls, config: dict | None) -> ServerOptimizerConfig:
+        if not config:
+            return cls()
+        opt = config.get("server_optimizer", {})
+        if not opt:
+            return cls()
+        name = opt.get("name", "fedavg")
+        if name not in SERVER_OPTIMIZERS:
+            raise ValueError(
+                f"Unknown server optimizer: {name!r}. Available: {list(SERVER_OPTIMIZERS)}"
+            )
+        # Adaptive methods take much smaller steps than the raw delta
+        default_lr = 0.01 if name in ("fedadam", "fedyogi") else 1.0
+        return cls(
+            name=name,
+            lr=opt.get("lr", default_lr),
+            momentum=opt.get("momentum", 0.9),
+            beta1=opt.get("beta1", 0.9),
+            beta2=opt.get("beta2", 0.99),
+            tau=opt.get("tau", 1e-3),
+        )
+
+    def make_optimizer(self, size: int) -> ServerOptimizer:
+        if self.name == "fedavgm":
+            return FedAvgM(size, lr=self.lr, momentum=self.momentum)
+        if self.name == "fedadam":
+            return FedAdam(size, lr=self.lr, beta1=self.beta1, beta2=self.beta2, tau=self.tau)
+        if self.name == "fedyogi":
+            return FedYogi(size, lr=self.lr, beta1=self.beta1, beta2=self.beta2, tau=self.tau)
+        return FedAvg(size, lr=self.lr)
+
+
+class ServerOptimizer(ABC):
+    """Updates the flat global weight vector in place from one round's delta."""
+
+    name: str
+
+    def __init__(self, size: int, lr: float = 1.0) -> None:
+        self.size = size
+        self.lr = lr
+        self.steps = 0
+
+    @abstractmethod
+    def step(self, weights: np.ndarray, delta: np.ndarray) -> None:
+        """Apply `delta` to `weights` in place."""
+
+    def state_dict(self) -> dict[str, np.ndarray]:
+        """State vectors to checkpoint (empty for stateless optimizers)."""
+        return {}
+
+    def load_state_dict(self, state: dict[str, np.ndarray]) -> None:
+        current = self.state_dict()
+        for key, vector in current.items():
+            value = state.get(key)
+            if value is None or value.shape != vector.shape:
+                raise ValueError(f"Optimizer state {key!r} missing or has the wrong shape")
+        for key, vector in current.items():
+            np.copyto(vector, state[key])
+
+
+class FedAvg(ServerOptimizer):
+    name = "fedavg"
+
+    def step(self, weights: np.ndarray, delta: np.ndarray) -> None:
+        if self.lr == 1.0:
+            np.add(weights, delta, out=weights)
+        else:
+            weights += np.float32(self.lr) * delta
+        self.steps += 1
+
+
+class FedAvgM(ServerOptimizer):
+    name = "fedavgm"
+
+    def __init__(self, size: int, lr: float = 1.0, momentum: float = 0.9) -> None:
+        super().__init__(size, lr)
+        self.momentum = momentum
+        self.velocity = np.zeros(size, dtype=np.float32)
+
+    def step(self, weights: np.ndarray, delta: np.ndarray) -> None:
+        self.velocity *= np.float32(self.momentum)
+        self.velocity += delta
+        weights += np.float32(self.lr) * self.velocity
+        self.steps += 1
+
+    def state_dict(self) -> dict[str, np.ndarray]:
+        return {"velocity": self.velocity}
+
+
+class FedAdam(ServerOptimizer):
+    name = "fedadam"
+
+    def __init__(
+        self, size: int, lr: float = 0.01, beta1: float = 0.9, beta2: float = 0.99,
+        tau: float = 1e-3,
+    ) -> None:
+        super().__init__(size, lr)
+        self.beta1 = beta1
+        self.beta2 = beta2
+        self.tau = tau
+        self.m = np.zeros(size, dtype=np.float32)
+        # Starting at τ² keeps the first steps bounded by η·|Δ|/τ
+        self.v = np.full(size, tau * tau, dtype=np.float32)
+        self._scratch = np.empty(size, dtype=np.float32)
+
+    def _update_v(self, delta_sq: np.ndarray) -> None:
+        self.v *= np.float32(self.beta2)
+        self.v += np.float32(1.0 - self.beta2) * delta_sq
+
+    def step(self, weights: np.ndarray, delta: np.ndarray) -> None:
+        self.m *= np.float32(self.beta1)
+        self.m += np.float32(1.0 - self.beta1) * delta
+
+        delta_sq = np.square(delta, out=self._scratch)
+        self._update_v(delta_sq)
+
+        denom = np.sqrt(self.v, out=self._scratch)
+        denom += np.float32(self.tau)
+        np.divide(self.m, denom, out=denom)
+        denom *= np.float32(self.lr)
+        weights += denom
+        self.steps += 1
+
+    def state_dict(self) -> dict[str, np.ndarray]:
+        return {"m": self.m, "v": self.v}
+
+
+class FedYogi(FedAdam):
+    name = "fedyogi"
+
+    def _update_v(self, delta_sq: np.ndarray) -> None:
+        # v -= (1-β2)·Δ²·sign(v - Δ²): v grows at most additively, unlike Adam
+        sign = np.sign(self.v - delta_sq)
+        delta_sq *= sign
+        delta_sq *= np.float32(1.0 - self.beta2)
+        self.v -= delta_sq
+
+
+def optimizer_state_key(job_id: str) -> str:
+    return f"training:{job_id}:optimizer"
+
+
+def encode_optimizer_state(optimizer: ServerOptimizer, version: int) -> bytes:
+    buf = io.BytesIO()
+    np.savez(
+        buf,
+        __name__=np.array(optimizer.name),
+        __version__=np.array(version),
+        __steps__=np.array(optimizer.steps),
+        **optimizer.state_dict(),
+    )
+    return buf.getvalue()
+
+
+def decode_optimizer_state(data: bytes) -> tuple[str, int, int, dict[str, np.ndarray]]:
+    """(optimizer name, model version, steps, state vectors) of a checkpoint."""
+    with np.load(io.BytesIO(data), allow_pickle=False) as archive:
+        arrays = {key: archive[key] for key in archive.files}
+    name = str(arrays.pop("__name__"))
+    version = int(arrays.pop("__version__"))
+    steps = int(arrays.pop("__steps__"))
+    return name, version, steps, arrays
+
+
+async def save_optimizer_state(
+    redis: Redis, job_id: str, optimizer: ServerOptimizer, version: int,
+) -> None:
+    """Checkpoint the state that produced model `version` (raw-bytes client)."""
+    if not optimizer.state_dict():
+        return
+    await redis.set(optimizer_state_key(job_id), encode_optimizer_state(optimizer, version))
+
+
+async def load_optimizer_state(
+    redis: Redis, job_id: str, optimizer: ServerOptimizer, version: int,
+) -> bool:
+    """Restore a checkpoint taken at model `version`; False if there is none that matches."""
+    if not optimizer.state_dict():
+        return False
+    data = await redis.get(optimizer_state_key(job_id))
+    if data is None:
+        return False
+    try:
+        name, saved_version, steps, state = decode_optimizer_state(data)
+        if name != optimizer.name or saved_version != version:
+            logger.warning(
+                "optimizer_state_mismatch_resetting",
+                job_id=job_id,
+                saved=(name, saved_version),
+                expected=(optimizer.name, version),
+            )
+            return False
+        optimizer.load_state_dict(state)
+    except (ValueError, OSError, KeyError):
+        logger.warning("optimizer_state_corrupt_resetting", job_id=job_id)
+        return False
+    optimizer.steps = steps
+    return True
@@ -1,7 +1,7 @@
 import asyncio
-import base64
 import json
 import math
+import struct
 import time
 import uuid
 from datetime import datetime, timezone
@@ -18,29 +18,51 @@ from orchestrator.observability.metrics import (
 from orchestrator.config import settings
 from orchestrator.db.engine import async_session
 from orchestrator.db.repositories import DeviceRepository, ModelRepository, TrainingJobRepository
-from orchestrator.services.coreml_model import (
-    create_updatable_mlmodel,
-    create_updatable_mlmodel_for_architecture,
-    extract_weights,
-    inject_weights,
-    set_learning_rate,
-)
-from orchestrator.services.fed_avg import (
-    aggregate_gradients,
-    apply_gradients,
-)
+from orchestrator.services.completion_time import CompletionTimeTracker, DeadlineConfig
+from orchestrator.services.coreml_model import create_updatable_mlmodel_for_architecture
+from orchestrator.services.device_leases import DeviceLeaseConfig, DeviceLeaseManager
 from orchestrator.services.device_scheduler import SchedulerConfig, select_devices
+from orchestrator.services.executors import run_cpu, run_proto
+from orchestrator.services.fed_avg import AggregationConfig, FedAvgAccumulator, MatrixAccumulator
+from orchestrator.services.fedbuff import ASYNC_POLL_SECONDS, AsyncTrainingConfig, StalenessBuffer
+from orchestrator.services.flat_params import get_layout
 from orchestrator.services.heartbeat_monitor import HeartbeatMonitor
 from orchestrator.services.model_registry import ARCHITECTURES, get_architecture
+from orchestrator.services.model_state import ModelState
+from orchestrator.services.model_store import ModelStore, RedisModelStore
+from orchestrator.services.redis_blobs import (
+    decode_gradient_entry,
+    gradient_events_key,
+    open_round_key,
+    pop_late_devices,
+    set_open_round,
+)
 from orchestrator.services.server_evaluator import ServerEvaluator
+from orchestrator.services.server_optimizer import (
+    ServerOptimizer,
+    ServerOptimizerConfig,
+    load_optimizer_state,
+    optimizer_state_key,
+    save_optimizer_state,
+)
 
 logger = structlog.get_logger()
 
 
 class TrainingCoordinator:
-    def __init__(self, redis: Redis, heartbeat_monitor: HeartbeatMonitor) -> None:
+    def __init__(
+        self, redis: Redis, heartbeat_monitor: HeartbeatMonitor, blob_redis: Redis | None = None,
+        model_store: ModelStore | None = None,
+    ) -> None:
         self.redis = redis
+        # Raw-bytes client (no decode_responses) for gradient entries
+        self.blob_redis = blob_redis if blob_redis is not None else redis
+        self.model_store = (
+            model_store if model_store is not None else RedisModelStore(self.blob_redis)
+        )
         self.heartbeat_monitor = heartbeat_monitor
+        # Shared with every other coordinator on the same Redis
+        self.leases = DeviceLeaseManager(self.redis)
         self._active_jobs: set[str] = set()
         self._tasks: dict[str, asyncio.Task] = {}
 
@@ -51,10 +73,8 @@ class TrainingCoordinator:
         # Determine model_id: use provided one or default to job_id (backward compat)
         effective_model_id = model_id or job_id
 
-        model_key = f"model:{effective_model_id}:global"
-
         # If model already exists in Redis (from a previous job or explicit creation), reuse it
-        if not await self.redis.exists(model_key):
+        if not await self.model_store.exists(effective_model_id):
             # Determine architecture from DB model if model_id was provided
             arch = ARCHITECTURES["mnist"]  # default
             if model_id:
@@ -64,9 +84,8 @@ class TrainingCoordinator:
                     if db_model:
                         arch = get_architecture(db_model.architecture)
 
-            initial_model = create_updatable_mlmodel_for_architecture(arch)
-            encoded = base64.b64encode(initial_model).decode()
-            await self.redis.set(model_key, encoded)
+            initial_model = await run_proto(create_updatable_mlmodel_for_architecture, arch)
+            await self.model_store.put(effective_model_id, initial_model)
 
             meta = json.dumps({
                 "model_id": effective_model_id,
@@ -94,8 +113,7 @@ class TrainingCoordinator:
         model_id = str(job.model_id) if getattr(job, "model_id", None) else job_id
 
         # Ensure model exists in Redis (may have been lost in crash)
-        model_key = f"model:{model_id}:global"
-        if not await self.redis.exists(model_key):
+        if not await self.model_store.exists(model_id):
             logger.warning("model_missing_in_redis_recreating", job_id=job_id, model_id=model_id)
 
             # Determine architecture from DB model
@@ -107,9 +125,8 @@ class TrainingCoordinator:
                     if db_model:
                         arch = get_architecture(db_model.architecture)
 
-            initial_model = create_updatable_mlmodel_for_architecture(arch)
-            encoded = base64.b64encode(initial_model).decode()
-            await self.redis.set(model_key, encoded)
+            initial_model = await run_proto(create_updatable_mlmodel_for_architecture, arch)
+            await self.model_store.put(model_id, initial_model)
             meta = json.dumps({
                 "model_id": model_id,
                 "name": f"fedavg-{model_id[:8]}",
@@ -159,6 +176,13 @@ class TrainingCoordinator:
         max_device_wait_retries = 30  # Max retries waiting for devices per round
         max_round_retries = 2  # Retry a round up to 2 times before skipping
         dispatched_device_ids: list[str] = []
+        # Dispatched devices that had not reported when their round closed;
+        # they stay leased and "training" until they report or the lease lapses
+        stragglers: list[str] = []
+        # Parsed global model, loaded from Redis once when the first round starts
+        model_state: ModelState | None = None
+        # Pipelined mode: evaluation + persistence of the last completed round
+        persist_task: asyncio.Task | None = None
 
         # Resolve architecture for this model
         arch_key = "mnist"
@@ -173,14 +197,43 @@ class TrainingCoordinator:
                 pass
 
         try:
+            layout = get_layout(arch_key)
+            agg_cfg = AggregationConfig.from_job_config(job_config, min_devices)
+            optimizer = ServerOptimizerConfig.from_job_config(job_config).make_optimizer(
+                layout.size
+            )
+            async_cfg = AsyncTrainingConfig.from_job_config(job_config)
+            deadline_cfg = DeadlineConfig.from_job_config(job_config)
+            timing = CompletionTimeTracker(self.redis, arch_key, alpha=deadline_cfg.alpha)
+            lease_cfg = DeviceLeaseConfig.from_job_config(job_config)
+            pipelined = bool((job_config or {}).get("pipeline", {}).get("enabled", False))
             all_round_metrics = list(existing_metrics) if existing_metrics else []
 
-            for round_num in range(start_round, num_rounds + 1):
+            sync_rounds = range(start_round, num_rounds + 1)
+            if async_cfg.enabled:
+                model_state = await self._load_model_state(
+                    job_id, effective_model_id, layout, optimizer, default_version=start_round - 1,
+                )
+                if not await self._run_buffered_updates(
+                    job_id, effective_model_id, arch_key, model_state, optimizer,
+                    agg_cfg, async_cfg, lease_cfg, num_rounds, learning_rate, job_config,
+                    all_round_metrics,
+                ):
+                    return
+                sync_rounds = range(0)
+
+            for round_num in sync_rounds:
                 round_start = time.perf_counter()
+                # Surface a failed background evaluation of the previous round
+                if persist_task is not None and persist_task.done():
+                    persist_task.result()
                 # Check for stop signal
                 stop_flag = await self.redis.get(f"training:{job_id}:stop")
                 if stop_flag:
                     logger.info("training_job_stopped", job_id=job_id, round=round_num)
+                    if persist_task is not None:
+                        await persist_task
+                        persist_task = None
                     async with async_session() as session:
                         repo = TrainingJobRepository(session)
                         await repo.update(uuid.UUID(job_id), status="stopped")
@@ -200,20 +253,40 @@ class TrainingCoordinator:
                     stop_flag = await self.redis.get(f"training:{job_id}:stop")
                     if stop_flag:
                         logger.info("training_job_stopped_while_waiting", job_id=job_id)
+                        if persist_task is not None:
+                            await persist_task
+                            persist_task = None
                         async with async_session() as session:
                             repo = TrainingJobRepository(session)
                             await repo.update(uuid.UUID(job_id), status="stopped")
                         await self._cleanup_redis_keys(job_id, model_id=effective_model_id)
                         return
 
+                    stragglers = await self._reclaim_stragglers(
+                        job_id, effective_model_id, stragglers
+                    )
                     async with async_session() as session:
                         device_repo = DeviceRepository(session)
                         all_online = await device_repo.list_all(status="online")
 
-                    selected = select_devices(all_online, sched_cfg, min_devices)
+                    predictions: dict[str, float] = {}
+                    if deadline_cfg.enabled:
+                        predictions = await timing.predict(all_online)
+                    selected = select_devices(
+                        await self._unleased(job_id, all_online),
+                        sched_cfg,
+                        min_devices,
+                        predicted_seconds=predictions,
+                        max_seconds=deadline_cfg.max_seconds
+                        or settings.training_round_timeout_seconds,
+                    )
                     if selected is not None:
-                        devices = selected
-                        break
+                        selected = await self._lease_devices(
+                            job_id, lease_cfg, sched_cfg, min_devices, selected, len(all_online),
+                        )
+                        if len(selected) >= min_devices:
+                            devices = selected
+                            break
 
                     wait_time = min(10 * (2 ** min(attempt, 4)), 120)  # 10s, 20s, 40s, ... max 120s
                     logger.warning(
@@ -235,9 +308,14 @@ class TrainingCoordinator:
                         online=len(devices),
                         required=min_devices,
                     )
+                    if persist_task is not None:
+                        await persist_task
+                        persist_task = None
                     async with async_session() as session:
                         repo = TrainingJobRepository(session)
                         await repo.update(uuid.UUID(job_id), status="failed")
+                    if model_state is not None:
+                        await self._checkpoint(job_id, effective_model_id, model_state, optimizer)
                     await self._cleanup_redis_keys(job_id, model_id=effective_model_id, keep_model=True)
                     return
 
@@ -248,20 +326,33 @@ class TrainingCoordinator:
                     for device in devices:
                         await device_repo.update(device.id, status="training")
 
-                # Cosine decay learning rate schedule
-                lr_min = learning_rate * 0.01
-                lr_max = learning_rate
-                cosine_lr = lr_min + 0.5 * (lr_max - lr_min) * (1 + math.cos(math.pi * round_num / num_rounds))
-                encoded_model = await self.redis.get(f"model:{effective_model_id}:global")
-                current_model_bytes = base64.b64decode(encoded_model)
-                updated_model_bytes = set_learning_rate(current_model_bytes, cosine_lr)
-                await self.redis.set(
-                    f"model:{effective_model_id}:global", base64.b64encode(updated_model_bytes).decode()
-                )
+                if model_state is None:
+                    model_state = await self._load_model_state(
+                        job_id,
+                        effective_model_id,
+                        layout,
+                        optimizer,
+                        default_version=round_num - 1,
+                    )
+                model_state.set_learning_rate(_cosine_lr(learning_rate, round_num, num_rounds))
+                # Devices download the model right after START_TRAINING
+                await self._checkpoint(job_id, effective_model_id, model_state, optimizer)
+
+                # Over-selected rounds close once the quorum has reported;
+                # later submissions for this round are rejected
+                quorum = sched_cfg.quorum(len(devices), min_devices)
+                round_timeout = settings.training_round_timeout_seconds
+                if deadline_cfg.enabled:
+                    round_timeout = deadline_cfg.round_deadline(
+                        [predictions.get(str(d.id)) for d in devices], round_timeout,
+                    )
+                await set_open_round(self.redis, effective_model_id, str(round_num))
 
                 # Round retry loop
                 round_completed = False
                 for retry in range(max_round_retries + 1):
+                    await self.leases.renew(job_id, dispatched_device_ids, _lease_ttl())
+                    dispatched_at = await self._redis_clock()
                     # Send START_TRAINING command to selected devices
                     for i, device in enumerate(devices):
                         await self.heartbeat_monitor.queue_command(
@@ -284,17 +375,25 @@ class TrainingCoordinator:
                         job_id=job_id,
                         round=round_num,
                         devices=len(devices),
+                        quorum=quorum,
+                        deadline_seconds=round(round_timeout, 1),
                         retry=retry if retry > 0 else None,
                     )
 
-                    # Wait for gradients
+                    # Wait for gradients, folding each one into the running average
                     gradients_key = f"gradients:{effective_model_id}:{round_num}"
-                    collected = await self._wait_for_gradients(
-                        gradients_key, len(devices), timeout=settings.training_round_timeout_seconds
+                    accumulator = agg_cfg.make_accumulator(layout, len(devices))
+                    round_device_metrics = await self._wait_for_gradients(
+                        gradients_key, quorum,
+                        timeout=round_timeout,
+                        accumulator=accumulator,
                     )
 
-                    if collected:
+                    if round_device_metrics:
                         round_completed = True
+                        await self._record_completion_times(
+                            timing, gradients_key, devices, dispatched_at, round_device_metrics,
+                        )
                         break
 
                     if retry < max_round_retries:
@@ -304,7 +403,7 @@ class TrainingCoordinator:
                             round=round_num,
                             retry=retry + 1,
                         )
-                        await self.redis.delete(gradients_key)
+                        await self.redis.delete(gradients_key, gradient_events_key(gradients_key))
                         continue
 
                     # All retries exhausted -- skip this round
@@ -314,7 +413,12 @@ class TrainingCoordinator:
                         round=round_num,
                         retries=max_round_retries,
                     )
-                    await self.redis.delete(gradients_key)
+                    await self.redis.delete(gradients_key, gradient_events_key(gradients_key))
+                    # The previous round's metrics go first, and its task must not
+                    # overwrite this record later
+                    if persist_task is not None:
+                        await persist_task
+                        persist_task = None
                     all_round_metrics.append({
                         "round": round_num,
                         "participants": 0,
@@ -330,113 +434,61 @@ class TrainingCoordinator:
                             round_metrics={"rounds": all_round_metrics},
                         )
 
-                if not round_completed:
-                    await self._restore_device_statuses(dispatched_device_ids)
-                    continue
-
-                # Aggregate weight deltas
-                gradients_key = f"gradients:{effective_model_id}:{round_num}"
-                gradient_data = []
-                round_device_metrics = []
-                for entry_raw in collected:
-                    entry = json.loads(entry_raw)
-                    grad_bytes = base64.b64decode(entry["gradients"])
-                    num_samples = entry.get("num_samples", 0)
-                    if num_samples <= 0 or not grad_bytes:
-                        logger.warning(
-                            "skipping_invalid_gradient",
-                            job_id=job_id,
-                            device_id=entry.get("device_id"),
-                        )
-                        continue
-                    gradient_data.append((grad_bytes, num_samples))
-                    device_metric = entry.get("metrics", {})
-                    device_metric["device_id"] = entry.get("device_id", "unknown")
-                    device_metric["num_samples"] = num_samples
-                    round_device_metrics.append(device_metric)
-
-                if not gradient_data:
-                    logger.error("all_gradients_invalid", job_id=job_id, round=round_num)
-                    await self.redis.delete(gradients_key)
-                    continue
+                await set_open_round(self.redis, effective_model_id, "")
 
-                averaged_grads = aggregate_gradients(gradient_data)
-
-                # Apply to global model: extract weights, apply deltas, rebuild .mlmodel
-                encoded_model = await self.redis.get(f"model:{effective_model_id}:global")
-                current_model_bytes = base64.b64decode(encoded_model)
-                current_weights = extract_weights(current_model_bytes)
-                new_weights = apply_gradients(current_weights, averaged_grads, learning_rate)
-                new_model_bytes = inject_weights(current_model_bytes, new_weights)
-
-                await self.redis.set(
-                    f"model:{effective_model_id}:global", base64.b64encode(new_model_bytes).decode()
+                # Only devices that reported are free again; the rest may still
+                # be training and must not be dispatched to (by any job) yet
+                reported = await self._reporters(gradients_key, round_device_metrics)
+                await self._restore_device_statuses(
+                    [d for d in dispatched_device_ids if d in reported], job_id,
                 )
+                stragglers += [d for d in dispatched_device_ids if d not in reported]
+                dispatched_device_ids = []
 
-                # Update model metadata version
-                meta_raw = await self.redis.get(f"model:{effective_model_id}:meta")
-                if meta_raw:
-                    meta = json.loads(meta_raw)
-                    meta["version"] = str(round_num)
-                    meta["size_bytes"] = len(new_model_bytes)
-                    await self.redis.set(f"model:{effective_model_id}:meta", json.dumps(meta))
-
-                # Update model version in DB if model_id differs from job_id
-                if effective_model_id != job_id:
-                    async with async_session() as session:
-                        model_repo = ModelRepository(session)
-                        await model_repo.update(uuid.UUID(effective_model_id), version=round_num)
+                if not round_completed:
+                    continue
 
-                # Server-side evaluation on held-out test set
-                evaluator = ServerEvaluator.get_instance()
-                eval_loss, eval_accuracy = evaluator.evaluate(new_weights, architecture=arch_key)
+                # Apply to the in-memory global model; the .mlmodel is rebuilt
+                # when the next round publishes it (or at checkpoint)
+                await run_cpu(
+                    model_state.apply_update, await run_cpu(accumulator.result_vector),
+                    version=round_num, optimizer=optimizer,
+                )
 
                 round_info = {
                     "round": round_num,
-                    "participants": len(gradient_data),
+                    "participants": accumulator.count,
                     "dispatched": len(devices),
-                    "avg_loss": round(eval_loss, 4),
-                    "avg_accuracy": round(eval_accuracy, 4),
+                    "quorum": quorum,
+                    "deadline_seconds": round(round_timeout, 1),
                     "device_metrics": round_device_metrics,
                 }
-                all_round_metrics.append(round_info)
-
-                # Update DB
-                async with async_session() as session:
-                    repo = TrainingJobRepository(session)
-                    await repo.update(
-                        uuid.UUID(job_id),
-                        round_metrics={"rounds": all_round_metrics},
+                if agg_cfg.clip_norm is not None:
+                    round_info["clipped"] = accumulator.clipped
+                if pipelined:
+                    # Evaluate a snapshot in the background while the next
+                    # round is already being dispatched
+                    persist_task = asyncio.create_task(self._finish_round(
+                        job_id, effective_model_id, arch_key, model_state,
+                        model_state.layout.unflatten(model_state.weights.copy()),
+                        round_info, all_round_metrics, round_start, after=persist_task,
+                    ))
+                else:
+                    await self._finish_round(
+                        job_id, effective_model_id, arch_key, model_state,
+                        model_state.weights_dict(), round_info, all_round_metrics, round_start,
                     )
 
-                # Store latest metrics in Redis for heartbeat responses
-                await self.redis.set(
-                    "training:latest_metrics",
-                    json.dumps({
-                        "server_accuracy": round(eval_accuracy, 4),
-                        "server_loss": round(eval_loss, 4),
-                        "round": round_num,
-                        "job_id": job_id,
-                    }),
-                )
-
-                TRAINING_ROUNDS_TOTAL.inc()
-                TRAINING_ROUND_DURATION.observe(time.perf_counter() - round_start)
-
-                logger.info(
-                    "training_round_completed",
-                    job_id=job_id,
-                    round=round_num,
-                    participants=len(gradient_data),
-                    avg_loss=round(eval_loss, 4),
-                    avg_accuracy=round(eval_accuracy, 4),
-                )
-
-                # Restore device statuses and clean up gradients for this round
-                await self._restore_device_statuses(dispatched_device_ids)
-                await self.redis.delete(gradients_key)
+                await self.redis.delete(gradients_key, gradient_events_key(gradients_key))
 
             # Job complete
+            if persist_task is not None:
+                await persist_task
+                persist_task = None
+            if model_state is not None:
+                await self._publish_model(effective_model_id, model_state)
+            await self.blob_redis.delete(optimizer_state_key(job_id))
+            await self.redis.delete(open_round_key(effective_model_id))
             async with async_session() as session:
                 repo = TrainingJobRepository(session)
                 await repo.update(
@@ -454,20 +506,503 @@ class TrainingCoordinator:
 
         except Exception:
             logger.exception("training_job_failed", job_id=job_id)
+            if model_state is not None:
+                try:
+                    await self._checkpoint(job_id, effective_model_id, model_state, optimizer)
+                except Exception:
+                    logger.exception("model_checkpoint_failed", job_id=job_id)
             async with async_session() as session:
                 repo = TrainingJobRepository(session)
                 await repo.update(uuid.UUID(job_id), status="failed")
             # Only clean stop flag, preserve model for potential resume
             await self._cleanup_redis_keys(job_id, model_id=effective_model_id, keep_model=True)
         finally:
-            await self._restore_device_statuses(dispatched_device_ids)
+            if persist_task is not None:
+                persist_task.cancel()
+                try:
+                    await persist_task
+                except asyncio.CancelledError:
+                    pass
+                except Exception:
+                    logger.exception("round_persist_failed", job_id=job_id)
+            await self._restore_device_statuses(dispatched_device_ids, job_id)
+            # No further rounds: stragglers go back online, but keep their
+            # leases until these run out so no other job dispatches to them
+            await self._restore_device_statuses(stragglers)
+            try:
+                await self.leases.unregister(job_id)
+            except Exception:
+                logger.exception("device_lease_unregister_failed", job_id=job_id)
             self._active_jobs.discard(job_id)
             self._tasks.pop(job_id, None)
             TRAINING_JOBS_ACTIVE.dec()
 
-    async def _restore_device_statuses(self, device_ids: list[str]) -> None:
+    async def _finish_round(
+        self, job_id: str, model_id: str, arch_key: str, model_state: ModelState,
+        weights: dict, round_info: dict, all_round_metrics: list[dict], round_start: float,
+        after: asyncio.Task | None = None,
+    ) -> None:
+        """Evaluate a round's model and persist its metrics.
+
+        `weights` must not change while this runs (a snapshot when rounds are
+        pipelined). `after` is the previous round's task, awaited first so
+        rounds are recorded in order.
+        """
+        if after is not None:
+            await after
+        round_num = round_info["round"]
+
+        # Update model version in DB if model_id differs from job_id
+        if model_id != job_id:
+            async with async_session() as session:
+                model_repo = ModelRepository(session)
+                await model_repo.update(uuid.UUID(model_id), version=round_num)
+
+        # Server-side evaluation on held-out test set
+        evaluator = ServerEvaluator.get_instance()
+        eval_loss, eval_accuracy = await run_cpu(evaluator.evaluate, weights, architecture=arch_key)
+        if model_state.version == round_num:
+            model_state.accuracy = eval_accuracy
+        # Pipelined rounds may have published this version before it was
+        # evaluated; its record needs the accuracy for best-version retention
+        await self.model_store.set_accuracy(model_id, round_num, eval_accuracy)
+
+        round_info["avg_loss"] = round(eval_loss, 4)
+        round_info["avg_accuracy"] = round(eval_accuracy, 4)
+        all_round_metrics.append(round_info)
+        await self._save_round_metrics(
+            job_id, round_num, all_round_metrics, eval_loss, eval_accuracy
+        )
+
+        TRAINING_ROUNDS_TOTAL.inc()
+        TRAINING_ROUND_DURATION.observe(time.perf_counter() - round_start)
+
+        logger.info(
+            "training_round_completed",
+            job_id=job_id,
+            round=round_num,
+            participants=round_info["participants"],
+            avg_loss=round(eval_loss, 4),
+            avg_accuracy=round(eval_accuracy, 4),
+        )
+
+    async def _load_model_state(
+        self, job_id: str, model_id: str, layout, optimizer: ServerOptimizer, default_version: int,
+    ) -> ModelState:
+        """Parse the stored global model and restore the optimizer state that goes with it.
+
+        The model keeps the version it was stored with (the last applied
+        round, which its optimizer checkpoint is tagged with); rounds are
+        only counted from `default_version` if the store does not know it.
+        """
+        version = await self._stored_version(model_id, default_version)
+        current_model_bytes = await self.model_store.get(model_id)
+        model_state = await run_cpu(
+            ModelState.from_bytes, bytes(current_model_bytes), layout, version=version,
+        )
+        if await load_optimizer_state(self.blob_redis, job_id, optimizer, model_state.version):
+            logger.info(
+                "server_optimizer_state_restored",
+                job_id=job_id,
+                optimizer=optimizer.name,
+                steps=optimizer.steps,
+            )
+        return model_state
+
+    async def _stored_version(self, model_id: str, default: int) -> int:
+        head = await self.model_store.head(model_id)
+        if head is not None:
+            return head.version
+        meta_raw = await self.redis.get(f"model:{model_id}:meta")
+        if meta_raw:
+            version = json.loads(meta_raw).get("version")
+            if version is not None:
+                return int(version)
+        return default
+
+    async def _save_round_metrics(
+        self, job_id: str, round_num: int, all_round_metrics: list[dict],
+        eval_loss: float, eval_accuracy: float, **job_fields,
+    ) -> None:
+        """Persist round metrics and expose the latest ones to heartbeat responses."""
+        async with async_session() as session:
+            repo = TrainingJobRepository(session)
+            await repo.update(
+                uuid.UUID(job_id),
+                round_metrics={"rounds": all_round_metrics},
+                **job_fields,
+            )
+
+        await self.redis.set(
+            "training:latest_metrics",
+            json.dumps({
+                "server_accuracy": round(eval_accuracy, 4),
+                "server_loss": round(eval_loss, 4),
+                "round": round_num,
+                "job_id": job_id,
+            }),
+        )
+
+    async def _run_buffered_updates(
+        self, job_id: str, model_id: str, arch_key: str, model_state: ModelState,
+        optimizer: ServerOptimizer, agg_cfg: AggregationConfig, async_cfg: AsyncTrainingConfig,
+        lease_cfg: DeviceLeaseConfig, num_rounds: int, learning_rate: float,
+        job_config: dict | None, all_round_metrics: list[dict],
+    ) -> bool:
+        """Async (FedBuff) training: keep devices busy, update every `buffer_size` deltas.
+
+        Every idle eligible device is dispatched for round `version + 1` of the
+        current model. Submissions are read from the gradient lists of every
+        round still in flight (blocking on their notification streams), scaled
+        by staleness and buffered; each full buffer becomes one server update
+        and one entry in round_metrics. Returns False if the job was stopped.
+        """
+        sched_cfg = SchedulerConfig.from_job_config(job_config)
+        layout = model_state.layout
+        # device_id -> (round it was dispatched for, dispatch time)
+        in_flight: dict[str, tuple[int, float]] = {}
+        # round -> gradient entries read so far, for every round still watched
+        seen: dict[int, int] = {}
+        last_event_ids: dict[str, bytes | str] = {}
+        buffer = StalenessBuffer(agg_cfg.make_accumulator(layout, async_cfg.buffer_size), async_cfg)
+        device_metrics: list[dict] = []
+        dropped_stale = 0
+        update_start = time.perf_counter()
+        next_dispatch = 0.0
+
+        model_state.set_learning_rate(
+            _cosine_lr(learning_rate, model_state.version + 1, num_rounds)
+        )
+        await self._checkpoint(job_id, model_id, model_state, optimizer)
+        # Several rounds are in flight at once; staleness decides what is late
+        await self.redis.delete(open_round_key(model_id))
+
+        try:
+            while model_state.version < num_rounds:
+                if await self.redis.get(f"training:{job_id}:stop"):
+                    logger.info(
+                        "training_job_stopped", job_id=job_id, round=model_state.version + 1
+                    )
+                    async with async_session() as session:
+                        repo = TrainingJobRepository(session)
+                        await repo.update(uuid.UUID(job_id), status="stopped")
+                    await self._cleanup_redis_keys(job_id, model_id=model_id)
+                    return False
+
+                now = time.monotonic()
+                timed_out = [
+                    device_id for device_id, (_, dispatched_at) in in_flight.items()
+                    if now - dispatched_at > settings.training_round_timeout_seconds
+                ]
+                for device_id in timed_out:
+                    del in_flight[device_id]
+                    logger.warning("async_device_timed_out", job_id=job_id, device_id=device_id)
+                await self._restore_device_statuses(timed_out, job_id)
+
+                # Hand the current model to every idle device (up to the concurrency limit)
+                limit = async_cfg.concurrency
+                if now >= next_dispatch and (limit is None or len(in_flight) < limit):
+                    next_dispatch = now + ASYNC_POLL_SECONDS
+                    async with async_session() as session:
+                        device_repo = DeviceRepository(session)
+                        all_online = await device_repo.list_all(status="online")
+                    idle = [
+                        d for d in await self._unleased(job_id, all_online)
+                        if str(d.id) not in in_flight
+                    ]
+                    selected = select_devices(idle, sched_cfg, 1) or []
+                    if limit is not None:
+                        selected = selected[: limit - len(in_flight)]
+                    selected = await self._lease_devices(
+                        job_id, lease_cfg, sched_cfg, 1, selected, len(all_online),
+                        held=len(in_flight),
+                    )
+                    if selected:
+                        round_num = model_state.version + 1
+                        async with async_session() as session:
+                            device_repo = DeviceRepository(session)
+                            for device in selected:
+                                await device_repo.update(device.id, status="training")
+                        for i, device in enumerate(selected):
+                            await self.heartbeat_monitor.queue_command(
+                                str(device.id),
+                                {
+                                    "type": "start_training",
+                                    "parameters": {
+                                        "job_id": job_id,
+                                        "model_id": model_id,
+                                        "round": str(round_num),
+                                        "partition_index": str(i),
+                                        "partition_total": str(len(selected)),
+                                        "architecture": arch_key,
+                                    },
+                                },
+                            )
+                            in_flight[str(device.id)] = (round_num, now)
+                        seen.setdefault(round_num, 0)
+                        logger.info(
+                            "async_devices_dispatched",
+                            job_id=job_id,
+                            round=round_num,
+                            devices=len(selected),
+                            in_flight=len(in_flight),
+                        )
+
+                # Read every new submission of the rounds still watched
+                arrivals: list[tuple[int, bytes]] = []
+                for round_num in sorted(seen):
+                    key = f"gradients:{model_id}:{round_num}"
+                    entries = await self.blob_redis.lrange(key, seen[round_num], -1)
+                    seen[round_num] += len(entries)
+                    arrivals.extend((round_num, entry_raw) for entry_raw in entries)
+
+                released: list[str] = []
+                for round_num, entry_raw in arrivals:
+                    # Dispatched for round r means trained on model version r - 1
+                    staleness = model_state.version - (round_num - 1)
+                    if staleness > async_cfg.max_staleness:
+                        dropped_stale += 1
+                        device_id = _entry_device_id(entry_raw)
+                        logger.info(
+                            "async_stale_gradient_dropped",
+                            job_id=job_id,
+                            device_id=device_id,
+                            staleness=staleness,
+                        )
+                    else:
+                        metric = await run_cpu(
+                            self._fold_gradient_entry, entry_raw, buffer, staleness=staleness,
+                        )
+                        device_id = None
+                        if metric is not None:
+                            metric["staleness"] = staleness
+                            device_metrics.append(metric)
+                            device_id = metric["device_id"]
+                    if device_id is not None and in_flight.get(device_id, (None,))[0] == round_num:
+                        del in_flight[device_id]
+                        released.append(device_id)
+
+                    if buffer.count < async_cfg.buffer_size:
+                        continue
+
+                    # Buffer full: one server update
+                    await run_cpu(
+                        model_state.apply_update, await run_cpu(buffer.result_vector),
+                        version=model_state.version + 1, optimizer=optimizer,
+                    )
+                    version = model_state.version
+                    if model_id != job_id:
+                        async with async_session() as session:
+                            model_repo = ModelRepository(session)
+                            await model_repo.update(uuid.UUID(model_id), version=version)
+
+                    evaluator = ServerEvaluator.get_instance()
+                    eval_loss, eval_accuracy = await run_cpu(
+                        evaluator.evaluate, model_state.weights_dict(), architecture=arch_key,
+                    )
+                    model_state.accuracy = eval_accuracy
+
+                    round_info = {
+                        "round": version,
+                        "participants": buffer.count,
+                        "in_flight": len(in_flight),
+                        "avg_loss": round(eval_loss, 4),
+                        "avg_accuracy": round(eval_accuracy, 4),
+                        "avg_staleness": round(sum(buffer.staleness) / len(buffer.staleness), 2),
+                        "max_staleness": max(buffer.staleness),
+                        "dropped_stale": dropped_stale,
+                        "device_metrics": device_metrics,
+                    }
+                    if agg_cfg.clip_norm is not None:
+                        round_info["clipped"] = buffer.accumulator.clipped
+                    all_round_metrics.append(round_info)
+                    await self._save_round_metrics(
+                        job_id, version, all_round_metrics, eval_loss, eval_accuracy,
+                        current_round=version,
+                    )
+
+                    TRAINING_ROUNDS_TOTAL.inc()
+                    TRAINING_ROUND_DURATION.observe(time.perf_counter() - update_start)
+                    logger.info(
+                        "async_update_applied",
+                        job_id=job_id,
+                        version=version,
+                        participants=buffer.count,
+                        avg_staleness=round_info["avg_staleness"],
+                        avg_accuracy=round(eval_accuracy, 4),
+                    )
+
+                    if version < num_rounds:
+                        model_state.set_learning_rate(
+                            _cosine_lr(learning_rate, version + 1, num_rounds)
+                        )
+                    # Devices dispatched from here on train on the new version
+                    await self._checkpoint(job_id, model_id, model_state, optimizer)
+
+                    buffer = StalenessBuffer(
+                        agg_cfg.make_accumulator(layout, async_cfg.buffer_size), async_cfg,
+                    )
+                    device_metrics = []
+                    dropped_stale = 0
+                    update_start = time.perf_counter()
+                    if version >= num_rounds:
+                        break
+
+                if released:
+                    await self._restore_device_statuses(released, job_id)
+                    next_dispatch = 0.0
+
+                # Stop watching rounds no device is still training for
+                current_round = model_state.version + 1
+                active_rounds = {r for r, _ in in_flight.values()}
+                for round_num in [r for r in seen if r != current_round and r not in active_rounds]:
+                    key = f"gradients:{model_id}:{round_num}"
+                    await self.redis.delete(key, gradient_events_key(key))
+                    del seen[round_num]
+                    last_event_ids.pop(gradient_events_key(key), None)
+
+                if arrivals or model_state.version >= num_rounds:
+                    continue
+                if not seen:
+                    await asyncio.sleep(ASYNC_POLL_SECONDS)
+                    continue
+                events_keys = [gradient_events_key(f"gradients:{model_id}:{r}") for r in seen]
+                streams = {key: last_event_ids.get(key, "0-0") for key in events_keys}
+                events = await self.blob_redis.xread(
+                    streams, block=int(ASYNC_POLL_SECONDS * 1000),
+                )
+                for stream, messages in events or []:
+                    if messages:
+                        name = stream.decode() if isinstance(stream, bytes) else stream
+                        last_event_ids[name] = messages[-1][0]
+        finally:
+            await self._restore_device_statuses(list(in_flight), job_id)
+        return True
+
+    async def _redis_clock(self) -> float:
+        """Current Redis server time, the clock gradient stream IDs are stamped with."""
+        seconds, micros = await self.redis.time()
+        return seconds + micros / 1e6
+
+    async def _record_completion_times(
+        self, timing: CompletionTimeTracker, gradients_key: str, devices: list,
+        dispatched_at: float, round_device_metrics: list[dict],
+    ) -> None:
+        """Feed dispatch-to-submission times of a round into the completion-time model."""
+        try:
+            elapsed: dict[str, float] = {}
+            events = await self.blob_redis.xrange(gradient_events_key(gradients_key))
+            for event_id, fields in events:
+                if isinstance(event_id, bytes):
+                    event_id = event_id.decode()
+                device_id = fields.get(b"device_id", fields.get("device_id"))
+                if isinstance(device_id, bytes):
+                    device_id = device_id.decode()
+                arrived_at = int(event_id.split("-")[0]) / 1000
+                elapsed.setdefault(device_id, max(0.0, arrived_at - dispatched_at))
+            for metric in round_device_metrics:
+                if metric["device_id"] in elapsed:
+                    metric["completion_seconds"] = round(elapsed[metric["device_id"]], 2)
+            await timing.record(
+                devices, elapsed,
+                {m["device_id"]: m for m in round_device_metrics},
+                waited=await self._redis_clock() - dispatched_at,
+            )
+        except Exception:
+            logger.exception("record_completion_times_failed", key=gradients_key)
+
+    async def _checkpoint(
+        self, job_id: str, model_id: str, state: ModelState, optimizer: ServerOptimizer,
+    ) -> None:
+        """Publish the model and the server optimizer state that goes with its version."""
+        if not state.dirty:
+            return
+        await self._publish_model(model_id, state)
+        await save_optimizer_state(self.blob_redis, job_id, optimizer, state.version)
+
+    async def _publish_model(self, model_id: str, state: ModelState) -> None:
+        """Materialize the model if it changed and store it with its metadata."""
+        if not state.dirty:
+            return
+        # Serializes the in-process spec, so threads rather than processes
+        model_bytes = await run_cpu(state.to_bytes)
+        await self.model_store.put(
+            model_id, model_bytes, version=state.version, accuracy=state.accuracy
+        )
+
+        meta_raw = await self.redis.get(f"model:{model_id}:meta")
+        if meta_raw:
+            meta = json.loads(meta_raw)
+            meta["version"] = str(state.version)
+            meta["size_bytes"] = len(model_bytes)
+            await self.redis.set(f"model:{model_id}:meta", json.dumps(meta))
+
+    async def _reporters(self, gradients_key: str, device_metrics: list[dict]) -> set[str]:
+        """Devices that submitted to a closed round, whether or not their entry was folded in."""
+        reporters = {m["device_id"] for m in device_metrics}
+        for entry_raw in await self.blob_redis.lrange(gradients_key, 0, -1):
+            device_id = _entry_device_id(entry_raw)
+            if device_id is not None:
+                reporters.add(device_id)
+        return reporters
+
+    async def _reclaim_stragglers(
+        self, job_id: str, model_id: str, stragglers: list[str]
+    ) -> list[str]:
+        """Free stragglers that submitted late or whose lease lapsed; returns the rest."""
+        if not stragglers:
+            return []
+        late = await pop_late_devices(self.redis, model_id, stragglers)
+        await self._restore_device_statuses(sorted(late), job_id)
+        owners = await self.leases.owners([d for d in stragglers if d not in late])
+        # A lapsed lease may already be someone else's: leave those devices alone
+        lapsed = [d for d, owner in owners.items() if owner is None]
+        await self._restore_device_statuses(lapsed)
+        return [d for d, owner in owners.items() if owner == job_id]
+
+    async def _unleased(self, job_id: str, devices: list) -> list:
+        """Devices not currently leased to another job."""
+        taken = await self.leases.leased_by_others(job_id, [str(d.id) for d in devices])
+        return [d for d in devices if str(d.id) not in taken]
+
+    async def _lease_devices(
+        self, job_id: str, lease_cfg: DeviceLeaseConfig, sched_cfg: SchedulerConfig,
+        min_devices: int, selected: list, pool_size: int, held: int = 0,
+    ) -> list:
+        """Lease as many of `selected` as this job's share allows (on top of `held`).
+
+        The job registers (or refreshes) its priority and cap first, so
+        concurrent jobs see each other when they compute their shares. Never
+        limits a job below `min_devices`; the atomic lease still prevents
+        double-booking if shares overlap.
+        """
+        cap = lease_cfg.max_devices
+        if sched_cfg.enabled and sched_cfg.target_devices is not None:
+            demand = math.ceil(
+                max(sched_cfg.target_devices, min_devices) * sched_cfg.over_select_factor
+            )
+            cap = demand if cap is None else min(cap, demand)
+        await self.leases.register(job_id, lease_cfg.priority, cap, _lease_ttl())
+        limit = max(await self.leases.device_limit(job_id, pool_size), min_devices) - held
+        wanted = [str(d.id) for d in selected[: max(limit, 0)]]
+        acquired = set(await self.leases.acquire(job_id, wanted, _lease_ttl()))
+        leased = [d for d in selected if str(d.id) in acquired]
+        if len(leased) < min_devices:
+            await self.leases.release(job_id, list(acquired))
+            return []
+        return leased
+
+    async def _restore_device_statuses(
+        self, device_ids: list[str], job_id: str | None = None
+    ) -> None:
+        """Put devices back online and, for `job_id`, release their leases."""
         if not device_ids:
             return
+        if job_id is not None:
+            try:
+                await self.leases.release(job_id, device_ids)
+            except Exception:
+                logger.exception("device_lease_release_failed", job_id=job_id)
         try:
             async with async_session() as session:
                 repo = DeviceRepository(session)
@@ -479,20 +1014,67 @@ class TrainingCoordinator:
             logger.exception("restore_device_statuses_failed")
 
     async def _wait_for_gradients(
-        self, key: str, expected: int, timeout: int = 60
-    ) -> list[str]:
-        elapsed = 0
-        poll_interval = 2
-        while elapsed < timeout:
-            count = await self.redis.llen(key)
-            if count >= expected:
+        self, key: str, expected: int, timeout: float = 60,
+        accumulator: FedAvgAccumulator | MatrixAccumulator | None = None,
+    ) -> list[dict]:
+        """Collect gradient entries for a round, aggregating them as they land.
+
+        Each entry is folded into `accumulator` as soon as it is seen, so the
+        aggregation work overlaps with waiting for stragglers. Instead of
+        polling, the wait blocks on the round's notification stream
+        (`{key}:events`, written by SubmitGradients) and wakes up as soon as
+        a new submission lands, until `expected` entries could be
+        aggregated. Returns the per-device metrics of every valid entry.
+        """
+        accumulator = accumulator if accumulator is not None else FedAvgAccumulator()
+        events_key = gradient_events_key(key)
+        last_event_id: bytes | str = "0-0"
+        device_metrics: list[dict] = []
+        seen = 0
+        deadline = time.monotonic() + timeout
+        while True:
+            entries = await self.blob_redis.lrange(key, seen, -1)
+            seen += len(entries)
+            for entry_raw in entries:
+                metric = await run_cpu(self._fold_gradient_entry, entry_raw, accumulator)
+                if metric is not None:
+                    device_metrics.append(metric)
+            remaining = deadline - time.monotonic()
+            # Malformed entries were skipped: only usable updates count
+            if len(device_metrics) >= expected or remaining <= 0:
                 break
-            await asyncio.sleep(poll_interval)
-            elapsed += poll_interval
+            events = await self.blob_redis.xread(
+                {events_key: last_event_id}, count=expected,
+                block=max(1, int(remaining * 1000)),
+            )
+            for _stream, messages in events or []:
+                if messages:
+                    last_event_id = messages[-1][0]
 
-        # Collect whatever we have
-        entries = await self.redis.lrange(key, 0, -1)
-        return entries
+        return device_metrics
+
+    @staticmethod
+    def _fold_gradient_entry(
+        entry_raw: bytes, accumulator: FedAvgAccumulator | MatrixAccumulator | StalenessBuffer,
+        **add_kwargs,
+    ) -> dict | None:
+        try:
+            entry = decode_gradient_entry(entry_raw)
+        except (ValueError, struct.error):
+            logger.warning("skipping_malformed_gradient_entry")
+            return None
+        if entry.num_samples <= 0 or not entry.gradients:
+            logger.warning("skipping_invalid_gradient", device_id=entry.device_id)
+            return None
+        try:
+            accumulator.add(entry.gradients, entry.num_samples, wire=entry.is_wire, **add_kwargs)
+        except (ValueError, struct.error):
+            logger.warning("skipping_malformed_gradient", device_id=entry.device_id)
+            return None
+        device_metric = dict(entry.metrics)
+        device_metric["device_id"] = entry.device_id
+        device_metric["num_samples"] = entry.num_samples
+        return device_metric
 
     async def _cleanup_redis_keys(
         self, job_id: str, model_id: str | None = None, keep_model: bool = False,
@@ -500,10 +1082,11 @@ class TrainingCoordinator:
         """Clean up Redis state for a job that stopped or failed."""
         effective_model_id = model_id or job_id
         try:
-            await self.redis.delete(f"training:{job_id}:stop")
+            await self.redis.delete(f"training:{job_id}:stop", open_round_key(effective_model_id))
             if not keep_model:
-                await self.redis.delete(f"model:{effective_model_id}:global")
+                await self.model_store.delete(effective_model_id)
                 await self.redis.delete(f"model:{effective_model_id}:meta")
+                await self.blob_redis.delete(optimizer_state_key(job_id))
             # Always clean up any leftover gradient keys
             cursor = b"0"
             while cursor:
@@ -567,3 +1150,22 @@ class TrainingCoordinator:
                 logger.exception("training_coordinator_error")
 
             await asyncio.sleep(5)
+
+
+def _lease_ttl() -> float:
+    return settings.training_round_timeout_seconds + settings.device_lease_grace_seconds
+
+
+def _cosine_lr(learning_rate: float, round_num: int, num_rounds: int) -> float:
+    """Cosine decay from `learning_rate` down to 1% of it at the last round."""
+    lr_min = learning_rate * 0.01
+    return lr_min + 0.5 * (learning_rate - lr_min) * (
+        1 + math.cos(math.pi * round_num / num_rounds)
+    )
+
+
+def _entry_device_id(entry_raw: bytes) -> str | None:
+    try:
+        return decode_gradient_entry(entry_raw).device_id
+    except (ValueError, struct.error):
+        return None
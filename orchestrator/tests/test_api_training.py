@@ -117,3 +117,44 @@ class TestTrainingAPI:
     async def test_retry_nonexistent_job(self, client: httpx.AsyncClient):
         resp = await client.post(f"/api/v1/training/jobs/{uuid.uuid4()}/retry")
         assert resp.status_code == 404
+
+    async def test_download_model_raw_bytes(
+        self, client: httpx.AsyncClient, fake_redis
+    ):
+        from orchestrator.api.routes import training as training_mod
+        from orchestrator.services.redis_blobs import save_model
+
+        training_mod.set_redis(fake_redis, fake_redis)
+
+        create_resp = await client.post("/api/v1/training/jobs", json={"num_rounds": 1})
+        data = create_resp.json()
+        model_bytes = b"\x08\x04" + bytes(range(256))
+        await save_model(fake_redis, data["model_id"], model_bytes)
+
+        resp = await client.get(f"/api/v1/training/jobs/{data['id']}/model")
+        assert resp.status_code == 200
+        assert resp.content == model_bytes
+
+        training_mod._redis = None
+        training_mod._model_store = None
+
+    async def test_download_model_from_file_store(
+        self, client: httpx.AsyncClient, fake_redis, tmp_path
+    ):
+        from orchestrator.api.routes import training as training_mod
+        from orchestrator.services.model_store import FileModelStore
+
+        store = FileModelStore(tmp_path, fake_redis)
+        training_mod.set_redis(fake_redis, fake_redis, store)
+
+        create_resp = await client.post("/api/v1/training/jobs", json={"num_rounds": 1})
+        data = create_resp.json()
+        model_bytes = b"\x08\x04" + bytes(range(256))
+        await store.put(data["model_id"], model_bytes, version=1)
+
+        resp = await client.get(f"/api/v1/training/jobs/{data['id']}/model")
+        assert resp.status_code == 200
+        assert resp.content == model_bytes
+
+        training_mod._redis = None
+        training_mod._model_store = None
@@ -0,0 +1,88 @@
+"""Tests for per-device completion-time prediction and adaptive round deadlines."""
+
+import json
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from orchestrator.services.completion_time import CompletionTimeTracker, DeadlineConfig
+
+
+def _device(device_model="iPhone15,2", chip="A15 Bionic"):
+    return SimpleNamespace(id=uuid.uuid4(), device_model=device_model, chip=chip)
+
+
+class TestDeadlineConfig:
+    def test_disabled_by_default(self):
+        for config in (None, {}, {"deadline": {}}):
+            assert not DeadlineConfig.from_job_config(config).enabled
+
+    def test_reads_settings(self):
+        cfg = DeadlineConfig.from_job_config(
+            {"deadline": {"enabled": True, "percentile": 0.5, "slack": 2.0, "max_seconds": 60}}
+        )
+        assert (cfg.enabled, cfg.percentile, cfg.slack, cfg.max_seconds) == (True, 0.5, 2.0, 60)
+
+    @pytest.mark.parametrize("key,value", [("percentile", 0), ("alpha", 1.5)])
+    def test_rejects_invalid_values(self, key, value):
+        with pytest.raises(ValueError, match=key):
+            DeadlineConfig.from_job_config({"deadline": {key: value}})
+
+    def test_round_deadline_at_percentile(self):
+        cfg = DeadlineConfig(percentile=0.5, slack=1.5, min_seconds=1.0)
+        assert cfg.round_deadline([10.0, 20.0, 40.0, 100.0], timeout=180) == 30.0
+
+    def test_round_deadline_clamped(self):
+        cfg = DeadlineConfig(percentile=1.0, slack=1.0, min_seconds=15.0)
+        assert cfg.round_deadline([2.0, 3.0], timeout=180) == 15.0
+        assert cfg.round_deadline([500.0], timeout=180) == 180
+
+    def test_unknown_devices_count_as_timeout(self):
+        cfg = DeadlineConfig(percentile=0.9, slack=1.0, min_seconds=1.0)
+        assert cfg.round_deadline([10.0] * 8 + [None, None], timeout=180) == 180
+        assert cfg.round_deadline([], timeout=180) == 180
+
+
+class TestCompletionTimeTracker:
+    async def test_ewma_per_device_and_phases(self, fake_redis):
+        tracker = CompletionTimeTracker(fake_redis, "mnist", alpha=0.5)
+        device = _device()
+        did = str(device.id)
+        metrics = {did: {"download_seconds": 1.0, "train_seconds": 5.0}}
+
+        await tracker.record([device], {did: 10.0}, metrics)
+        assert await tracker.predict([device]) == {did: 10.0}
+
+        await tracker.record([device], {did: 20.0}, {did: {}})
+        assert await tracker.predict([device]) == {did: 15.0}
+
+        stats = json.loads(await fake_redis.hget("device_timing:mnist", f"device:{did}"))
+        assert (stats["download"], stats["train"], stats["upload"]) == (1.0, 5.0, 4.0)
+        assert stats["samples"] == 2
+
+    async def test_cohort_predicts_new_devices(self, fake_redis):
+        tracker = CompletionTimeTracker(fake_redis, "mnist")
+        seen, new, other = _device(), _device(), _device(device_model="Mac14,7", chip="Apple M2")
+        await tracker.record([seen], {str(seen.id): 12.0}, {})
+
+        predictions = await tracker.predict([new, other])
+        assert predictions == {str(new.id): 12.0}
+
+    async def test_censored_devices_only_raise_estimates(self, fake_redis):
+        tracker = CompletionTimeTracker(fake_redis, "mnist", alpha=0.5)
+        device = _device()
+        did = str(device.id)
+        await tracker.record([device], {did: 10.0}, {})
+
+        await tracker.record([device], {}, {}, waited=5.0)
+        assert (await tracker.predict([device]))[did] == 10.0
+
+        await tracker.record([device], {}, {}, waited=30.0)
+        assert (await tracker.predict([device]))[did] == 20.0
+
+    async def test_architectures_are_separate(self, fake_redis):
+        device = _device()
+        await CompletionTimeTracker(fake_redis, "cifar10").record(
+            [device], {str(device.id): 90.0}, {}
+        )
+        assert await CompletionTimeTracker(fake_redis, "mnist").predict([device]) == {}
@@ -88,3 +88,37 @@ class TestCoreMLModel:
 
         for name in original:
             np.testing.assert_allclose(recovered[name], original[name], rtol=0)
+
+    def test_inject_is_byte_identical_to_original(self):
+        """Packed-bytes injection serializes exactly like the repeated-field path."""
+        arch = get_architecture("cifar10")
+        model_bytes = create_updatable_mlmodel_for_architecture(arch)
+
+        assert inject_weights(model_bytes, extract_weights(model_bytes)) == model_bytes
+
+    def test_inject_keeps_layers_updatable(self):
+        from coremltools.proto import Model_pb2
+
+        model_bytes = create_updatable_mlmodel()
+        weights = {name: np.ones(shape) for name, shape in LAYER_SHAPES.items()}  # float64
+        new_bytes = inject_weights(model_bytes, weights)
+
+        spec = Model_pb2.Model()
+        spec.ParseFromString(new_bytes)
+        for layer in spec.neuralNetworkClassifier.layers:
+            if layer.HasField("innerProduct"):
+                assert layer.innerProduct.weights.isUpdatable
+                assert layer.innerProduct.bias.isUpdatable
+
+        recovered = extract_weights(new_bytes)
+        for name, shape in LAYER_SHAPES.items():
+            assert recovered[name].dtype == np.float32
+            np.testing.assert_array_equal(recovered[name], np.ones(shape, dtype=np.float32))
+
+    def test_inject_non_contiguous_weights(self):
+        model_bytes = create_updatable_mlmodel()
+        rng = np.random.default_rng(1)
+        transposed = rng.standard_normal((784, 128)).astype(np.float32).T
+        new_bytes = inject_weights(model_bytes, {"hidden_weight": transposed})
+
+        np.testing.assert_array_equal(extract_weights(new_bytes)["hidden_weight"], transposed)
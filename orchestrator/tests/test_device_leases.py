@@ -0,0 +1,130 @@
+"""Tests for cross-job device leases and fair-share arbitration."""
+
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from orchestrator.services.device_leases import (
+    DeviceLeaseConfig,
+    DeviceLeaseManager,
+    device_lease_key,
+    fair_shares,
+)
+from orchestrator.services.device_scheduler import SchedulerConfig
+from orchestrator.services.training_coordinator import TrainingCoordinator
+
+
+class TestDeviceLeaseConfig:
+    def test_defaults(self):
+        for config in (None, {}, {"leases": {}}):
+            cfg = DeviceLeaseConfig.from_job_config(config)
+            assert (cfg.priority, cfg.max_devices) == (1, None)
+
+    @pytest.mark.parametrize("key,value", [("priority", 0), ("max_devices", 0)])
+    def test_rejects_invalid_values(self, key, value):
+        with pytest.raises(ValueError, match=key):
+            DeviceLeaseConfig.from_job_config({"leases": {key: value}})
+
+
+class TestFairShares:
+    def test_equal_priorities_split_evenly(self):
+        assert fair_shares({"a": (1, None), "b": (1, None)}, 10) == {"a": 5, "b": 5}
+
+    def test_proportional_to_priority(self):
+        assert fair_shares({"a": (3, None), "b": (1, None)}, 8) == {"a": 6, "b": 2}
+
+    def test_capped_jobs_leave_the_rest(self):
+        shares = fair_shares({"a": (1, 2), "b": (1, None), "c": (1, None)}, 10)
+        assert shares == {"a": 2, "b": 4, "c": 4}
+
+    def test_rounding_is_deterministic(self):
+        assert fair_shares({"b": (1, None), "a": (1, None), "c": (2, None)}, 5) == {
+            "c": 3, "a": 1, "b": 1,
+        }
+
+    def test_empty_pool(self):
+        assert fair_shares({"a": (1, None)}, 0) == {"a": 0}
+
+
+class TestDeviceLeaseManager:
+    async def test_acquire_skips_devices_of_other_jobs(self, fake_redis):
+        leases = DeviceLeaseManager(fake_redis)
+        assert await leases.acquire("job-a", ["d1", "d2"], ttl=60) == ["d1", "d2"]
+        assert await leases.acquire("job-b", ["d2", "d3"], ttl=60) == ["d3"]
+        # Re-acquiring your own lease succeeds
+        assert await leases.acquire("job-a", ["d1"], ttl=60) == ["d1"]
+        assert await leases.leased_by_others("job-b", ["d1", "d2", "d3"]) == {"d1", "d2"}
+
+    async def test_release_and_renew_only_own_leases(self, fake_redis):
+        leases = DeviceLeaseManager(fake_redis)
+        await leases.acquire("job-a", ["d1"], ttl=60)
+        await leases.release("job-b", ["d1"])
+        assert await fake_redis.get(device_lease_key("d1")) == b"job-a"
+
+        await leases.renew("job-b", ["d1"], ttl=1000)
+        assert await fake_redis.pttl(device_lease_key("d1")) <= 60_000
+        await leases.renew("job-a", ["d1"], ttl=1000)
+        assert await fake_redis.pttl(device_lease_key("d1")) > 60_000
+
+        await leases.release("job-a", ["d1"])
+        assert await fake_redis.get(device_lease_key("d1")) is None
+
+    async def test_leases_expire(self, fake_redis):
+        leases = DeviceLeaseManager(fake_redis)
+        await leases.acquire("job-a", ["d1"], ttl=0.01)
+        await asyncio.sleep(0.05)
+        assert await leases.acquire("job-b", ["d1"], ttl=60) == ["d1"]
+
+    async def test_device_limit_uses_registered_jobs(self, fake_redis):
+        leases = DeviceLeaseManager(fake_redis)
+        assert await leases.device_limit("job-a", 9) == 9
+        await leases.register("job-a", 2, None, ttl=60)
+        await leases.register("job-b", 1, None, ttl=60)
+        assert await leases.device_limit("job-a", 9) == 6
+        assert await leases.device_limit("job-b", 9) == 3
+
+        await leases.unregister("job-b")
+        assert await leases.device_limit("job-a", 9) == 9
+
+    async def test_expired_registrations_are_ignored(self, fake_redis):
+        leases = DeviceLeaseManager(fake_redis)
+        await leases.register("job-a", 1, None, ttl=60)
+        await leases.register("job-b", 1, None, ttl=-1)
+        assert await leases.active_jobs() == {"job-a": (1, None)}
+
+
+class TestConcurrentJobs:
+    async def test_two_coordinators_partition_the_fleet(self, fake_redis):
+        devices = [SimpleNamespace(id=uuid.uuid4()) for _ in range(6)]
+        first = TrainingCoordinator(redis=fake_redis, heartbeat_monitor=None)
+        second = TrainingCoordinator(redis=fake_redis, heartbeat_monitor=None)
+        lease_cfg = DeviceLeaseConfig()
+        sched_cfg = SchedulerConfig()
+
+        # Both jobs are running, so each is entitled to half of the fleet
+        await first.leases.register("job-a", 1, None, ttl=60)
+        await second.leases.register("job-b", 1, None, ttl=60)
+        a = await first._lease_devices("job-a", lease_cfg, sched_cfg, 1, devices, len(devices))
+        b = await second._lease_devices(
+            "job-b",
+            lease_cfg,
+            sched_cfg,
+            1,
+            await second._unleased("job-b", devices),
+            len(devices),
+        )
+
+        assert len(a) == 3 and len(b) == 3
+        assert not {d.id for d in a} & {d.id for d in b}
+
+    async def test_min_devices_not_met_releases_everything(self, fake_redis):
+        devices = [SimpleNamespace(id=uuid.uuid4()) for _ in range(3)]
+        coordinator = TrainingCoordinator(redis=fake_redis, heartbeat_monitor=None)
+        await coordinator.leases.acquire("other", [str(devices[0].id), str(devices[1].id)], ttl=60)
+
+        leased = await coordinator._lease_devices(
+            "job-a", DeviceLeaseConfig(), SchedulerConfig(), 2, devices, len(devices),
+        )
+        assert leased == []
+        assert await fake_redis.get(device_lease_key(str(devices[2].id))) is None
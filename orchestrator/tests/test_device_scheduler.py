@@ -199,3 +199,66 @@ class TestSelectDevices:
         result = select_devices(devices, cfg, min_devices=3)
         assert result is not None
         assert len(result) == 3
+
+
+# ---------------------------------------------------------------------------
+# Over-selection and quorum
+# ---------------------------------------------------------------------------
+class TestOverSelection:
+    def test_config_parsing(self):
+        cfg = SchedulerConfig.from_job_config(
+            {"scheduler": {"enabled": True, "over_select_factor": 1.3, "quorum_fraction": 0.8}}
+        )
+        assert cfg.over_select_factor == 1.3
+        assert cfg.quorum_fraction == 0.8
+
+    @pytest.mark.parametrize("key,value", [
+        ("over_select_factor", 0.9), ("quorum_fraction", 0.0), ("quorum_fraction", 1.5),
+    ])
+    def test_config_rejects_invalid_values(self, key, value):
+        with pytest.raises(ValueError, match=key):
+            SchedulerConfig.from_job_config({"scheduler": {key: value}})
+
+    def test_over_selects_beyond_target(self):
+        cfg = SchedulerConfig(enabled=True, target_devices=10, over_select_factor=1.3)
+        devices = [_make_device() for _ in range(20)]
+        result = select_devices(devices, cfg, min_devices=1)
+        assert len(result) == 13
+        assert cfg.quorum(len(result), min_devices=1) == 10
+
+    def test_quorum_capped_by_available_devices(self):
+        cfg = SchedulerConfig(enabled=True, target_devices=10, over_select_factor=1.3)
+        devices = [_make_device() for _ in range(8)]
+        result = select_devices(devices, cfg, min_devices=1)
+        assert len(result) == 8
+        assert cfg.quorum(len(result), min_devices=1) == 8
+
+    def test_quorum_fraction_of_all_selected(self):
+        cfg = SchedulerConfig(quorum_fraction=0.75)
+        assert cfg.quorum(10, min_devices=1) == 8
+        assert SchedulerConfig().quorum(10, min_devices=1) == 10
+        assert SchedulerConfig(quorum_fraction=0.01).quorum(10, min_devices=1) == 1
+
+
+# ---------------------------------------------------------------------------
+# Predicted stragglers
+# ---------------------------------------------------------------------------
+class TestPredictedStragglers:
+    def test_drops_devices_predicted_to_miss_deadline(self):
+        fast, slow, unknown = _make_device(), _make_device(), _make_device()
+        predicted = {str(fast.id): 20.0, str(slow.id): 300.0}
+        for cfg in (SchedulerConfig(enabled=False), SchedulerConfig(enabled=True)):
+            result = select_devices(
+                [fast, slow, unknown], cfg, min_devices=1,
+                predicted_seconds=predicted, max_seconds=180,
+            )
+            assert set(map(id, result)) == {id(fast), id(unknown)}
+
+    def test_keeps_fastest_stragglers_to_reach_min_devices(self):
+        slow, slower = _make_device(), _make_device()
+        predicted = {str(slow.id): 200.0, str(slower.id): 400.0}
+        result = select_devices(
+            [slower, slow], SchedulerConfig(enabled=True), min_devices=1,
+            predicted_seconds=predicted, max_seconds=180,
+        )
+        assert result == [slow]
@@ -0,0 +1,97 @@
+"""Tests for the CPU-bound work executors and the loop lag monitor."""
+
+import asyncio
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+from orchestrator.grpc_server.model_service import ModelServiceServicer
+from orchestrator.services import executors
+from orchestrator.services.coreml_model import (
+    create_updatable_mlmodel,
+    extract_weights,
+    inject_weights,
+)
+from orchestrator.services.model_delta import apply_weight_payload
+from orchestrator.services.model_store import FileModelStore
+from prometheus_client import REGISTRY
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels or None) or 0.0
+
+
+@pytest.fixture(autouse=True)
+def fresh_pools():
+    executors.shutdown_executors()
+    yield
+    executors.shutdown_executors()
+
+
+class TestExecutors:
+    async def test_run_cpu_leaves_the_loop_thread(self):
+        loop_thread = threading.get_ident()
+        before = _sample("eo_executor_task_duration_seconds_count", pool="thread")
+        worker_thread = await executors.run_cpu(threading.get_ident)
+        assert worker_thread != loop_thread
+        assert _sample("eo_executor_task_duration_seconds_count", pool="thread") == before + 1
+
+    async def test_run_cpu_passes_arguments(self):
+        assert await executors.run_cpu(sorted, [3, 1, 2], reverse=True) == [3, 2, 1]
+
+    async def test_run_proto_falls_back_to_threads(self, monkeypatch):
+        monkeypatch.setattr(executors.settings, "executor_processes", 0)
+        assert await executors.run_proto(os.getpid) == os.getpid()
+
+    async def test_run_proto_uses_processes(self, monkeypatch):
+        monkeypatch.setattr(executors.settings, "executor_processes", 1)
+        before = _sample("eo_executor_task_duration_seconds_count", pool="process")
+        assert await executors.run_proto(os.getpid) != os.getpid()
+        assert _sample("eo_executor_task_duration_seconds_count", pool="process") == before + 1
+
+    async def test_loop_keeps_running_during_offloaded_work(self):
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        await executors.run_cpu(time.sleep, 0.2)
+        task.cancel()
+        assert ticks >= 5
+
+
+class TestLoopLagMonitor:
+    async def test_records_blocked_loop(self):
+        before = _sample("eo_event_loop_lag_seconds_sum")
+        task = asyncio.create_task(executors.monitor_loop_lag(interval=0.01))
+        await asyncio.sleep(0)
+        time.sleep(0.2)  # block the loop
+        await asyncio.sleep(0.05)
+        task.cancel()
+        assert _sample("eo_event_loop_lag_seconds_sum") - before >= 0.15
+
+
+class TestProcessPoolPayloads:
+    async def test_weight_diff_from_file_store(self, monkeypatch, tmp_path, fake_redis):
+        """mmap-backed versions from the file store are encoded in a worker process."""
+        monkeypatch.setattr(executors.settings, "executor_processes", 1)
+        store = FileModelStore(tmp_path, fake_redis)
+        base = create_updatable_mlmodel()
+        weights = extract_weights(base)
+        weights["output_bias"] = np.ones(10, dtype=np.float32)
+        model = inject_weights(base, weights)
+        base_record = await store.put("m1", base, version=1)
+        head = await store.put("m1", model, version=2)
+        servicer = ModelServiceServicer(fake_redis, fake_redis, store)
+
+        blob, is_diff = await servicer._weight_payload("m1", head, base_record.digest)
+
+        assert is_diff
+        rebuilt = apply_weight_payload(base, b"".join(blob.chunks), diff=True)
+        np.testing.assert_array_equal(extract_weights(rebuilt)["output_bias"], np.ones(10))
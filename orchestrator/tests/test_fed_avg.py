@@ -7,6 +7,7 @@ import pytest
 
 from orchestrator.services.fed_avg import (
     LAYER_NAMES,
+    FedAvgAccumulator,
     aggregate_gradients,
     apply_gradients,
     deserialize_weight_deltas,
@@ -99,6 +100,29 @@ class TestAggregation:
         result = aggregate_gradients([])
         assert result == {}
 
+    def test_accumulator_matches_batch_aggregation(self):
+        rng = np.random.RandomState(7)
+        payloads = []
+        for n in (5, 17, 40):
+            deltas = {k: rng.randn(*v.shape).astype(np.float32) for k, v in _make_deltas().items()}
+            payloads.append((serialize_weight_deltas(deltas), n))
+
+        accumulator = FedAvgAccumulator()
+        for grad_bytes, n in payloads:
+            accumulator.add(grad_bytes, n)
+
+        expected = aggregate_gradients(payloads)
+        result = accumulator.result()
+        assert accumulator.count == 3
+        assert accumulator.total_samples == 62
+        for name in expected:
+            np.testing.assert_allclose(result[name], expected[name], rtol=1e-5, atol=1e-6)
+
+    def test_accumulator_ignores_zero_samples(self):
+        accumulator = FedAvgAccumulator()
+        accumulator.add(serialize_weight_deltas(_make_deltas()), 0)
+        assert accumulator.count == 0
+        assert accumulator.result() == {}
 
     def test_aggregate_with_compressed_gradients(self):
         """Compress → decompress → aggregate produces correct result."""
@@ -0,0 +1,72 @@
+"""Tests for async buffered training (FedBuff) configuration and staleness weighting."""
+
+import numpy as np
+import pytest
+from orchestrator.services.fed_avg import (
+    FedAvgAccumulator,
+    MatrixAccumulator,
+    serialize_weight_deltas,
+)
+from orchestrator.services.fedbuff import AsyncTrainingConfig, StalenessBuffer
+from orchestrator.services.flat_params import FlatLayout
+
+
+def _payload(value: float) -> bytes:
+    return serialize_weight_deltas({"hidden_bias": np.full(4, value, dtype=np.float32)})
+
+
+class TestAsyncTrainingConfig:
+    def test_disabled_by_default(self):
+        for config in (None, {}, {"async": {}}):
+            assert not AsyncTrainingConfig.from_job_config(config).enabled
+
+    def test_reads_settings(self):
+        cfg = AsyncTrainingConfig.from_job_config({
+            "async": {"enabled": True, "buffer_size": 4, "concurrency": 16, "max_staleness": 3},
+        })
+        assert cfg.enabled
+        assert (cfg.buffer_size, cfg.concurrency, cfg.max_staleness) == (4, 16, 3)
+
+    @pytest.mark.parametrize("field,value", [
+        ("buffer_size", 0), ("concurrency", 0), ("max_staleness", -1),
+    ])
+    def test_rejects_invalid_values(self, field, value):
+        with pytest.raises(ValueError, match=field):
+            AsyncTrainingConfig.from_job_config({"async": {"enabled": True, field: value}})
+
+    def test_staleness_weight(self):
+        cfg = AsyncTrainingConfig(staleness_exponent=0.5)
+        assert cfg.staleness_weight(0) == 1.0
+        assert cfg.staleness_weight(3) == pytest.approx(0.5)
+
+
+class TestStalenessBuffer:
+    def test_fresh_updates_are_plain_fedavg(self):
+        layout = FlatLayout.from_shapes({"hidden_bias": (4,)})
+        buffer = StalenessBuffer(FedAvgAccumulator(layout), AsyncTrainingConfig())
+        buffer.add(_payload(1.0), 10)
+        buffer.add(_payload(3.0), 30)
+        np.testing.assert_allclose(buffer.result_vector(), np.full(4, 2.5), rtol=1e-6)
+
+    def test_stale_updates_are_damped(self):
+        layout = FlatLayout.from_shapes({"hidden_bias": (4,)})
+        buffer = StalenessBuffer(FedAvgAccumulator(layout), AsyncTrainingConfig())
+        buffer.add(_payload(1.0), 10, staleness=0)
+        buffer.add(_payload(1.0), 10, staleness=3)
+        # (1·10·1 + 0.5·10·1) / 20
+        np.testing.assert_allclose(buffer.result_vector(), np.full(4, 0.75), rtol=1e-6)
+        assert buffer.count == 2
+        assert buffer.staleness == [0, 3]
+
+    def test_works_with_matrix_accumulator(self):
+        layout = FlatLayout.from_shapes({"hidden_bias": (4,)})
+        buffer = StalenessBuffer(MatrixAccumulator(layout), AsyncTrainingConfig())
+        buffer.add(_payload(2.0), 5, staleness=3)
+        np.testing.assert_allclose(buffer.result_vector(), np.full(4, 1.0), rtol=1e-6)
+
+    def test_empty_buffer(self):
+        layout = FlatLayout.from_shapes({"hidden_bias": (4,)})
+        buffer = StalenessBuffer(FedAvgAccumulator(layout), AsyncTrainingConfig())
+        buffer.add(_payload(1.0), 0)
+        assert buffer.count == 0
+        assert buffer.result_vector() is None
@@ -0,0 +1,169 @@
+"""Tests for the flat parameter-vector layout and flat/matrix aggregation."""
+
+import numpy as np
+import pytest
+from orchestrator.services.fed_avg import (
+    AggregationConfig,
+    FedAvgAccumulator,
+    MatrixAccumulator,
+    aggregate_gradients_matrix,
+    apply_gradients_flat,
+    serialize_weight_deltas,
+)
+from orchestrator.services.flat_params import FlatLayout, get_layout
+from orchestrator.services.model_registry import get_architecture
+
+
+class TestFlatLayout:
+    def test_layout_offsets_follow_layer_order(self):
+        layout = get_layout("mnist")
+        assert layout.names == get_architecture("mnist").layer_names
+        assert [layer.offset for layer in layout.layers] == [0, 100352, 100480, 101760]
+        assert layout.size == 101770
+
+    def test_cifar10_layout_size(self):
+        arch = get_architecture("cifar10")
+        expected = sum(int(np.prod(shape)) for shape in arch.layer_shapes.values())
+        assert get_layout("cifar10").size == expected
+
+    def test_flatten_unflatten_roundtrip(self):
+        layout = get_layout("mnist")
+        rng = np.random.RandomState(0)
+        weights = {
+            name: rng.randn(*shape).astype(np.float32)
+            for name, shape in get_architecture("mnist").layer_shapes.items()
+        }
+        vec = layout.flatten(weights)
+        restored = layout.unflatten(vec)
+        for name in weights:
+            np.testing.assert_array_equal(restored[name], weights[name])
+
+    def test_flatten_into_reused_buffer_zeroes_missing_layers(self):
+        layout = FlatLayout.from_shapes({"a": (2,), "b": (3,)})
+        out = np.full(5, 7.0, dtype=np.float32)
+        vec = layout.flatten({"b": np.ones(3, dtype=np.float32)}, out=out)
+        assert vec is out
+        np.testing.assert_array_equal(out, [0, 0, 1, 1, 1])
+
+    def test_unflatten_returns_views(self):
+        layout = get_layout("mnist")
+        vec = layout.zeros()
+        layout.unflatten(vec)["output_bias"][:] = 1.0
+        assert vec[-10:].sum() == 10.0
+        assert vec[:-10].sum() == 0.0
+
+    def test_from_payload(self):
+        data = serialize_weight_deltas({
+            "hidden_bias": np.ones(128, dtype=np.float32),
+            "output_bias": np.ones(10, dtype=np.float32),
+        })
+        layout = FlatLayout.from_payload(data)
+        assert layout.names == ["hidden_bias", "output_bias"]
+        assert layout.size == 138
+
+
+class TestFlatAggregation:
+    def test_accumulator_with_architecture_layout(self):
+        layout = get_layout("mnist")
+        shapes = get_architecture("mnist").layer_shapes
+        d1 = serialize_weight_deltas({k: np.ones(s, dtype=np.float32) for k, s in shapes.items()})
+        d2 = serialize_weight_deltas(
+            {k: np.full(s, 4.0, dtype=np.float32) for k, s in shapes.items()}
+        )
+
+        accumulator = FedAvgAccumulator(layout)
+        accumulator.add(d1, 10)
+        accumulator.add(d2, 30)
+
+        result = accumulator.result()
+        assert result["hidden_weight"].shape == (128, 784)
+        np.testing.assert_allclose(accumulator.result_vector(), 3.25, rtol=1e-6)
+
+    def test_accumulator_missing_layer_contributes_zero(self):
+        layout = get_layout("mnist")
+        full = serialize_weight_deltas(
+            {
+                k: np.ones(s, dtype=np.float32)
+                for k, s in get_architecture("mnist").layer_shapes.items()
+            }
+        )
+        partial = serialize_weight_deltas({"output_bias": np.ones(10, dtype=np.float32)})
+
+        accumulator = FedAvgAccumulator(layout)
+        accumulator.add(full, 1)
+        accumulator.add(partial, 1)
+
+        result = accumulator.result()
+        np.testing.assert_allclose(result["output_bias"], 1.0)
+        np.testing.assert_allclose(result["hidden_bias"], 0.5)
+
+    def test_accumulator_rejects_mismatched_payload(self):
+        accumulator = FedAvgAccumulator(get_layout("mnist"))
+        bad = serialize_weight_deltas({"hidden_bias": np.ones(64, dtype=np.float32)})
+        with pytest.raises(ValueError, match="expected 128"):
+            accumulator.add(bad, 1)
+        assert accumulator.count == 0
+
+    def test_apply_gradients_flat_in_place(self):
+        weights = np.ones(5, dtype=np.float32)
+        result = apply_gradients_flat(weights, np.full(5, 0.5, dtype=np.float32))
+        assert result is weights
+        np.testing.assert_allclose(weights, 1.5)
+
+
+class TestMatrixAggregation:
+    def _payloads(self, layout_shapes, n_devices=4):
+        rng = np.random.RandomState(3)
+        return [
+            (
+                serialize_weight_deltas(
+                    {k: rng.randn(*s).astype(np.float32) for k, s in layout_shapes.items()}
+                ),
+                int(rng.randint(1, 100)),
+            )
+            for _ in range(n_devices)
+        ]
+
+    def test_matrix_matches_streaming(self):
+        layout = get_layout("mnist")
+        payloads = self._payloads(get_architecture("mnist").layer_shapes)
+
+        streaming = FedAvgAccumulator(layout)
+        for grad_bytes, n in payloads:
+            streaming.add(grad_bytes, n)
+
+        batched = aggregate_gradients_matrix(payloads, layout)
+        np.testing.assert_allclose(batched, streaming.result_vector(), rtol=1e-4, atol=1e-6)
+
+    def test_matrix_grows_past_capacity(self):
+        layout = get_layout("mnist")
+        payloads = self._payloads(get_architecture("mnist").layer_shapes, n_devices=5)
+
+        accumulator = MatrixAccumulator(layout, capacity=2)
+        for grad_bytes, n in payloads:
+            accumulator.add(grad_bytes, n)
+
+        assert accumulator.count == 5
+        assert accumulator.matrix.shape == (5, layout.size)
+        np.testing.assert_allclose(
+            accumulator.result_vector(),
+            aggregate_gradients_matrix(payloads, layout),
+            rtol=1e-5,
+        )
+
+    def test_matrix_empty(self):
+        assert aggregate_gradients_matrix([], get_layout("mnist")) is None
+
+
+class TestAggregationConfig:
+    def test_default_is_streaming(self):
+        cfg = AggregationConfig.from_job_config(None)
+        assert isinstance(cfg.make_accumulator(get_layout("mnist"), 3), FedAvgAccumulator)
+
+    def test_matrix_mode(self):
+        cfg = AggregationConfig.from_job_config({"aggregation": {"mode": "matrix"}})
+        assert isinstance(cfg.make_accumulator(get_layout("mnist"), 3), MatrixAccumulator)
+
+    def test_unknown_mode_raises(self):
+        with pytest.raises(ValueError, match="Unknown aggregation mode"):
+            AggregationConfig.from_job_config({"aggregation": {"mode": "bogus"}})
@@ -1,15 +1,26 @@
-"""Tests for gradient compression codec (float16 + lz4)."""
+"""Tests for gradient compression codecs (float16 + lz4, top-k, int8/4-bit)."""
 
 import numpy as np
 import pytest
 
 from orchestrator.services.fed_avg import (
+    FedAvgAccumulator,
+    MatrixAccumulator,
+    decode_weight_deltas_into,
     deserialize_weight_deltas,
     serialize_weight_deltas,
 )
+from orchestrator.services.flat_params import FlatLayout
 from orchestrator.services.gradient_codec import (
     compress_gradients,
+    compress_gradients_quantized,
+    compress_gradients_topk,
+    decode_gradients_into,
     decompress_gradients,
+    is_quantized,
+    is_topk,
+    iter_topk,
+    scatter_topk_into,
 )
 
 
@@ -110,3 +121,266 @@ class TestGradientCodec:
         assert len(restored) == 4
         assert "hidden_weight" in restored
         assert restored["hidden_weight"].shape == (128 * 784,)
+
+
+class TestDecodeGradientsInto:
+    def _layout(self) -> FlatLayout:
+        return FlatLayout.from_payload(serialize_weight_deltas(_make_deltas()))
+
+    def test_float16_matches_decompress(self):
+        raw = serialize_weight_deltas(_make_deltas())
+        wire = compress_gradients(raw)
+        layout = self._layout()
+
+        expected = layout.zeros()
+        decode_weight_deltas_into(decompress_gradients(wire), layout, expected, scale=3.0)
+        out = np.full(layout.size, 99.0, dtype=np.float32)
+        decode_gradients_into(wire, layout, out, scale=3.0)
+        np.testing.assert_array_equal(out, expected)
+
+    @pytest.mark.parametrize("encode", [
+        lambda raw: raw,
+        compress_gradients,
+        lambda raw: compress_gradients_topk(raw, ratio=0.1),
+        lambda raw: compress_gradients_quantized(raw, rng=np.random.default_rng(0)),
+    ], ids=["float32", "float16", "topk", "int8"])
+    def test_accumulate_adds_to_buffer(self, encode):
+        wire = encode(serialize_weight_deltas(_make_deltas()))
+        layout = self._layout()
+
+        once = layout.zeros()
+        decode_gradients_into(wire, layout, once, scale=2.0)
+        out = np.ones(layout.size, dtype=np.float32)
+        decode_gradients_into(wire, layout, out, scale=2.0, accumulate=True)
+        np.testing.assert_allclose(out, once + 1.0, rtol=1e-6)
+
+    def test_missing_layers_zeroed(self):
+        deltas = _make_deltas()
+        wire = compress_gradients(serialize_weight_deltas({"hidden_bias": deltas["hidden_bias"]}))
+        layout = self._layout()
+        out = np.full(layout.size, 5.0, dtype=np.float32)
+        decode_gradients_into(wire, layout, out)
+        restored = layout.unflatten(out)
+        assert not restored["hidden_weight"].any()
+        np.testing.assert_allclose(restored["hidden_bias"], deltas["hidden_bias"], rtol=1e-3)
+
+    def test_rejects_layout_mismatch(self):
+        wire = compress_gradients(serialize_weight_deltas(_make_deltas()))
+        layout = FlatLayout.from_shapes({"hidden_weight": (10,)})
+        with pytest.raises(ValueError):
+            decode_gradients_into(wire, layout, layout.zeros())
+
+    def test_rejects_truncated_payload(self):
+        raw = serialize_weight_deltas(_make_deltas())
+        with pytest.raises(ValueError, match="truncated"):
+            decode_gradients_into(raw[:-8], self._layout(), self._layout().zeros())
+
+
+def _densify_topk(data: bytes) -> dict[str, np.ndarray]:
+    dense = {}
+    for name, elem_count, indices, values in iter_topk(data):
+        layer = np.zeros(elem_count, dtype=np.float32)
+        layer[indices] = values
+        dense[name] = layer
+    return dense
+
+
+class TestTopKCodec:
+    def test_keeps_largest_magnitudes(self):
+        deltas = _make_deltas()
+        payload = compress_gradients_topk(serialize_weight_deltas(deltas), ratio=0.01)
+        assert is_topk(payload)
+
+        for name, elem_count, indices, values in iter_topk(payload):
+            original = deltas[name].ravel()
+            assert elem_count == original.size
+            assert indices.size == max(1, round(original.size * 0.01))
+            assert np.all(np.diff(indices.astype(np.int64)) > 0)
+            # Every kept entry is at least as large as every dropped one
+            dropped = np.delete(np.abs(original), indices)
+            if dropped.size:
+                assert np.abs(original[indices]).min() >= dropped.max()
+            np.testing.assert_allclose(values, original[indices], rtol=1e-3)
+
+    def test_compression_ratio(self):
+        raw = serialize_weight_deltas(_make_deltas())
+        payload = compress_gradients_topk(raw, ratio=0.01)
+        # 6 bytes per kept entry vs 4 per dense entry
+        assert len(payload) < len(raw) / 50
+
+    def test_full_ratio_is_dense(self):
+        deltas = _make_deltas()
+        payload = compress_gradients_topk(serialize_weight_deltas(deltas), ratio=1.0)
+        dense = _densify_topk(payload)
+        for name, values in deltas.items():
+            np.testing.assert_allclose(dense[name], values.ravel(), rtol=1e-3, atol=1e-3)
+
+    def test_decompress_passes_topk_through(self):
+        payload = compress_gradients_topk(serialize_weight_deltas(_make_deltas()))
+        assert decompress_gradients(payload) == payload
+
+    def test_two_layer_legacy_payload_is_not_topk(self):
+        raw = serialize_weight_deltas({
+            "hidden_weight": np.ones(3, dtype=np.float32),
+            "hidden_bias": np.ones(2, dtype=np.float32),
+        })
+        assert raw[0] == 0x02
+        assert not is_topk(raw)
+        assert decompress_gradients(raw) == raw
+
+    def test_fedavg_accumulator_matches_dense(self):
+        rng = np.random.RandomState(1)
+        payloads = [
+            compress_gradients_topk(serialize_weight_deltas({
+                "hidden_weight": rng.randn(1000).astype(np.float32),
+                "hidden_bias": rng.randn(10).astype(np.float32),
+            }), ratio=0.05)
+            for _ in range(3)
+        ]
+        samples = [10, 30, 60]
+
+        sparse = FedAvgAccumulator()
+        dense = FedAvgAccumulator()
+        for payload, n in zip(payloads, samples, strict=True):
+            sparse.add(payload, n)
+            dense.add(serialize_weight_deltas(_densify_topk(payload)), n)
+
+        np.testing.assert_allclose(sparse.result_vector(), dense.result_vector(), rtol=1e-6)
+        assert sparse.layout.names == dense.layout.names
+
+    def test_matrix_accumulator_densifies_rows(self):
+        deltas = {"hidden_bias": np.arange(100, dtype=np.float32) - 50}
+        payload = compress_gradients_topk(serialize_weight_deltas(deltas), ratio=0.1)
+        layout = FlatLayout.from_shapes({"hidden_bias": (100,)})
+
+        acc = MatrixAccumulator(layout)
+        acc.add(serialize_weight_deltas({"hidden_bias": np.full(100, 7.0, dtype=np.float32)}), 1)
+        acc.add(payload, 1)
+
+        row = acc.matrix[1]
+        assert np.count_nonzero(row) == 10
+        # Row reuse must not leak values from a previous payload
+        assert not np.any(row == 7.0)
+
+    def test_scatter_validates_layout(self):
+        payload = compress_gradients_topk(
+            serialize_weight_deltas({"hidden_bias": np.ones(10, dtype=np.float32)}), ratio=0.5,
+        )
+        out = np.zeros(20, dtype=np.float32)
+        with pytest.raises(ValueError, match="expected 20"):
+            scatter_topk_into(payload, FlatLayout.from_shapes({"hidden_bias": (20,)}), out)
+        with pytest.raises(ValueError, match="Unexpected layer"):
+            scatter_topk_into(payload, FlatLayout.from_shapes({"output_bias": (10,)}), out)
+
+    def test_scatter_rejects_out_of_range_index(self):
+        payload = bytearray(compress_gradients_topk(
+            serialize_weight_deltas({"hidden_bias": np.ones(10, dtype=np.float32)}), ratio=0.1,
+        ))
+        # header(4) + layer_count(4) + name_len(4) + name(11) + elem_count(4) + k(4)
+        payload[31:35] = (10).to_bytes(4, "little")
+        with pytest.raises(ValueError, match="out of range"):
+            scatter_topk_into(
+                bytes(payload),
+                FlatLayout.from_shapes({"hidden_bias": (10,)}),
+                np.zeros(10, dtype=np.float32),
+            )
+
+    def test_scatter_rejects_duplicate_index(self):
+        payload = bytearray(compress_gradients_topk(
+            serialize_weight_deltas({"hidden_bias": np.arange(10, dtype=np.float32)}), ratio=0.2,
+        ))
+        # Second of the k=2 indices repeats the first
+        payload[35:39] = payload[31:35]
+        out = np.zeros(10, dtype=np.float32)
+        with pytest.raises(ValueError, match="ascending and unique"):
+            scatter_topk_into(bytes(payload), FlatLayout.from_shapes({"hidden_bias": (10,)}), out)
+        assert not out.any()
+
+
+class TestQuantizedCodec:
+    @pytest.mark.parametrize("bits, ratio", [(8, 3.9), (4, 7.8)])
+    def test_size_and_error_bound(self, bits, ratio):
+        deltas = _make_deltas()
+        raw = serialize_weight_deltas(deltas)
+        payload = compress_gradients_quantized(raw, bits=bits, rng=np.random.default_rng(0))
+        assert is_quantized(payload)
+        assert not is_topk(payload)
+        assert len(raw) / len(payload) > ratio
+
+        acc = FedAvgAccumulator()
+        acc.add(payload, 1)
+        restored = acc.result()
+        for name, values in deltas.items():
+            # Stochastic rounding moves a value by less than one quantization step
+            step = (values.max() - values.min()) / ((1 << bits) - 1)
+            assert np.abs(restored[name] - values.ravel()).max() <= step * 1.001
+
+    def test_stochastic_rounding_is_unbiased(self):
+        values = np.full(10_000, 0.3, dtype=np.float32)
+        values[0], values[1] = 0.0, 1.0  # step = 1/15 puts 0.3 at 4.5 steps
+        raw = serialize_weight_deltas({"hidden_bias": values})
+
+        acc = FedAvgAccumulator()
+        for seed in range(20):
+            acc.add(compress_gradients_quantized(raw, bits=4, rng=np.random.default_rng(seed)), 1)
+        mean = acc.result()["hidden_bias"][2:].mean()
+        # Round-to-nearest would be off by half a step (0.033)
+        assert abs(mean - 0.3) < 1e-3
+
+    def test_odd_length_four_bit(self):
+        values = np.linspace(-1, 1, 7, dtype=np.float32)
+        raw = serialize_weight_deltas({"hidden_bias": values})
+        payload = compress_gradients_quantized(raw, bits=4)
+        out = np.zeros(7, dtype=np.float32)
+        decode_weight_deltas_into(payload, FlatLayout.from_shapes({"hidden_bias": (7,)}), out)
+        # min and max are exactly representable
+        assert out[0] == pytest.approx(-1.0)
+        assert out[-1] == pytest.approx(1.0, abs=1e-6)
+
+    def test_constant_layer(self):
+        raw = serialize_weight_deltas({"hidden_bias": np.full(5, 2.5, dtype=np.float32)})
+        acc = FedAvgAccumulator()
+        acc.add(compress_gradients_quantized(raw), 2)
+        np.testing.assert_array_equal(
+            acc.result()["hidden_bias"], np.full(5, 2.5, dtype=np.float32)
+        )
+
+    def test_accumulator_spans_dequantize_blocks(self, monkeypatch):
+        import orchestrator.services.gradient_codec as codec
+
+        monkeypatch.setattr(codec, "_DEQUANT_BLOCK", 64)
+        deltas = _make_deltas()
+        payload = compress_gradients_quantized(serialize_weight_deltas(deltas), bits=4)
+        layout = FlatLayout.from_payload(serialize_weight_deltas(deltas))
+
+        blocked = layout.zeros()
+        decode_weight_deltas_into(payload, layout, blocked)
+        monkeypatch.setattr(codec, "_DEQUANT_BLOCK", 1 << 20)
+        whole = layout.zeros()
+        decode_weight_deltas_into(payload, layout, whole)
+        np.testing.assert_array_equal(blocked, whole)
+
+    def test_matrix_and_streaming_agree(self):
+        deltas = _make_deltas()
+        raw = serialize_weight_deltas(deltas)
+        payloads = [
+            compress_gradients_quantized(raw, rng=np.random.default_rng(i)) for i in range(3)
+        ]
+        layout = FlatLayout.from_payload(raw)
+
+        streaming = FedAvgAccumulator(layout)
+        matrix = MatrixAccumulator(layout)
+        for payload, n in zip(payloads, [5, 10, 20], strict=True):
+            streaming.add(payload, n)
+            matrix.add(payload, n)
+        np.testing.assert_allclose(
+            streaming.result_vector(), matrix.result_vector(), rtol=1e-5, atol=1e-6
+        )
+
+    def test_decompress_passes_quantized_through(self):
+        payload = compress_gradients_quantized(serialize_weight_deltas(_make_deltas()))
+        assert decompress_gradients(payload) == payload
+
+    def test_rejects_unsupported_width(self):
+        with pytest.raises(ValueError, match="Unsupported"):
+            compress_gradients_quantized(serialize_weight_deltas(_make_deltas()), bits=2)
@@ -1,13 +1,14 @@
 """Tests for HeartbeatMonitor: Redis heartbeat, command queue, device status."""
 
+import time
 import uuid
 
 import pytest
 from sqlalchemy.ext.asyncio import AsyncSession
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 
 from orchestrator.db.repositories import DeviceRepository
-from orchestrator.services.heartbeat_monitor import HeartbeatMonitor
+from orchestrator.services.heartbeat_monitor import LAST_SEEN_KEY, HeartbeatMonitor
 
 
 def _device_kwargs(**overrides) -> dict:
@@ -35,7 +36,7 @@ class TestHeartbeatMonitor:
         repo = DeviceRepository(db_session)
         device = await repo.create(**_device_kwargs())
 
-        await monitor.process_heartbeat(db_session, device.id, metrics={})
+        await monitor.process_heartbeat(device.id, metrics={})
 
         key = f"heartbeat:{device.id}"
         value = await fake_redis.get(key)
@@ -51,9 +52,11 @@ class TestHeartbeatMonitor:
         device = await repo.create(**_device_kwargs(status="offline"))
         assert device.status == "offline"
 
-        await monitor.process_heartbeat(db_session, device.id, metrics={})
+        await monitor.process_heartbeat(device.id, metrics={})
+        await monitor.state_cache.flush(db_session)
 
         updated = await repo.get(device.id)
+        await db_session.refresh(updated)
         assert updated is not None
         assert updated.status == "online"
 
@@ -95,12 +98,14 @@ class TestHeartbeatMonitor:
 
         metrics = {"cpu_usage": 0.3, "memory_usage": 0.5, "thermal_pressure": 0.2}
         await monitor.process_heartbeat(
-            db_session, device.id, metrics,
+            device.id, metrics,
             battery_level=0.8, battery_state="discharging",
             is_low_power_mode=True,
         )
+        await monitor.state_cache.flush(db_session)
 
         updated = await repo.get(device.id)
+        await db_session.refresh(updated)
         assert updated is not None
         assert updated.metrics["is_low_power_mode"] is True
 
@@ -110,8 +115,129 @@ class TestHeartbeatMonitor:
         repo = DeviceRepository(db_session)
         device = await repo.create(**_device_kwargs(status="training"))
 
-        await monitor.process_heartbeat(db_session, device.id, metrics={})
+        await monitor.process_heartbeat(device.id, metrics={})
+        await monitor.state_cache.flush(db_session)
 
         updated = await repo.get(device.id)
+        await db_session.refresh(updated)
         assert updated is not None
         assert updated.status == "training"
+
+    async def test_heartbeats_are_buffered_until_flush(
+        self, monitor: HeartbeatMonitor, fake_redis, db_session: AsyncSession
+    ):
+        repo = DeviceRepository(db_session)
+        device = await repo.create(**_device_kwargs(status="offline", battery_level=0.9))
+
+        for level in (0.8, 0.7, 0.6):
+            await monitor.process_heartbeat(
+                device.id, {"cpu_usage": level}, battery_level=level,
+            )
+        await db_session.refresh(device)
+        assert device.status == "offline"
+        assert len(monitor.state_cache) == 1
+
+        written = await monitor.state_cache.flush(db_session)
+        await db_session.refresh(device)
+
+        assert written == 1
+        assert len(monitor.state_cache) == 0
+        assert device.status == "online"
+        assert device.battery_level == 0.6
+        assert device.metrics == {"cpu_usage": 0.6}
+
+    async def test_flush_keeps_fields_missing_from_heartbeat(
+        self, monitor: HeartbeatMonitor, fake_redis, db_session: AsyncSession
+    ):
+        repo = DeviceRepository(db_session)
+        device = await repo.create(**_device_kwargs(
+            battery_level=0.5, battery_state="charging", metrics={"cpu_usage": 0.1},
+        ))
+
+        await monitor.process_heartbeat(device.id, metrics={})
+        await monitor.state_cache.flush(db_session)
+        await db_session.refresh(device)
+
+        assert device.battery_level == 0.5
+        assert device.battery_state == "charging"
+        assert device.metrics == {"cpu_usage": 0.1}
+
+    async def test_flush_batches_many_devices(
+        self, monitor: HeartbeatMonitor, fake_redis, db_session: AsyncSession
+    ):
+        repo = DeviceRepository(db_session)
+        devices = [await repo.create(**_device_kwargs(name=f"d{i}")) for i in range(5)]
+        for device in devices:
+            await monitor.process_heartbeat(device.id, metrics={}, battery_level=0.42)
+
+        assert await monitor.state_cache.flush(db_session) == 5
+        for device in devices:
+            await db_session.refresh(device)
+            assert device.status == "online"
+            assert device.battery_level == 0.42
+
+
+class TestStaleDeviceDetection:
+    @pytest.fixture
+    def monitor(self, fake_redis):
+        with patch("orchestrator.services.heartbeat_monitor.settings") as mock_settings:
+            mock_settings.heartbeat_interval_seconds = 1
+            mock_settings.heartbeat_timeout_multiplier = 5
+            yield HeartbeatMonitor(fake_redis)
+
+    @pytest.fixture
+    def use_test_session(self, db_session):
+        mock_cm = AsyncMock()
+        mock_cm.__aenter__ = AsyncMock(return_value=db_session)
+        mock_cm.__aexit__ = AsyncMock(return_value=False)
+        with patch("orchestrator.services.heartbeat_monitor.async_session", return_value=mock_cm):
+            yield
+
+    async def test_heartbeat_updates_last_seen_score(self, monitor, fake_redis):
+        device_id = uuid.uuid4()
+        await monitor.process_heartbeat(device_id, metrics={})
+
+        score = await fake_redis.zscore(LAST_SEEN_KEY, str(device_id))
+        assert score == pytest.approx(time.time(), abs=5)
+
+    async def test_stale_devices_marked_offline_in_bulk(
+        self, monitor, fake_redis, db_session, use_test_session
+    ):
+        repo = DeviceRepository(db_session)
+        fresh = await repo.create(**_device_kwargs(status="online"))
+        stale_online = await repo.create(**_device_kwargs(status="online"))
+        stale_training = await repo.create(**_device_kwargs(status="training"))
+
+        now = time.time()
+        await fake_redis.zadd(LAST_SEEN_KEY, {
+            str(fresh.id): now,
+            str(stale_online.id): now - 60,
+            str(stale_training.id): now - 30,
+        })
+
+        await monitor._check_stale_devices()
+
+        for device in (fresh, stale_online, stale_training):
+            await db_session.refresh(device)
+        assert fresh.status == "online"
+        assert stale_online.status == "offline"
+        assert stale_training.status == "offline"
+        assert await fake_redis.zrange(LAST_SEEN_KEY, 0, -1) == [str(fresh.id).encode()]
+
+    async def test_no_stale_devices_skips_db(self, monitor, fake_redis):
+        await fake_redis.zadd(LAST_SEEN_KEY, {str(uuid.uuid4()): time.time()})
+        with patch("orchestrator.services.heartbeat_monitor.async_session") as mock_session:
+            await monitor._check_stale_devices()
+        mock_session.assert_not_called()
+
+    async def test_seed_tracks_silent_online_devices(
+        self, monitor, fake_redis, db_session, use_test_session
+    ):
+        repo = DeviceRepository(db_session)
+        online = await repo.create(**_device_kwargs(status="online"))
+        offline = await repo.create(**_device_kwargs(status="offline"))
+
+        await monitor._seed_last_seen()
+
+        assert await fake_redis.zscore(LAST_SEEN_KEY, str(online.id)) is not None
+        assert await fake_redis.zscore(LAST_SEEN_KEY, str(offline.id)) is None
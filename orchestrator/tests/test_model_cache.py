@@ -0,0 +1,97 @@
+"""Tests for the in-process serialized model cache."""
+
+import asyncio
+
+from orchestrator.grpc_server.model_service import ModelServiceServicer
+from orchestrator.services.model_cache import CachedBlob, ModelBlobCache
+from orchestrator.services.redis_blobs import save_model
+from prometheus_client import REGISTRY
+
+
+def _sample(name: str) -> float:
+    return REGISTRY.get_sample_value(name) or 0.0
+
+
+class TestCachedBlob:
+    def test_from_bytes_slices_chunks(self):
+        blob = CachedBlob.from_bytes(memoryview(bytes(range(10))), chunk_size=4, meta={"v": 1})
+
+        assert blob.chunks == (bytes([0, 1, 2, 3]), bytes([4, 5, 6, 7]), bytes([8, 9]))
+        assert blob.size == 10
+        assert blob.meta == {"v": 1}
+
+
+class TestModelBlobCache:
+    def test_evicts_least_recently_used_over_byte_bound(self):
+        cache = ModelBlobCache(max_bytes=10)
+        evictions = _sample("eo_model_cache_evictions_total")
+
+        cache.put(("m", "a"), CachedBlob.from_bytes(b"x" * 4, 4))
+        cache.put(("m", "b"), CachedBlob.from_bytes(b"y" * 4, 4))
+        assert cache.get(("m", "a")) is not None  # "a" is now most recent
+        cache.put(("m", "c"), CachedBlob.from_bytes(b"z" * 4, 4))
+
+        assert cache.get(("m", "b")) is None
+        assert cache.get(("m", "a")) is not None
+        assert cache.size_bytes == 8
+        assert _sample("eo_model_cache_evictions_total") == evictions + 1
+        assert _sample("eo_model_cache_bytes") == 8
+
+    def test_oversized_entry_is_not_cached(self):
+        cache = ModelBlobCache(max_bytes=4)
+        cache.put(("m", "a"), CachedBlob.from_bytes(b"12345", 4))
+
+        assert len(cache) == 0
+
+    async def test_concurrent_misses_share_one_load(self):
+        cache = ModelBlobCache(max_bytes=1024)
+        hits = _sample("eo_model_cache_hits_total")
+        misses = _sample("eo_model_cache_misses_total")
+        loads = 0
+
+        async def loader():
+            nonlocal loads
+            loads += 1
+            await asyncio.sleep(0.01)
+            return CachedBlob.from_bytes(b"model", 2)
+
+        blobs = await asyncio.gather(*(cache.get_or_load(("m", "a"), loader) for _ in range(5)))
+        again = await cache.get_or_load(("m", "a"), loader)
+
+        assert loads == 1
+        assert all(blob is blobs[0] for blob in blobs) and again is blobs[0]
+        assert _sample("eo_model_cache_misses_total") == misses + 5
+        assert _sample("eo_model_cache_hits_total") == hits + 1
+
+    async def test_missing_model_is_not_cached(self):
+        cache = ModelBlobCache(max_bytes=1024)
+
+        async def loader():
+            return None
+
+        assert await cache.get_or_load(("m", "a"), loader) is None
+        assert len(cache) == 0
+
+
+class TestDownloadCache:
+    async def test_redis_backend_downloads_share_one_blob(self, fake_redis):
+        servicer = ModelServiceServicer(fake_redis, fake_redis)
+        await save_model(fake_redis, "m1", b"v1")
+
+        first = await servicer._current_blob("m1", None)
+        again = await servicer._current_blob("m1", None)
+        # Same version re-saved with new content (e.g. a new learning rate)
+        await save_model(fake_redis, "m1", b"v1-new-lr")
+        updated = await servicer._current_blob("m1", None)
+
+        assert again is first
+        assert b"".join(updated.chunks) == b"v1-new-lr"
+
+    async def test_legacy_blob_is_served_uncached(self, fake_redis):
+        servicer = ModelServiceServicer(fake_redis, fake_redis)
+        await fake_redis.set("model:m1:global", "djE=")  # base64 of b"v1"
+
+        blob = await servicer._current_blob("m1", None)
+
+        assert b"".join(blob.chunks) == b"v1"
+        assert len(servicer._model_cache) == 0
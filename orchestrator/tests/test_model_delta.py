@@ -0,0 +1,68 @@
+"""Tests for incremental (weight-only / weight-diff) model download payloads."""
+
+import numpy as np
+import pytest
+from orchestrator.services.coreml_model import (
+    create_updatable_mlmodel,
+    extract_weights,
+    get_spec_learning_rate,
+    inject_weights,
+    parse_spec,
+)
+from orchestrator.services.model_delta import (
+    apply_weight_payload,
+    build_weight_payload,
+    decode_weight_payload,
+    encode_weight_payload,
+)
+
+
+def _perturbed(model_bytes: bytes, seed: int = 0) -> bytes:
+    rng = np.random.default_rng(seed)
+    weights = extract_weights(model_bytes)
+    return inject_weights(model_bytes, {
+        name: values + rng.standard_normal(values.shape).astype(np.float32) * 1e-3
+        for name, values in weights.items()
+    })
+
+
+class TestWeightPayload:
+    def test_roundtrip_is_bit_exact(self):
+        rng = np.random.default_rng(0)
+        base = rng.standard_normal(1000).astype(np.float32)
+        new = base + rng.standard_normal(1000).astype(np.float32) * 1e-4
+        new[3] = np.nan
+
+        for ref in (None, base):
+            decoded = decode_weight_payload(encode_weight_payload(new, ref), ref)
+            np.testing.assert_array_equal(decoded.view(np.uint32), new.view(np.uint32))
+
+    def test_diff_is_smaller_than_full_weights(self):
+        rng = np.random.default_rng(1)
+        base = rng.standard_normal(50_000).astype(np.float32)
+        new = base * (1 + rng.standard_normal(50_000).astype(np.float32) * 1e-4)
+
+        assert len(encode_weight_payload(new, base)) < 0.8 * len(encode_weight_payload(new))
+
+    def test_size_mismatch_raises(self):
+        payload = encode_weight_payload(np.ones(8, dtype=np.float32))
+        with pytest.raises(ValueError, match="base has"):
+            decode_weight_payload(payload, np.ones(4, dtype=np.float32))
+        with pytest.raises(ValueError, match="Not a weight payload"):
+            decode_weight_payload(b"garbage!")
+
+
+class TestApplyWeightPayload:
+    @pytest.mark.parametrize("diff", [True, False])
+    def test_client_rebuilds_server_model(self, diff):
+        old_model = create_updatable_mlmodel()
+        new_model = _perturbed(old_model)
+
+        payload, lr = build_weight_payload(new_model, old_model if diff else None)
+        rebuilt = apply_weight_payload(old_model, payload, diff=diff, learning_rate=0.25)
+
+        expected = extract_weights(new_model)
+        for name, values in extract_weights(rebuilt).items():
+            np.testing.assert_array_equal(values, expected[name])
+        assert lr == get_spec_learning_rate(parse_spec(new_model))
+        assert get_spec_learning_rate(parse_spec(rebuilt)) == 0.25
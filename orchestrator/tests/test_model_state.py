@@ -0,0 +1,51 @@
+"""Tests for the in-process global model state."""
+
+import numpy as np
+from orchestrator.services.coreml_model import (
+    create_updatable_mlmodel,
+    extract_weights,
+    get_spec_learning_rate,
+    parse_spec,
+)
+from orchestrator.services.flat_params import get_layout
+from orchestrator.services.model_state import ModelState
+
+
+class TestModelState:
+    def test_from_bytes_is_clean(self):
+        model_bytes = create_updatable_mlmodel()
+        state = ModelState.from_bytes(model_bytes, get_layout("mnist"), version=4)
+
+        assert not state.dirty
+        assert state.version == 4
+        assert state.to_bytes() is model_bytes
+        original = extract_weights(model_bytes)
+        for name, values in state.weights_dict().items():
+            np.testing.assert_array_equal(values, original[name])
+
+    def test_set_learning_rate(self):
+        state = ModelState.from_bytes(create_updatable_mlmodel(), get_layout("mnist"))
+
+        state.set_learning_rate(state.learning_rate)
+        assert not state.dirty
+
+        state.set_learning_rate(0.125)
+        assert state.dirty
+        assert get_spec_learning_rate(parse_spec(state.to_bytes())) == 0.125
+
+    def test_apply_update_materializes_once(self):
+        layout = get_layout("mnist")
+        model_bytes = create_updatable_mlmodel()
+        state = ModelState.from_bytes(model_bytes, layout)
+        delta = np.full(layout.size, 0.5, dtype=np.float32)
+
+        state.apply_update(delta, version=1)
+
+        assert state.dirty
+        assert state.version == 1
+        first = state.to_bytes()
+        assert state.to_bytes() is first
+        original = extract_weights(model_bytes)
+        recovered = extract_weights(first)
+        for name in original:
+            np.testing.assert_allclose(recovered[name], original[name] + 0.5, rtol=1e-6)
@@ -0,0 +1,145 @@
+"""Tests for the versioned model blob stores."""
+
+import numpy as np
+import pytest
+from orchestrator.services.model_store import FileModelStore, RedisModelStore
+from orchestrator.services.redis_blobs import load_model, save_model
+
+
+@pytest.fixture
+def store(tmp_path, fake_redis):
+    return FileModelStore(tmp_path, fake_redis, keep_last=2, legacy_redis=fake_redis)
+
+
+class TestFileModelStore:
+    async def test_put_get_roundtrip(self, store, tmp_path):
+        record = await store.put("m1", b"model-v1", version=1)
+
+        data = await store.get("m1")
+        assert isinstance(data, memoryview)
+        assert bytes(data) == b"model-v1"
+        assert record.size_bytes == 8
+        assert (tmp_path / "m1" / f"{record.digest}.mlmodel").read_bytes() == b"model-v1"
+        assert await store.exists("m1")
+        assert await store.local_path("m1") == tmp_path / "m1" / f"{record.digest}.mlmodel"
+
+    async def test_versions_are_immutable(self, store):
+        await store.put("m1", b"v1", version=1)
+        await store.put("m1", b"v2", version=2)
+
+        assert bytes(await store.get("m1")) == b"v2"
+        assert bytes(await store.get("m1", version=1)) == b"v1"
+        assert [r.version for r in await store.versions("m1")] == [1, 2]
+
+    async def test_identical_content_is_stored_once(self, store, tmp_path):
+        first = await store.put("m1", b"same", version=1)
+        second = await store.put("m1", b"same", version=2)
+
+        assert first.digest == second.digest
+        assert len(list((tmp_path / "m1").iterdir())) == 1
+
+    async def test_retention_keeps_last_and_best(self, store, tmp_path):
+        accuracies = {1: 0.5, 2: 0.9, 3: 0.6, 4: 0.7, 5: 0.4}
+        for version, accuracy in accuracies.items():
+            await store.put("m1", f"v{version}".encode(), version=version, accuracy=accuracy)
+
+        assert [r.version for r in await store.versions("m1")] == [2, 4, 5]
+        assert await store.get("m1", version=1) is None
+        assert len(list((tmp_path / "m1").iterdir())) == 3
+
+    async def test_replaced_version_content_is_deleted(self, store, tmp_path):
+        await store.put("m1", b"lr-0.1", version=0)
+        await store.put("m1", b"shared", version=1)
+        await store.put("m1", b"lr-0.05", version=0)
+        assert len(list((tmp_path / "m1").iterdir())) == 2
+
+        # Content still referenced by another version is kept
+        await store.put("m1", b"shared", version=0)
+        await store.put("m1", b"new", version=1)
+        assert sorted(p.read_bytes() for p in (tmp_path / "m1").iterdir()) == [b"new", b"shared"]
+
+    async def test_accuracy_recorded_after_publishing(self, store):
+        await store.put("m1", b"v1", version=1)
+        await store.put("m1", b"v2", version=2, accuracy=0.5)
+        await store.set_accuracy("m1", 1, 0.9)
+        await store.put("m1", b"v3", version=3)
+
+        assert (await store.record("m1", 1)).accuracy == 0.9
+        # The best version survives retention
+        assert [r.version for r in await store.versions("m1")] == [1, 2, 3]
+
+    async def test_accuracy_of_pruned_version_is_ignored(self, store):
+        await store.set_accuracy("m1", 7, 0.9)
+        assert await store.versions("m1") == []
+
+    async def test_reads_legacy_redis_blob_until_first_put(self, store, fake_redis):
+        await save_model(fake_redis, "m1", b"from-redis")
+
+        assert await store.exists("m1")
+        assert await store.get("m1") == b"from-redis"
+        assert await store.local_path("m1") is None
+
+        await store.put("m1", b"on-disk", version=1)
+        assert await load_model(fake_redis, "m1") is None
+        assert bytes(await store.get("m1")) == b"on-disk"
+
+    async def test_delete(self, store, tmp_path, fake_redis):
+        await store.put("m1", b"v1", version=1)
+
+        await store.delete("m1")
+
+        assert not await store.exists("m1")
+        assert await store.get("m1") is None
+        assert not (tmp_path / "m1").exists()
+        assert not await fake_redis.exists("model:m1:versions")
+
+    async def test_mapped_view_survives_pruning(self, store):
+        await store.put("m1", b"v1", version=1)
+        view = await store.get("m1")
+        for version in range(2, 5):
+            await store.put("m1", f"v{version}".encode(), version=version)
+
+        assert bytes(view) == b"v1"
+
+
+class TestRedisModelStore:
+    async def test_put_get(self, fake_redis):
+        store = RedisModelStore(fake_redis)
+        payload = np.arange(16, dtype=np.float32).tobytes()
+
+        await store.put("m1", payload, version=3)
+
+        assert await store.get("m1") == payload
+        assert await store.exists("m1")
+        await store.delete("m1")
+        assert not await store.exists("m1")
+
+    async def test_revision_changes_on_every_save(self, fake_redis):
+        store = RedisModelStore(fake_redis)
+        assert await store.revision("m1") is None
+
+        await store.put("m1", b"v1", version=1)
+        first = await store.revision("m1")
+        await store.put("m1", b"v1-new-lr", version=1)
+        second = await store.revision("m1")
+        await store.delete("m1")
+        await store.put("m1", b"v1", version=1)
+
+        assert len({first, second, await store.revision("m1")}) == 3
+
+
+class TestVersionLookup:
+    async def test_head_and_find(self, store):
+        first = await store.put("m1", b"v1", version=1)
+        second = await store.put("m1", b"v2", version=2)
+
+        assert await store.head("m1") == second
+        assert await store.find("m1", first.digest) == first
+        assert await store.find("m1", "unknown") is None
+
+    async def test_redis_store_has_no_history(self, fake_redis):
+        store = RedisModelStore(fake_redis)
+        await store.put("m1", b"v1", version=1)
+
+        assert await store.head("m1") is None
+        assert await store.find("m1", "anything") is None
@@ -0,0 +1,158 @@
+"""Tests for the binary Redis layout of model blobs and gradient entries."""
+
+import base64
+import json
+
+from orchestrator.services.redis_blobs import (
+    GRADIENT_ENCODING_RAW,
+    GRADIENT_ENCODING_WIRE,
+    append_gradient_upload,
+    commit_gradient_upload,
+    decode_gradient_entry,
+    delete_model,
+    encode_gradient_entry,
+    gradient_entry_prefix,
+    gradient_upload_key,
+    is_round_closed,
+    load_model,
+    model_exists,
+    pop_late_devices,
+    push_gradient_entry,
+    record_late_device,
+    save_model,
+    set_open_round,
+)
+
+
+class TestModelBlobs:
+    async def test_save_and_load_raw_bytes(self, fake_redis):
+        data = bytes(range(256)) * 4
+        await save_model(fake_redis, "m1", data)
+
+        assert await fake_redis.get("model:m1:blob") == data
+        assert await load_model(fake_redis, "m1") == data
+
+    async def test_load_legacy_base64(self, fake_redis):
+        await fake_redis.set("model:m1:global", base64.b64encode(b"legacy-model").decode())
+
+        assert await model_exists(fake_redis, "m1")
+        assert await load_model(fake_redis, "m1") == b"legacy-model"
+
+    async def test_save_retires_legacy_key(self, fake_redis):
+        await fake_redis.set("model:m1:global", base64.b64encode(b"old").decode())
+        await save_model(fake_redis, "m1", b"new")
+
+        assert not await fake_redis.exists("model:m1:global")
+        assert await load_model(fake_redis, "m1") == b"new"
+
+    async def test_load_missing(self, fake_redis):
+        assert await load_model(fake_redis, "nope") is None
+        assert not await model_exists(fake_redis, "nope")
+
+    async def test_delete_removes_both_layouts(self, fake_redis):
+        await fake_redis.set("model:m1:global", "b2xk")
+        await fake_redis.set("model:m1:blob", b"new")
+        await delete_model(fake_redis, "m1")
+
+        assert not await model_exists(fake_redis, "m1")
+
+
+class TestGradientEntries:
+    def test_binary_roundtrip(self):
+        payload = b"\x00\x01\x02\xff" * 100
+        raw = encode_gradient_entry("dev-1", payload, 42, {"loss": 0.25})
+        entry = decode_gradient_entry(raw)
+
+        assert entry.device_id == "dev-1"
+        assert entry.gradients == payload
+        assert entry.num_samples == 42
+        assert entry.metrics == {"loss": 0.25}
+
+    def test_encoding_roundtrip(self):
+        raw = encode_gradient_entry("dev-1", b"\x01wire", 3, encoding=GRADIENT_ENCODING_WIRE)
+        entry = decode_gradient_entry(raw)
+        assert entry.encoding == GRADIENT_ENCODING_WIRE
+        assert entry.is_wire
+        assert entry.gradients == b"\x01wire"
+
+    def test_entries_default_to_raw(self):
+        entry = decode_gradient_entry(encode_gradient_entry("dev-1", b"grads", 3))
+        assert entry.encoding == GRADIENT_ENCODING_RAW
+        assert not entry.is_wire
+
+    def test_entry_assembled_from_prefix(self):
+        """Streamed uploads write the gradient bytes right after the prefix."""
+        prefix = gradient_entry_prefix("dev-1", 3, {"loss": 0.5}, encoding=GRADIENT_ENCODING_WIRE)
+        entry = decode_gradient_entry(prefix + b"grads")
+        assert entry.gradients == b"grads"
+        assert entry.num_samples == 3
+        assert entry.is_wire
+
+    def test_binary_entry_has_no_base64_overhead(self):
+        payload = b"\x00" * 10_000
+        raw = encode_gradient_entry("dev-1", payload, 1)
+        assert len(raw) < len(payload) + 100
+
+    def test_legacy_json_entry(self):
+        raw = json.dumps({
+            "device_id": "dev-2",
+            "gradients": base64.b64encode(b"grads").decode(),
+            "num_samples": 7,
+            "metrics": {"accuracy": 0.9},
+        })
+        for value in (raw, raw.encode()):
+            entry = decode_gradient_entry(value)
+            assert entry.device_id == "dev-2"
+            assert entry.gradients == b"grads"
+            assert entry.num_samples == 7
+            assert entry.metrics == {"accuracy": 0.9}
+
+    async def test_push_appends_entry_and_notifies(self, fake_redis):
+        raw = encode_gradient_entry("dev-1", b"grads", 3)
+        await push_gradient_entry(fake_redis, "gradients:m:1", raw, "dev-1")
+
+        assert await fake_redis.lrange("gradients:m:1", 0, -1) == [raw]
+        events = await fake_redis.xrange("gradients:m:1:events")
+        assert len(events) == 1
+        assert events[0][1] == {b"device_id": b"dev-1"}
+
+    async def test_staged_upload_is_pushed_whole(self, fake_redis):
+        prefix = gradient_entry_prefix("dev-1", 3, encoding=GRADIENT_ENCODING_WIRE)
+        upload_key = gradient_upload_key("gradients:m:1", "t1")
+        await append_gradient_upload(fake_redis, upload_key, prefix + b"\x01\x02", ttl=60)
+        size = await append_gradient_upload(fake_redis, upload_key, bytearray(b"\x03"), ttl=60)
+        assert size == len(prefix) + 3
+        assert 0 < await fake_redis.ttl(upload_key) <= 60
+
+        assert await commit_gradient_upload(fake_redis, "gradients:m:1", upload_key, "dev-1")
+        entry = decode_gradient_entry((await fake_redis.lrange("gradients:m:1", 0, -1))[0])
+        assert entry.gradients == b"\x01\x02\x03" and entry.is_wire
+        assert not await fake_redis.exists(upload_key)
+        events = await fake_redis.xrange("gradients:m:1:events")
+        assert events[0][1] == {b"device_id": b"dev-1"}
+
+    async def test_expired_upload_is_not_pushed(self, fake_redis):
+        upload_key = gradient_upload_key("gradients:m:1", "gone")
+        assert not await commit_gradient_upload(fake_redis, "gradients:m:1", upload_key, "dev-1")
+        assert await fake_redis.llen("gradients:m:1") == 0
+
+
+class TestOpenRound:
+    async def test_untracked_rounds_are_open(self, fake_redis):
+        assert not await is_round_closed(fake_redis, "m", "3")
+
+    async def test_only_the_open_round_is_accepted(self, fake_redis):
+        await set_open_round(fake_redis, "m", "3")
+        assert not await is_round_closed(fake_redis, "m", "3")
+        assert await is_round_closed(fake_redis, "m", "2")
+
+        await set_open_round(fake_redis, "m", "")
+        assert await is_round_closed(fake_redis, "m", "3")
+
+    async def test_late_devices_are_popped_once(self, fake_redis):
+        await record_late_device(fake_redis, "m", "d1", ttl=60)
+        await record_late_device(fake_redis, "m", "d2", ttl=60)
+
+        assert await pop_late_devices(fake_redis, "m", ["d1", "d3"]) == {"d1"}
+        assert await pop_late_devices(fake_redis, "m", ["d1", "d2"]) == {"d2"}
+        assert await pop_late_devices(fake_redis, "m", []) == set()
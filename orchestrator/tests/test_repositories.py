@@ -87,6 +87,23 @@ class TestDeviceRepository:
         result = await repo.delete(uuid.uuid4())
         assert result is False
 
+    async def test_bulk_update_status(self, db_session: AsyncSession):
+        repo = DeviceRepository(db_session)
+        online = await repo.create(**_device_kwargs(status="online"))
+        training = await repo.create(**_device_kwargs(status="training"))
+        error = await repo.create(**_device_kwargs(status="error"))
+
+        changed = await repo.bulk_update_status(
+            [online.id, training.id, error.id], "offline", from_statuses=("online", "training"),
+        )
+
+        assert changed == 2
+        for device in (online, training, error):
+            await db_session.refresh(device)
+        assert online.status == "offline"
+        assert training.status == "offline"
+        assert error.status == "error"
+
 
 class TestTrainingJobRepository:
     async def test_create_job(self, db_session: AsyncSession):
@@ -0,0 +1,164 @@
+"""Tests for Byzantine-robust aggregation rules and norm clipping."""
+
+import numpy as np
+import pytest
+from orchestrator.services.fed_avg import (
+    AggregationConfig,
+    FedAvgAccumulator,
+    MatrixAccumulator,
+    serialize_weight_deltas,
+)
+from orchestrator.services.flat_params import FlatLayout
+from orchestrator.services.robust_aggregation import (
+    clip_rows,
+    column_chunks,
+    coordinate_median,
+    multi_krum,
+    trimmed_mean,
+)
+
+
+def _honest_with_outliers(rng, honest=8, byzantine=2, size=50):
+    matrix = rng.normal(1.0, 0.1, size=(honest + byzantine, size)).astype(np.float32)
+    matrix[honest:] = 1000.0
+    return matrix
+
+
+class TestColumnChunks:
+    def test_chunks_cover_all_columns(self):
+        chunks = list(column_chunks(4, 10, chunk_bytes=4 * 4 * 3))
+        assert [c.stop - c.start for c in chunks] == [3, 3, 3, 1]
+        assert chunks[0].start == 0 and chunks[-1].stop == 10
+
+    def test_at_least_one_column(self):
+        assert len(list(column_chunks(1000, 3, chunk_bytes=1))) == 3
+
+
+class TestRobustRules:
+    def test_median_matches_numpy_across_chunks(self):
+        matrix = np.random.default_rng(0).normal(size=(7, 101)).astype(np.float32)
+        result = coordinate_median(matrix, chunk_bytes=7 * 4 * 10)
+        np.testing.assert_allclose(result, np.median(matrix, axis=0), rtol=1e-6)
+
+    def test_median_ignores_outliers(self):
+        matrix = _honest_with_outliers(np.random.default_rng(1))
+        assert np.abs(coordinate_median(matrix) - 1.0).max() < 0.5
+
+    def test_trimmed_mean_matches_sorted_reference(self):
+        matrix = np.random.default_rng(2).normal(size=(10, 33)).astype(np.float32)
+        result = trimmed_mean(matrix, 0.2, chunk_bytes=10 * 4 * 8)
+        expected = np.sort(matrix, axis=0)[2:8].mean(axis=0)
+        np.testing.assert_allclose(result, expected, rtol=1e-5, atol=1e-6)
+
+    def test_trimmed_mean_zero_fraction_is_mean(self):
+        matrix = np.random.default_rng(3).normal(size=(5, 9)).astype(np.float32)
+        np.testing.assert_allclose(trimmed_mean(matrix, 0.0), matrix.mean(axis=0), rtol=1e-5)
+
+    def test_trimmed_mean_drops_outliers(self):
+        matrix = _honest_with_outliers(np.random.default_rng(4))
+        assert np.abs(trimmed_mean(matrix, 0.2) - 1.0).max() < 0.5
+
+    def test_krum_selects_honest_clients(self):
+        matrix = _honest_with_outliers(np.random.default_rng(5))
+        result, selected = multi_krum(matrix, num_byzantine=2, chunk_bytes=10 * 4 * 7)
+        assert sorted(selected.tolist()) == list(range(8))
+        np.testing.assert_allclose(result, matrix[:8].mean(axis=0), rtol=1e-5)
+
+    def test_krum_single_selection(self):
+        matrix = _honest_with_outliers(np.random.default_rng(6))
+        result, selected = multi_krum(matrix, num_byzantine=2, num_selected=1)
+        assert selected.size == 1 and selected[0] < 8
+        np.testing.assert_array_equal(result, matrix[selected[0]])
+
+    def test_krum_needs_enough_clients(self):
+        with pytest.raises(ValueError, match="at least 7"):
+            multi_krum(np.zeros((6, 3), dtype=np.float32), num_byzantine=2)
+
+    def test_clip_rows(self):
+        matrix = np.array([[3.0, 4.0], [0.3, 0.4]], dtype=np.float32)
+        assert clip_rows(matrix, 1.0) == 1
+        np.testing.assert_allclose(matrix, [[0.6, 0.8], [0.3, 0.4]], rtol=1e-6)
+
+
+class TestRobustAccumulators:
+    def _payloads(self, values):
+        return [
+            serialize_weight_deltas({"hidden_bias": np.full(4, v, dtype=np.float32)})
+            for v in values
+        ]
+
+    def test_matrix_accumulator_with_median(self):
+        layout = FlatLayout.from_shapes({"hidden_bias": (4,)})
+        cfg = AggregationConfig.from_job_config({"aggregation": {"rule": "median"}})
+        acc = cfg.make_accumulator(layout, 3)
+        assert isinstance(acc, MatrixAccumulator)
+        for payload, samples in zip(self._payloads([1.0, 2.0, 500.0]), [1, 1, 1000], strict=True):
+            acc.add(payload, samples)
+        np.testing.assert_array_equal(acc.result_vector(), np.full(4, 2.0))
+
+    def test_streaming_clip_norm(self):
+        layout = FlatLayout.from_shapes({"hidden_bias": (4,)})
+        acc = FedAvgAccumulator(layout, clip_norm=1.0)
+        for payload in self._payloads([0.1, 10.0]):
+            acc.add(payload, 1)
+        # ||[10]*4|| = 20 -> scaled to 0.5 per element
+        np.testing.assert_allclose(acc.result_vector(), np.full(4, 0.3), rtol=1e-6)
+        assert acc.clipped == 1
+
+    def test_matrix_clip_norm_before_mean(self):
+        layout = FlatLayout.from_shapes({"hidden_bias": (4,)})
+        acc = MatrixAccumulator(layout, clip_norm=1.0)
+        for payload in self._payloads([0.1, 10.0]):
+            acc.add(payload, 1)
+        np.testing.assert_allclose(acc.result_vector(), np.full(4, 0.3), rtol=1e-6)
+        assert acc.clipped == 1
+
+
+class TestAggregationConfigRules:
+    def test_robust_rule_implies_matrix(self):
+        cfg = AggregationConfig.from_job_config(
+            {"aggregation": {"rule": "krum", "num_byzantine": 1}}
+        )
+        assert cfg.mode == "matrix"
+        assert cfg.num_byzantine == 1
+
+    def test_robust_rule_rejects_streaming(self):
+        with pytest.raises(ValueError, match="requires mode 'matrix'"):
+            AggregationConfig.from_job_config(
+                {"aggregation": {"rule": "median", "mode": "streaming"}}
+            )
+
+    def test_krum_checked_against_min_devices(self):
+        config = {"aggregation": {"rule": "krum", "num_byzantine": 2}}
+        with pytest.raises(ValueError, match="min_devices >= 7"):
+            AggregationConfig.from_job_config(config, min_devices=6)
+        assert AggregationConfig.from_job_config(config, min_devices=7).num_byzantine == 2
+
+    def test_krum_falls_back_to_median_with_too_few_reports(self):
+        cfg = AggregationConfig.from_job_config(
+            {"aggregation": {"rule": "krum", "num_byzantine": 1}}
+        )
+        acc = cfg.make_accumulator(FlatLayout.from_shapes({"hidden_bias": (4,)}), 5)
+        for value in (1.0, 3.0):
+            acc.add(
+                serialize_weight_deltas({"hidden_bias": np.full(4, value, dtype=np.float32)}), 1
+            )
+        np.testing.assert_array_equal(acc.result_vector(), np.full(4, 2.0))
+
+    def test_unknown_rule(self):
+        with pytest.raises(ValueError, match="Unknown aggregation rule"):
+            AggregationConfig.from_job_config({"aggregation": {"rule": "bogus"}})
+
+    def test_invalid_parameters(self):
+        with pytest.raises(ValueError, match="trim_fraction"):
+            AggregationConfig.from_job_config(
+                {"aggregation": {"rule": "trimmed_mean", "trim_fraction": 0.5}}
+            )
+        with pytest.raises(ValueError, match="clip_norm"):
+            AggregationConfig.from_job_config({"aggregation": {"clip_norm": 0}})
+
+    def test_clip_norm_in_streaming_mode(self):
+        cfg = AggregationConfig.from_job_config({"aggregation": {"clip_norm": 2.5}})
+        acc = cfg.make_accumulator(FlatLayout.from_shapes({"hidden_bias": (4,)}), 2)
+        assert isinstance(acc, FedAvgAccumulator)
+        assert acc.clip_norm == 2.5
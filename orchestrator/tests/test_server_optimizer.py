@@ -0,0 +1,134 @@
+"""Tests for server-side optimizers (FedAvg / FedAvgM / FedAdam / FedYogi)."""
+
+import numpy as np
+import pytest
+from orchestrator.services.server_optimizer import (
+    FedAdam,
+    FedAvg,
+    FedAvgM,
+    FedYogi,
+    ServerOptimizerConfig,
+    decode_optimizer_state,
+    encode_optimizer_state,
+    load_optimizer_state,
+    optimizer_state_key,
+    save_optimizer_state,
+)
+
+
+class TestServerOptimizerConfig:
+    def test_defaults_to_fedavg(self):
+        for config in (None, {}, {"server_optimizer": {}}):
+            cfg = ServerOptimizerConfig.from_job_config(config)
+            assert cfg.name == "fedavg"
+            assert isinstance(cfg.make_optimizer(4), FedAvg)
+
+    def test_adaptive_defaults_to_small_lr(self):
+        cfg = ServerOptimizerConfig.from_job_config({"server_optimizer": {"name": "fedadam"}})
+        assert cfg.lr == 0.01
+        assert isinstance(cfg.make_optimizer(4), FedAdam)
+
+    def test_explicit_values(self):
+        cfg = ServerOptimizerConfig.from_job_config({
+            "server_optimizer": {"name": "fedyogi", "lr": 0.1, "beta2": 0.9, "tau": 0.01},
+        })
+        opt = cfg.make_optimizer(4)
+        assert isinstance(opt, FedYogi)
+        assert (opt.lr, opt.beta2, opt.tau) == (0.1, 0.9, 0.01)
+
+    def test_unknown_optimizer(self):
+        with pytest.raises(ValueError, match="Unknown server optimizer"):
+            ServerOptimizerConfig.from_job_config({"server_optimizer": {"name": "sgd"}})
+
+
+class TestOptimizerSteps:
+    def test_fedavg_adds_delta(self):
+        weights = np.ones(3, dtype=np.float32)
+        FedAvg(3).step(weights, np.array([1, 2, 3], dtype=np.float32))
+        np.testing.assert_array_equal(weights, [2, 3, 4])
+
+    def test_fedavgm_accumulates_velocity(self):
+        opt = FedAvgM(2, lr=0.5, momentum=0.9)
+        weights = np.zeros(2, dtype=np.float32)
+        delta = np.array([1.0, -2.0], dtype=np.float32)
+        opt.step(weights, delta)
+        opt.step(weights, delta)
+        # v1 = Δ, v2 = 1.9Δ; w = 0.5 * (v1 + v2)
+        np.testing.assert_allclose(weights, 0.5 * 2.9 * delta, rtol=1e-6)
+
+    @pytest.mark.parametrize("cls", [FedAdam, FedYogi])
+    def test_adaptive_matches_reference(self, cls):
+        rng = np.random.RandomState(0)
+        opt = cls(5, lr=0.1, beta1=0.9, beta2=0.99, tau=1e-3)
+        weights = np.zeros(5, dtype=np.float32)
+
+        m = np.zeros(5)
+        v = np.full(5, 1e-6)
+        ref = np.zeros(5)
+        for _ in range(3):
+            delta = rng.randn(5).astype(np.float32)
+            opt.step(weights, delta)
+            d = delta.astype(np.float64)
+            m = 0.9 * m + 0.1 * d
+            v = (
+                0.99 * v + 0.01 * d * d
+                if cls is FedAdam
+                else v - 0.01 * d * d * np.sign(v - d * d)
+            )
+            ref += 0.1 * m / (np.sqrt(v) + 1e-3)
+
+        np.testing.assert_allclose(weights, ref, rtol=1e-4)
+        assert opt.steps == 3
+
+    def test_momentum_needs_fewer_rounds_on_ill_conditioned_problem(self):
+        """Pseudo-gradients of an ill-conditioned quadratic: momentum converges much sooner."""
+        curvature = np.linspace(0.01, 1.0, 50).astype(np.float32)
+
+        def rounds_to_converge(opt) -> int:
+            weights = np.ones(50, dtype=np.float32)
+            for round_num in range(1, 2000):
+                opt.step(weights, -0.5 * curvature * weights)
+                if np.linalg.norm(weights) < 1e-2:
+                    return round_num
+            return 2000
+
+        plain = rounds_to_converge(FedAvg(50))
+        momentum = rounds_to_converge(FedAvgM(50, momentum=0.9))
+        assert momentum < plain / 3
+
+
+class TestOptimizerCheckpoint:
+    def test_encode_decode_roundtrip(self):
+        opt = FedAdam(4)
+        opt.step(np.zeros(4, dtype=np.float32), np.ones(4, dtype=np.float32))
+        name, version, steps, state = decode_optimizer_state(encode_optimizer_state(opt, 7))
+        assert (name, version, steps) == ("fedadam", 7, 1)
+        np.testing.assert_array_equal(state["m"], opt.m)
+        np.testing.assert_array_equal(state["v"], opt.v)
+
+    async def test_save_and_restore(self, fake_redis):
+        opt = FedAvgM(3)
+        opt.step(np.zeros(3, dtype=np.float32), np.ones(3, dtype=np.float32))
+        await save_optimizer_state(fake_redis, "job", opt, version=4)
+
+        restored = FedAvgM(3)
+        assert await load_optimizer_state(fake_redis, "job", restored, version=4)
+        np.testing.assert_array_equal(restored.velocity, opt.velocity)
+        assert restored.steps == 1
+
+    async def test_mismatched_checkpoint_is_ignored(self, fake_redis):
+        opt = FedAvgM(3)
+        opt.step(np.zeros(3, dtype=np.float32), np.ones(3, dtype=np.float32))
+        await save_optimizer_state(fake_redis, "job", opt, version=4)
+
+        # Model resumed from a different version, or a different optimizer
+        stale = FedAvgM(3)
+        assert not await load_optimizer_state(fake_redis, "job", stale, version=5)
+        assert not stale.velocity.any()
+        assert not await load_optimizer_state(fake_redis, "job", FedAdam(3), version=4)
+        # Parameter count changed
+        assert not await load_optimizer_state(fake_redis, "job", FedAvgM(4), version=4)
+
+    async def test_stateless_optimizer_writes_nothing(self, fake_redis):
+        await save_optimizer_state(fake_redis, "job", FedAvg(3), version=1)
+        assert await fake_redis.get(optimizer_state_key("job")) is None
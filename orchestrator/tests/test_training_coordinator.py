@@ -3,15 +3,35 @@
 import asyncio
 import base64
 import json
+import time
 import uuid
 from types import SimpleNamespace
 from unittest.mock import AsyncMock, patch
 
 import fakeredis
+import numpy as np
 import pytest
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from orchestrator.db.repositories import TrainingJobRepository
+from orchestrator.services.coreml_model import create_updatable_mlmodel, extract_weights, parse_spec
+from orchestrator.services.fed_avg import FedAvgAccumulator, serialize_weight_deltas
+from orchestrator.services.flat_params import FlatLayout, get_layout
+from orchestrator.services.gradient_codec import compress_gradients
+from orchestrator.services.redis_blobs import (
+    GRADIENT_ENCODING_WIRE,
+    encode_gradient_entry,
+    is_round_closed,
+    load_model,
+    open_round_key,
+    push_gradient_entry,
+    save_model,
+)
+from orchestrator.services.server_optimizer import (
+    FedAvgM,
+    optimizer_state_key,
+    save_optimizer_state,
+)
 from orchestrator.services.training_coordinator import TrainingCoordinator
 
 
@@ -105,7 +125,7 @@ class TestResumeJob:
             await coordinator._current_task
 
         # Model should now exist (using job_id since model_id is None)
-        assert await fake_redis.exists(f"model:{job_id}:global")
+        assert await fake_redis.exists(f"model:{job_id}:blob")
         assert await fake_redis.exists(f"model:{job_id}:meta")
 
     async def test_resume_job_with_model_id(self, coordinator, fake_redis):
@@ -134,7 +154,7 @@ class TestResumeJob:
             await coordinator._current_task
 
         # Model key should use model_id, not job_id
-        assert await fake_redis.exists(f"model:{model_id}:global")
+        assert await fake_redis.exists(f"model:{model_id}:blob")
         assert await fake_redis.exists(f"model:{model_id}:meta")
 
 
@@ -162,7 +182,7 @@ class TestStartJob:
             await coordinator.start_job(job_id, num_rounds=5, learning_rate=0.01, min_devices=1, model_id=model_id)
             await coordinator._current_task
 
-        assert await fake_redis.exists(f"model:{model_id}:global")
+        assert await fake_redis.exists(f"model:{model_id}:blob")
 
     async def test_start_job_without_model_id(self, coordinator, fake_redis):
         """start_job without model_id falls back to job_id."""
@@ -172,7 +192,7 @@ class TestStartJob:
             await coordinator.start_job(job_id, num_rounds=5, learning_rate=0.01, min_devices=1)
             await coordinator._current_task
 
-        assert await fake_redis.exists(f"model:{job_id}:global")
+        assert await fake_redis.exists(f"model:{job_id}:blob")
 
 
 class TestRoundRetry:
@@ -194,7 +214,7 @@ class TestRoundRetry:
         # Track how many times _wait_for_gradients is called
         call_count = 0
 
-        async def mock_wait(key, expected, timeout=60):
+        async def mock_wait(key, expected, timeout=60, accumulator=None):
             nonlocal call_count
             call_count += 1
             return []  # No gradients ever
@@ -228,6 +248,284 @@ class TestRoundRetry:
         assert updated_job.status == "completed"
 
 
+class TestInMemoryModelState:
+    async def test_rounds_parse_model_once(self, coordinator, fake_redis, db_session):
+        """The global model is parsed once per job and published per round."""
+        job_id = str(uuid.uuid4())
+        repo = TrainingJobRepository(db_session)
+        await repo.create(id=uuid.UUID(job_id), num_rounds=2, min_devices=1, learning_rate=0.01)
+
+        model_bytes = create_updatable_mlmodel()
+        await save_model(fake_redis, job_id, model_bytes)
+        await fake_redis.set(f"model:{job_id}:meta", json.dumps({"version": "0"}))
+
+        from orchestrator.db.repositories import DeviceRepository
+        device = await DeviceRepository(db_session).create(
+            name="test-device", device_model="iPhone15", os_version="17.0", status="online",
+        )
+
+        delta = serialize_weight_deltas({"output_bias": np.ones(10, dtype=np.float32)})
+
+        async def mock_wait(key, expected, timeout=60, accumulator=None):
+            accumulator.add(delta, 10)
+            return [{"device_id": str(device.id), "num_samples": 10}]
+
+        evaluator = SimpleNamespace(evaluate=lambda weights, architecture: (0.5, 0.9))
+        mock_cm = AsyncMock()
+        mock_cm.__aenter__ = AsyncMock(return_value=db_session)
+        mock_cm.__aexit__ = AsyncMock(return_value=False)
+
+        with (
+            patch.object(coordinator, "_wait_for_gradients", side_effect=mock_wait),
+            patch("orchestrator.services.training_coordinator.async_session", return_value=mock_cm),
+            patch(
+                "orchestrator.services.training_coordinator.ServerEvaluator.get_instance",
+                return_value=evaluator,
+            ),
+            patch(
+                "orchestrator.services.model_state.parse_spec", side_effect=parse_spec,
+            ) as parse_mock,
+        ):
+            await coordinator._run_training_loop(
+                job_id, num_rounds=2, learning_rate=0.01, min_devices=1,
+            )
+
+        assert parse_mock.call_count == 1
+        published = await load_model(fake_redis, job_id)
+        recovered = extract_weights(published)
+        original = extract_weights(model_bytes)
+        np.testing.assert_allclose(
+            recovered["output_bias"], original["output_bias"] + 2.0, rtol=1e-6
+        )
+        assert json.loads(await fake_redis.get(f"model:{job_id}:meta"))["version"] == "2"
+
+
+class TestServerOptimizer:
+    async def _run(
+        self, coordinator, fake_redis, db_session, job_id, config, start_round=1, num_rounds=2,
+    ):
+        repo = TrainingJobRepository(db_session)
+        await repo.create(
+            id=uuid.UUID(job_id), num_rounds=num_rounds, min_devices=1, learning_rate=0.01,
+            config=config,
+        )
+        from orchestrator.db.repositories import DeviceRepository
+        device = await DeviceRepository(db_session).create(
+            name="test-device", device_model="iPhone15", os_version="17.0", status="online",
+        )
+
+        delta = serialize_weight_deltas({"output_bias": np.ones(10, dtype=np.float32)})
+
+        async def mock_wait(key, expected, timeout=60, accumulator=None):
+            accumulator.add(delta, 10)
+            return [{"device_id": str(device.id), "num_samples": 10}]
+
+        evaluator = SimpleNamespace(evaluate=lambda weights, architecture: (0.5, 0.9))
+        mock_cm = AsyncMock()
+        mock_cm.__aenter__ = AsyncMock(return_value=db_session)
+        mock_cm.__aexit__ = AsyncMock(return_value=False)
+        with (
+            patch.object(coordinator, "_wait_for_gradients", side_effect=mock_wait),
+            patch("orchestrator.services.training_coordinator.async_session", return_value=mock_cm),
+            patch(
+                "orchestrator.services.training_coordinator.ServerEvaluator.get_instance",
+                return_value=evaluator,
+            ),
+        ):
+            await coordinator._run_training_loop(
+                job_id, num_rounds=num_rounds, learning_rate=0.01, min_devices=1,
+                start_round=start_round, job_config=config,
+            )
+
+    async def test_momentum_applied_across_rounds(self, coordinator, fake_redis, db_session):
+        job_id = str(uuid.uuid4())
+        model_bytes = create_updatable_mlmodel()
+        await save_model(fake_redis, job_id, model_bytes)
+
+        config = {"server_optimizer": {"name": "fedavgm", "momentum": 0.9}}
+        await self._run(coordinator, fake_redis, db_session, job_id, config)
+
+        recovered = extract_weights(await load_model(fake_redis, job_id))
+        original = extract_weights(model_bytes)
+        # v1 = 1, v2 = 1.9
+        np.testing.assert_allclose(
+            recovered["output_bias"], original["output_bias"] + 2.9, rtol=1e-6
+        )
+        # Completed jobs drop their optimizer state
+        assert await fake_redis.get(optimizer_state_key(job_id)) is None
+
+    async def test_resume_restores_optimizer_state(self, coordinator, fake_redis, db_session):
+        job_id = str(uuid.uuid4())
+        model_bytes = create_updatable_mlmodel()
+        await save_model(fake_redis, job_id, model_bytes)
+
+        # Crashed in round 2 (current_round=2): round 1 was applied and
+        # published as version 1, with its optimizer checkpoint
+        await fake_redis.set(f"model:{job_id}:meta", json.dumps({"version": "1"}))
+        layout = get_layout("mnist")
+        saved = FedAvgM(layout.size, momentum=0.9)
+        saved.velocity[:] = 1.0
+        saved.steps = 1
+        await save_optimizer_state(fake_redis, job_id, saved, version=1)
+
+        config = {"server_optimizer": {"name": "fedavgm", "momentum": 0.9}}
+        # resume_job continues after current_round
+        await self._run(
+            coordinator, fake_redis, db_session, job_id, config, start_round=3, num_rounds=3,
+        )
+
+        recovered = extract_weights(await load_model(fake_redis, job_id))
+        original = extract_weights(model_bytes)
+        np.testing.assert_allclose(
+            recovered["output_bias"], original["output_bias"] + 1.9, rtol=1e-6
+        )
+        assert json.loads(await fake_redis.get(f"model:{job_id}:meta"))["version"] == "3"
+
+    async def test_resume_takes_version_from_model_store(self, coordinator, fake_redis, tmp_path):
+        from orchestrator.services.model_store import FileModelStore
+
+        job_id = str(uuid.uuid4())
+        coordinator.model_store = FileModelStore(tmp_path, fake_redis)
+        await coordinator.model_store.put(job_id, create_updatable_mlmodel(), version=4)
+        state = await coordinator._load_model_state(
+            job_id,
+            job_id,
+            get_layout("mnist"),
+            FedAvgM(get_layout("mnist").size),
+            default_version=6,
+        )
+        assert state.version == 4
+
+
+class TestWaitForGradients:
+    async def test_folds_entries_into_accumulator(self, coordinator, fake_redis):
+        """Entries are aggregated as they are read, invalid ones are skipped."""
+        key = "gradients:m:1"
+        for value, n in ((1.0, 10), (4.0, 30)):
+            grads = serialize_weight_deltas({"hidden_bias": np.full(128, value, dtype=np.float32)})
+            await fake_redis.rpush(key, json.dumps({
+                "device_id": f"d{n}",
+                "gradients": base64.b64encode(grads).decode(),
+                "num_samples": n,
+                "metrics": {"loss": 0.5},
+            }))
+        await fake_redis.rpush(
+            key, json.dumps({"device_id": "bad", "gradients": "", "num_samples": 0})
+        )
+
+        accumulator = FedAvgAccumulator()
+        metrics = await coordinator._wait_for_gradients(key, 3, timeout=0, accumulator=accumulator)
+
+        assert [m["device_id"] for m in metrics] == ["d10", "d30"]
+        assert accumulator.count == 2
+        np.testing.assert_allclose(accumulator.result()["hidden_bias"], 3.25, rtol=1e-6)
+
+    async def test_reads_binary_entries(self, coordinator, fake_redis):
+        """Binary framed entries from SubmitGradients are decoded without base64."""
+        key = "gradients:m:2"
+        grads = serialize_weight_deltas({"output_bias": np.full(10, 2.0, dtype=np.float32)})
+        await fake_redis.rpush(key, encode_gradient_entry("dev", grads, 5, {"loss": 0.1}))
+
+        accumulator = FedAvgAccumulator()
+        metrics = await coordinator._wait_for_gradients(key, 1, timeout=0, accumulator=accumulator)
+
+        assert metrics == [{"loss": 0.1, "device_id": "dev", "num_samples": 5}]
+        np.testing.assert_allclose(accumulator.result()["output_bias"], 2.0)
+
+    async def test_decodes_compressed_wire_entries(self, coordinator, fake_redis):
+        """float16+lz4 payloads stored as sent are decoded during aggregation."""
+        key = "gradients:m:4"
+        one_layer = serialize_weight_deltas({"output_bias": np.full(10, 2.0, dtype=np.float32)})
+        await fake_redis.rpush(key, encode_gradient_entry(
+            "f16", compress_gradients(one_layer), 1, encoding=GRADIENT_ENCODING_WIRE,
+        ))
+        # A legacy 1-layer float32 payload also starts with 0x01
+        await fake_redis.rpush(key, encode_gradient_entry(
+            "f32", one_layer, 1, encoding=GRADIENT_ENCODING_WIRE,
+        ))
+        await fake_redis.rpush(key, encode_gradient_entry(
+            "raw", serialize_weight_deltas({"output_bias": np.full(10, 5.0, dtype=np.float32)}), 2,
+        ))
+
+        accumulator = FedAvgAccumulator(FlatLayout.from_shapes({"output_bias": (10,)}))
+        metrics = await coordinator._wait_for_gradients(key, 3, timeout=0, accumulator=accumulator)
+
+        assert [m["device_id"] for m in metrics] == ["f16", "raw"]
+        np.testing.assert_allclose(accumulator.result()["output_bias"], 4.0, rtol=1e-3)
+
+    async def test_corrupt_entry_leaves_sum_untouched(self, coordinator, fake_redis):
+        """A payload that fails validation part-way is skipped without partial writes."""
+        key = "gradients:m:5"
+        grads = serialize_weight_deltas({
+            "hidden_bias": np.ones(128, dtype=np.float32),
+            "output_bias": np.ones(7, dtype=np.float32),  # wrong size
+        })
+        await fake_redis.rpush(key, encode_gradient_entry(
+            "bad", compress_gradients(grads), 1, encoding=GRADIENT_ENCODING_WIRE,
+        ))
+        await fake_redis.rpush(
+            key,
+            encode_gradient_entry(
+                "good",
+                serialize_weight_deltas({"hidden_bias": np.full(128, 3.0, dtype=np.float32)}),
+                1,
+            ),
+        )
+
+        accumulator = FedAvgAccumulator(get_layout("mnist"))
+        metrics = await coordinator._wait_for_gradients(key, 2, timeout=0, accumulator=accumulator)
+
+        assert [m["device_id"] for m in metrics] == ["good"]
+        np.testing.assert_allclose(accumulator.result()["hidden_bias"], 3.0)
+
+    async def test_wakes_on_submission_instead_of_polling(self, coordinator, fake_redis):
+        """The round closes as soon as the last expected submission is pushed."""
+        key = "gradients:m:3"
+        grads = serialize_weight_deltas({"output_bias": np.ones(10, dtype=np.float32)})
+
+        async def submit_later():
+            for i in range(2):
+                await asyncio.sleep(0.05)
+                raw = encode_gradient_entry(f"dev{i}", grads, 1)
+                await push_gradient_entry(fake_redis, key, raw, f"dev{i}")
+
+        submitter = asyncio.create_task(submit_later())
+        start = time.monotonic()
+        metrics = await coordinator._wait_for_gradients(key, 2, timeout=30)
+        elapsed = time.monotonic() - start
+        await submitter
+
+        assert len(metrics) == 2
+        assert elapsed < 1.0
+
+    async def test_malformed_entries_do_not_count_toward_quorum(self, coordinator, fake_redis):
+        """The wait goes on until `expected` entries could actually be aggregated."""
+        key = "gradients:m:6"
+        grads = serialize_weight_deltas({"output_bias": np.ones(10, dtype=np.float32)})
+        await push_gradient_entry(fake_redis, key, b"EOG\x01garbage", "bad")
+
+        async def submit_later():
+            await asyncio.sleep(0.05)
+            await push_gradient_entry(
+                fake_redis, key, encode_gradient_entry("good", grads, 1), "good"
+            )
+
+        submitter = asyncio.create_task(submit_later())
+        metrics = await coordinator._wait_for_gradients(key, 1, timeout=5)
+        await submitter
+
+        assert [m["device_id"] for m in metrics] == ["good"]
+
+    async def test_returns_partial_results_on_timeout(self, coordinator, fake_redis):
+        key = "gradients:m:4"
+        grads = serialize_weight_deltas({"output_bias": np.ones(10, dtype=np.float32)})
+        await push_gradient_entry(fake_redis, key, encode_gradient_entry("d", grads, 1), "d")
+
+        metrics = await coordinator._wait_for_gradients(key, 3, timeout=0.2)
+
+        assert [m["device_id"] for m in metrics] == ["d"]
+
+
 class TestFailurePreservesModel:
     async def test_failure_preserves_model(self, coordinator, fake_redis):
         """An exception during training should NOT delete the model from Redis."""
@@ -368,3 +666,343 @@ class TestActiveJobsTracking:
                 await coordinator.resume_job(job)
 
         assert not resumed
+
+
+class InstantTrainingHeartbeat(FakeHeartbeatMonitor):
+    """Devices that 'train' instantly: every start_training submits a delta right away."""
+
+    def __init__(self, redis, model_id: str, delta: bytes):
+        super().__init__()
+        self.redis = redis
+        self.model_id = model_id
+        self.delta = delta
+
+    async def queue_command(self, device_id: str, command: dict) -> None:
+        await super().queue_command(device_id, command)
+        key = f"gradients:{self.model_id}:{command['parameters']['round']}"
+        await push_gradient_entry(
+            self.redis, key, encode_gradient_entry(device_id, self.delta, 10), device_id,
+        )
+
+
+class TestAsyncTraining:
+    async def test_buffered_updates_keep_devices_busy(self, fake_redis, db_session):
+        job_id = str(uuid.uuid4())
+        repo = TrainingJobRepository(db_session)
+        config = {"async": {"enabled": True, "buffer_size": 2}}
+        await repo.create(
+            id=uuid.UUID(job_id), num_rounds=2, min_devices=1, learning_rate=0.01, config=config,
+        )
+        model_bytes = create_updatable_mlmodel()
+        await save_model(fake_redis, job_id, model_bytes)
+
+        from orchestrator.db.repositories import DeviceRepository
+        for name in ("fast", "slow"):
+            await DeviceRepository(db_session).create(
+                name=name, device_model="iPhone15", os_version="17.0", status="online",
+            )
+
+        delta = serialize_weight_deltas({"output_bias": np.ones(10, dtype=np.float32)})
+        heartbeat = InstantTrainingHeartbeat(fake_redis, job_id, delta)
+        coordinator = TrainingCoordinator(redis=fake_redis, heartbeat_monitor=heartbeat)
+
+        evaluator = SimpleNamespace(evaluate=lambda weights, architecture: (0.5, 0.9))
+        mock_cm = AsyncMock()
+        mock_cm.__aenter__ = AsyncMock(return_value=db_session)
+        mock_cm.__aexit__ = AsyncMock(return_value=False)
+        with (
+            patch("orchestrator.services.training_coordinator.async_session", return_value=mock_cm),
+            patch(
+                "orchestrator.services.training_coordinator.ServerEvaluator.get_instance",
+                return_value=evaluator,
+            ),
+        ):
+            await coordinator._run_training_loop(
+                job_id, num_rounds=2, learning_rate=0.01, min_devices=1, job_config=config,
+            )
+
+        # Both devices trained on v0, then again on v1 once they were released
+        rounds = sorted(cmd["parameters"]["round"] for _, cmd in heartbeat.commands)
+        assert rounds == ["1", "1", "2", "2"]
+
+        recovered = extract_weights(await load_model(fake_redis, job_id))
+        original = extract_weights(model_bytes)
+        np.testing.assert_allclose(
+            recovered["output_bias"], original["output_bias"] + 2.0, rtol=1e-6
+        )
+
+        job = await repo.get(uuid.UUID(job_id))
+        assert job.status == "completed"
+        assert job.current_round == 2
+        metrics = job.round_metrics["rounds"]
+        assert [m["round"] for m in metrics] == [1, 2]
+        assert all(m["participants"] == 2 and m["max_staleness"] == 0 for m in metrics)
+
+
+class TestQuorumClose:
+    async def test_round_closes_at_quorum_and_rejects_late_rounds(
+        self, coordinator, fake_redis, db_session
+    ):
+        job_id = str(uuid.uuid4())
+        config = {"scheduler": {
+            "enabled": True, "target_devices": 2, "over_select_factor": 1.5, "quorum_fraction": 1.0,
+        }}
+        repo = TrainingJobRepository(db_session)
+        await repo.create(
+            id=uuid.UUID(job_id), num_rounds=1, min_devices=1, learning_rate=0.01, config=config,
+        )
+        await save_model(fake_redis, job_id, create_updatable_mlmodel())
+
+        from orchestrator.db.repositories import DeviceRepository
+        for i in range(4):
+            await DeviceRepository(db_session).create(
+                name=f"d{i}", device_model="iPhone15", os_version="17.0", status="online",
+            )
+
+        delta = serialize_weight_deltas({"output_bias": np.ones(10, dtype=np.float32)})
+        waits = []
+
+        async def mock_wait(key, expected, timeout=60, accumulator=None):
+            waits.append((expected, await is_round_closed(fake_redis, job_id, "1")))
+            accumulator.add(delta, 10)
+            return [{"device_id": "d", "num_samples": 10}]
+
+        evaluator = SimpleNamespace(evaluate=lambda weights, architecture: (0.5, 0.9))
+        mock_cm = AsyncMock()
+        mock_cm.__aenter__ = AsyncMock(return_value=db_session)
+        mock_cm.__aexit__ = AsyncMock(return_value=False)
+        with (
+            patch.object(coordinator, "_wait_for_gradients", side_effect=mock_wait),
+            patch("orchestrator.services.training_coordinator.async_session", return_value=mock_cm),
+            patch(
+                "orchestrator.services.training_coordinator.ServerEvaluator.get_instance",
+                return_value=evaluator,
+            ),
+        ):
+            await coordinator._run_training_loop(
+                job_id, num_rounds=1, learning_rate=0.01, min_devices=1, job_config=config,
+            )
+
+        # 3 of 4 dispatched (2 * 1.5), round 1 open while waiting for 2 reports
+        assert len(coordinator.heartbeat_monitor.commands) == 3
+        assert waits == [(2, False)]
+        job = await repo.get(uuid.UUID(job_id))
+        assert job.round_metrics["rounds"][0]["quorum"] == 2
+        # Finished jobs stop tracking rounds
+        assert await fake_redis.get(open_round_key(job_id)) is None
+
+    async def test_stragglers_stay_leased_after_quorum_close(
+        self, coordinator, fake_redis, db_session
+    ):
+        from orchestrator.db.repositories import DeviceRepository
+
+        job_id = str(uuid.uuid4())
+        config = {"scheduler": {"enabled": True, "target_devices": 2, "quorum_fraction": 0.5}}
+        repo = TrainingJobRepository(db_session)
+        await repo.create(
+            id=uuid.UUID(job_id), num_rounds=2, min_devices=1, learning_rate=0.01, config=config,
+        )
+        await save_model(fake_redis, job_id, create_updatable_mlmodel())
+        device_repo = DeviceRepository(db_session)
+        for i in range(3):
+            await device_repo.create(
+                name=f"d{i}", device_model="iPhone15", os_version="17.0", status="online",
+            )
+
+        delta = serialize_weight_deltas({"output_bias": np.ones(10, dtype=np.float32)})
+        dispatched_per_round = []
+
+        async def mock_wait(key, expected, timeout=60, accumulator=None):
+            round_devices = [d for d, _ in coordinator.heartbeat_monitor.commands]
+            del coordinator.heartbeat_monitor.commands[:]
+            dispatched_per_round.append(round_devices)
+            accumulator.add(delta, 10)
+            # Only the first device reports; the other is still training
+            return [{"device_id": round_devices[0], "num_samples": 10}]
+
+        mock_cm = AsyncMock()
+        mock_cm.__aenter__ = AsyncMock(return_value=db_session)
+        mock_cm.__aexit__ = AsyncMock(return_value=False)
+        with (
+            patch.object(coordinator, "_wait_for_gradients", side_effect=mock_wait),
+            patch("orchestrator.services.training_coordinator.async_session", return_value=mock_cm),
+            patch(
+                "orchestrator.services.training_coordinator.ServerEvaluator.get_instance",
+                return_value=SimpleNamespace(evaluate=lambda weights, architecture: (0.5, 0.9)),
+            ),
+        ):
+            await coordinator._run_training_loop(
+                job_id, num_rounds=2, learning_rate=0.01, min_devices=1, job_config=config,
+            )
+
+        first, second = dispatched_per_round
+        straggler = first[1]
+        # Round 2 never goes to the device still busy with round 1
+        assert straggler not in second
+        owners = await coordinator.leases.owners([first[0], straggler])
+        assert owners == {first[0]: None, straggler: job_id}
+
+    async def test_reclaim_stragglers(self, coordinator, fake_redis, db_session):
+        from orchestrator.db.repositories import DeviceRepository
+        from orchestrator.services.redis_blobs import record_late_device
+
+        device_repo = DeviceRepository(db_session)
+        late, lapsed, busy = [
+            str((await device_repo.create(
+                name=f"d{i}", device_model="iPhone15", os_version="17.0", status="training",
+            )).id)
+            for i in range(3)
+        ]
+        await coordinator.leases.acquire("job", [late, busy], ttl=60)
+        await record_late_device(fake_redis, "m", late, ttl=60)
+
+        mock_cm = AsyncMock()
+        mock_cm.__aenter__ = AsyncMock(return_value=db_session)
+        mock_cm.__aexit__ = AsyncMock(return_value=False)
+        with patch(
+            "orchestrator.services.training_coordinator.async_session", return_value=mock_cm
+        ):
+            remaining = await coordinator._reclaim_stragglers("job", "m", [late, lapsed, busy])
+
+        assert remaining == [busy]
+        assert (await coordinator.leases.owners([late]))[late] is None
+        statuses = {str(d.id): d.status for d in await device_repo.list_all()}
+        assert statuses == {late: "online", lapsed: "online", busy: "training"}
+
+
+class TestPipelinedRounds:
+    async def test_next_round_dispatches_during_evaluation(
+        self, coordinator, fake_redis, db_session, db_engine, tmp_path,
+    ):
+        import threading
+
+        from orchestrator.services.model_store import FileModelStore
+
+        coordinator.model_store = FileModelStore(tmp_path, fake_redis, legacy_redis=fake_redis)
+        job_id = str(uuid.uuid4())
+        config = {"pipeline": {"enabled": True}}
+        repo = TrainingJobRepository(db_session)
+        await repo.create(
+            id=uuid.UUID(job_id), num_rounds=2, min_devices=1, learning_rate=0.01, config=config,
+        )
+        await save_model(fake_redis, job_id, create_updatable_mlmodel())
+
+        from orchestrator.db.repositories import DeviceRepository
+        device = await DeviceRepository(db_session).create(
+            name="d0", device_model="iPhone15", os_version="17.0", status="online",
+        )
+
+        delta = serialize_weight_deltas({"output_bias": np.ones(10, dtype=np.float32)})
+        round_two_dispatched = threading.Event()
+        evaluations = []
+
+        async def mock_wait(key, expected, timeout=60, accumulator=None):
+            if key.endswith(":2"):
+                round_two_dispatched.set()
+            accumulator.add(delta, 10)
+            return [{"device_id": str(device.id), "num_samples": 10}]
+
+        def evaluate(weights, architecture):
+            # Round 1 is still being evaluated when round 2 is dispatched
+            overlapped = round_two_dispatched.wait(timeout=5)
+            evaluations.append((overlapped, np.array(weights["output_bias"])))
+            return 0.5, 0.9
+
+        # Background persistence runs concurrently with the next round: one
+        # session per use, as in production
+        sessions = async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+        with (
+            patch.object(coordinator, "_wait_for_gradients", side_effect=mock_wait),
+            patch("orchestrator.services.training_coordinator.async_session", new=sessions),
+            patch(
+                "orchestrator.services.training_coordinator.ServerEvaluator.get_instance",
+                return_value=SimpleNamespace(evaluate=evaluate),
+            ),
+        ):
+            await coordinator._run_training_loop(
+                job_id, num_rounds=2, learning_rate=0.01, min_devices=1, job_config=config,
+            )
+
+        assert [overlapped for overlapped, _ in evaluations] == [True, True]
+        # Round 1 was evaluated on its own snapshot, not on round 2's model
+        assert not np.array_equal(evaluations[0][1], evaluations[1][1])
+        db_session.expire_all()
+        job = await repo.get(uuid.UUID(job_id))
+        assert job.status == "completed"
+        assert [m["round"] for m in job.round_metrics["rounds"]] == [1, 2]
+        # Version 1 was published before its evaluation finished
+        records = await coordinator.model_store.versions(job_id)
+        assert [(r.version, r.accuracy) for r in records if r.version > 0] == [(1, 0.9), (2, 0.9)]
+
+    async def test_skipped_round_is_recorded_after_pending_round(
+        self, coordinator, fake_redis, db_session, db_engine,
+    ):
+        job_id = str(uuid.uuid4())
+        config = {"pipeline": {"enabled": True}}
+        repo = TrainingJobRepository(db_session)
+        await repo.create(
+            id=uuid.UUID(job_id), num_rounds=2, min_devices=1, learning_rate=0.01, config=config,
+        )
+        await save_model(fake_redis, job_id, create_updatable_mlmodel())
+
+        from orchestrator.db.repositories import DeviceRepository
+        device = await DeviceRepository(db_session).create(
+            name="d0", device_model="iPhone15", os_version="17.0", status="online",
+        )
+
+        delta = serialize_weight_deltas({"output_bias": np.ones(10, dtype=np.float32)})
+
+        async def mock_wait(key, expected, timeout=60, accumulator=None):
+            if key.endswith(":2"):
+                return []  # round 2 exhausts its retries
+            accumulator.add(delta, 10)
+            return [{"device_id": str(device.id), "num_samples": 10}]
+
+        def evaluate(weights, architecture):
+            # Round 1 is still being evaluated while round 2 is skipped
+            time.sleep(0.3)
+            return 0.5, 0.9
+
+        sessions = async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+        with (
+            patch.object(coordinator, "_wait_for_gradients", side_effect=mock_wait),
+            patch("orchestrator.services.training_coordinator.async_session", new=sessions),
+            patch(
+                "orchestrator.services.training_coordinator.ServerEvaluator.get_instance",
+                return_value=SimpleNamespace(evaluate=evaluate),
+            ),
+        ):
+            await coordinator._run_training_loop(
+                job_id, num_rounds=2, learning_rate=0.01, min_devices=1, job_config=config,
+            )
+
+        db_session.expire_all()
+        job = await repo.get(uuid.UUID(job_id))
+        assert job.status == "completed"
+        rounds = job.round_metrics["rounds"]
+        assert [m["round"] for m in rounds] == [1, 2]
+        assert rounds[0]["avg_accuracy"] == 0.9
+        assert rounds[1]["skipped"]
+
+
+class TestCompletionTimes:
+    async def test_records_dispatch_to_submission_time(self, coordinator, fake_redis):
+        from orchestrator.services.completion_time import CompletionTimeTracker
+
+        device = SimpleNamespace(id=uuid.uuid4(), device_model="iPhone15,2", chip="A15 Bionic")
+        straggler = SimpleNamespace(id=uuid.uuid4(), device_model="iPhone15,2", chip="A15 Bionic")
+        key = "gradients:m:1"
+        dispatched_at = await coordinator._redis_clock() - 2.0
+        await push_gradient_entry(fake_redis, key, b"entry", str(device.id))
+
+        metrics = [{"device_id": str(device.id), "num_samples": 1}]
+        timing = CompletionTimeTracker(fake_redis, "mnist")
+        await coordinator._record_completion_times(
+            timing, key, [device, straggler], dispatched_at, metrics
+        )
+
+        assert 1.5 < metrics[0]["completion_seconds"] < 5.0
+        predictions = await timing.predict([device, straggler])
+        assert 1.5 < predictions[str(device.id)] < 5.0
+        # Never reported: at least as long as it was waited for
+        assert predictions[str(straggler.id)] >= 2.0
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Microbenchmark: per-round CoreML weight extraction/injection cost.
+
+Measures what the coordinator pays every round on the global .mlmodel for a
+registered architecture (CIFAR-10 by default):
+
+  parse     -- Model.ParseFromString of the full spec
+  serialize -- Model.SerializeToString of the full spec
+  extract   -- extract_weights (parse + read every innerProduct layer)
+  inject    -- inject_weights with the packed-bytes writer
+  inject_legacy -- the previous writer: `.flatten().tolist()` + `extend()`
+
+Usage:
+    uv run python scripts/bench_coreml_weights.py [--arch cifar10] [--repeat 10]
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+from coremltools.proto import Model_pb2
+from orchestrator.services.coreml_model import (
+    _get_nn,
+    create_updatable_mlmodel_for_architecture,
+    extract_weights,
+    inject_weights,
+)
+from orchestrator.services.model_registry import get_architecture
+
+
+def _inject_legacy(mlmodel_bytes: bytes, weights: dict[str, np.ndarray]) -> bytes:
+    spec = Model_pb2.Model()
+    spec.ParseFromString(mlmodel_bytes)
+    for layer in _get_nn(spec).layers:
+        if layer.HasField("innerProduct"):
+            ip = layer.innerProduct
+            for key, params in (
+                (f"{layer.name}_weight", ip.weights),
+                (f"{layer.name}_bias", ip.bias),
+            ):
+                if key in weights:
+                    del params.floatValue[:]
+                    params.floatValue.extend(weights[key].astype(np.float32).flatten().tolist())
+    return spec.SerializeToString()
+
+
+def _time(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--arch", default="cifar10")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    model_bytes = create_updatable_mlmodel_for_architecture(get_architecture(args.arch))
+    weights = extract_weights(model_bytes)
+    spec = Model_pb2.Model()
+    spec.ParseFromString(model_bytes)
+
+    results = {
+        "parse": _time(lambda: Model_pb2.Model().ParseFromString(model_bytes), args.repeat),
+        "serialize": _time(spec.SerializeToString, args.repeat),
+        "extract": _time(lambda: extract_weights(model_bytes), args.repeat),
+        "inject": _time(lambda: inject_weights(model_bytes, weights), args.repeat),
+        "inject_legacy": _time(lambda: _inject_legacy(model_bytes, weights), args.repeat),
+    }
+
+    params = sum(w.size for w in weights.values())
+    print(f"{args.arch}: {params:,d} params, {len(model_bytes) / 1e6:.1f} MB model")
+    for name, seconds in results.items():
+        print(f"  {name:14s} {seconds * 1e3:8.2f} ms")
+    print(f"  inject speedup {results['inject_legacy'] / results['inject']:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
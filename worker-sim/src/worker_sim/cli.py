@@ -17,6 +17,12 @@ def start(
     profile: str = typer.Option("iphone15pro", "-p", "--profile", help="Device profile name"),
     count: int = typer.Option(1, "-n", "--count", help="Number of simulated devices"),
     interval: float = typer.Option(5.0, "-i", "--interval", help="Heartbeat interval (seconds)"),
+    topk: float = typer.Option(
+        0.0, "--topk", help="Send top-k sparsified gradients keeping this fraction (0 = dense)",
+    ),
+    quantize_bits: int = typer.Option(
+        0, "--quantize-bits", help="Send gradients quantized to 8 or 4 bits (0 = float32)",
+    ),
     verbose: bool = typer.Option(False, "-v", "--verbose", help="Debug logging"),
 ):
     """Start simulated device workers."""
@@ -24,6 +30,9 @@ def start(
         console.print(f"[red]Unknown profile:[/red] {profile}")
         console.print(f"Available: {', '.join(PROFILES.keys())}")
         raise typer.Exit(code=1)
+    if quantize_bits not in (0, 8, 4):
+        console.print(f"[red]Unsupported --quantize-bits:[/red] {quantize_bits} (use 8 or 4)")
+        raise typer.Exit(code=1)
 
     logging.basicConfig(
         level=logging.DEBUG if verbose else logging.INFO,
@@ -37,9 +46,13 @@ def start(
     console.print(f"  Profile:   {profile} ({p.chip}, {p.memory_bytes // (1024**3)}GB)")
     console.print(f"  Workers:   {count}")
     console.print(f"  Interval:  {interval}s")
+    if topk:
+        console.print(f"  Top-k:     {topk:.2%}")
+    if quantize_bits:
+        console.print(f"  Quantize:  {quantize_bits}-bit")
     console.print()
 
-    run_workers(target, profile, count, interval)
+    run_workers(target, profile, count, interval, topk or None, quantize_bits or None)
 
 
 @app.command("profiles")
@@ -15,11 +15,15 @@ class WorkerManager:
         profile_name: str,
         count: int,
         heartbeat_interval: float,
+        topk_ratio: float | None = None,
+        quantize_bits: int | None = None,
     ) -> None:
         self.target = target
         self.profile_name = profile_name
         self.count = count
         self.heartbeat_interval = heartbeat_interval
+        self.topk_ratio = topk_ratio
+        self.quantize_bits = quantize_bits
         self.workers: list[SimulatedWorker] = []
         self._shutdown_event = asyncio.Event()
 
@@ -35,6 +39,8 @@ class WorkerManager:
                 target=self.target,
                 profile=profile,
                 heartbeat_interval=self.heartbeat_interval,
+                topk_ratio=self.topk_ratio,
+                quantize_bits=self.quantize_bits,
             )
             self.workers.append(worker)
 
@@ -64,6 +70,10 @@ def run_workers(
     profile_name: str,
     count: int,
     heartbeat_interval: float,
+    topk_ratio: float | None = None,
+    quantize_bits: int | None = None,
 ) -> None:
-    manager = WorkerManager(target, profile_name, count, heartbeat_interval)
+    manager = WorkerManager(
+        target, profile_name, count, heartbeat_interval, topk_ratio, quantize_bits
+    )
     asyncio.run(manager.run())
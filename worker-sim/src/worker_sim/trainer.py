@@ -3,6 +3,11 @@ import random
 import struct
 
 import numpy as np
+from orchestrator.services.gradient_codec import (
+    compress_gradients_quantized,
+    compress_gradients_topk,
+    iter_topk,
+)
 
 # Layer shapes matching the CoreML MNIST model (784→128→10)
 LAYER_SHAPES = {
@@ -31,15 +36,62 @@ def serialize_weight_deltas(deltas: dict[str, np.ndarray]) -> bytes:
     return b"".join(parts)
 
 
+class ErrorFeedbackCompressor:
+    """Top-k gradient compression with an error-feedback residual.
+
+    Reference client for gradient codec 0x02. Each round the delta to send is
+    corrected by the residual (everything not transmitted so far), the top-k
+    entries of the corrected delta are sent, and whatever was dropped --
+    including float16 rounding of the sent values -- becomes the new
+    residual. Nothing is lost, only delayed, which is what keeps top-k
+    training converging at high sparsity.
+    """
+
+    def __init__(self, ratio: float = 0.01) -> None:
+        self.ratio = ratio
+        self.residual: dict[str, np.ndarray] = {}
+
+    def compress(self, deltas: dict[str, np.ndarray]) -> bytes:
+        corrected = {
+            name: values.astype(np.float32).ravel() + self.residual.get(name, 0.0)
+            for name, values in deltas.items()
+        }
+        payload = compress_gradients_topk(serialize_weight_deltas(corrected), self.ratio)
+
+        # The residual is exactly what the server will not see
+        for name, _, indices, values in iter_topk(payload):
+            residual = corrected[name]
+            residual[indices] -= values.astype(np.float32)
+            self.residual[name] = residual
+        return payload
+
+
+class QuantizingCompressor:
+    """Send deltas as int8 / 4-bit codes (gradient codec 0x03).
+
+    Stochastic rounding already makes each round's update unbiased, so no
+    residual is carried between rounds.
+    """
+
+    def __init__(self, bits: int = 8) -> None:
+        self.bits = bits
+        self._rng = np.random.default_rng()
+
+    def compress(self, deltas: dict[str, np.ndarray]) -> bytes:
+        return compress_gradients_quantized(serialize_weight_deltas(deltas), self.bits, self._rng)
+
+
 async def simulate_local_training(
     model_weights: bytes,
     num_epochs: int = 1,
     num_samples: int = 100,
+    compressor: ErrorFeedbackCompressor | QuantizingCompressor | None = None,
 ) -> tuple[bytes, int, dict]:
     """Simulate local training and return (gradients, num_samples, metrics).
 
     Now produces weight deltas in the new binary dict format compatible
-    with the real CoreML trainer and the updated FedAvg aggregation.
+    with the real CoreML trainer and the updated FedAvg aggregation. With a
+    `compressor`, the deltas are sent as a top-k or quantized payload.
     """
     # Simulate training time (1-3 seconds)
     await asyncio.sleep(random.uniform(1.0, 3.0))
@@ -49,7 +101,10 @@ async def simulate_local_training(
     for name, shape in LAYER_SHAPES.items():
         deltas[name] = (np.random.randn(*shape) * 0.01).astype(np.float32)
 
-    gradient_bytes = serialize_weight_deltas(deltas)
+    if compressor is not None:
+        gradient_bytes = compressor.compress(deltas)
+    else:
+        gradient_bytes = serialize_weight_deltas(deltas)
 
     # Compute a rough "norm" of model weights for simulated convergence metrics
     # The model is now a CoreML protobuf, so we just use round count proxy
@@ -1,18 +1,29 @@
 import asyncio
 import logging
+import time
 
 import grpc
 
 from orchestrator.generated import common_pb2, device_pb2, device_pb2_grpc
 from orchestrator.generated import heartbeat_pb2, heartbeat_pb2_grpc
 from orchestrator.generated import model_pb2, model_pb2_grpc
+from orchestrator.services.model_delta import apply_weight_payload
 
 from worker_sim.device_profile import DeviceProfile
 from worker_sim.metrics import MetricsSimulator
-from worker_sim.trainer import simulate_local_training
+from worker_sim.trainer import (
+    ErrorFeedbackCompressor,
+    QuantizingCompressor,
+    simulate_local_training,
+)
 
 logger = logging.getLogger(__name__)
 
+# Payloads above this go through SubmitGradientsStream (gRPC's default
+# message limit is 4MB)
+STREAM_UPLOAD_THRESHOLD = 1024 * 1024
+UPLOAD_CHUNK_SIZE = 256 * 1024
+
 
 class SimulatedWorker:
     def __init__(
@@ -20,6 +31,8 @@ class SimulatedWorker:
         target: str,
         profile: DeviceProfile,
         heartbeat_interval: float = 1.0,
+        topk_ratio: float | None = None,
+        quantize_bits: int | None = None,
     ) -> None:
         self.target = target
         self.profile = profile
@@ -31,6 +44,14 @@ class SimulatedWorker:
         self._heartbeat_task: asyncio.Task | None = None
         self._channel: grpc.aio.Channel | None = None
         self._sequence = 0
+        # Last downloaded model per model_id: (digest, .mlmodel bytes)
+        self._models: dict[str, tuple[str, bytes]] = {}
+        # Top-k gradients carry an error-feedback residual across rounds
+        self._compressor: ErrorFeedbackCompressor | QuantizingCompressor | None = None
+        if topk_ratio:
+            self._compressor = ErrorFeedbackCompressor(topk_ratio)
+        elif quantize_bits:
+            self._compressor = QuantizingCompressor(quantize_bits)
 
     async def start(self) -> None:
         self._channel = grpc.aio.insecure_channel(self.target)
@@ -167,29 +188,50 @@ class SimulatedWorker:
             logger.info(f"[{self.profile.name}] Shutdown command received")
             self.running = False
 
-    async def _run_training_round(self, job_id: str, model_id: str, round_num: str) -> None:
-        try:
-            # Download global model
-            stub = model_pb2_grpc.ModelServiceStub(self._channel)
-            model_bytes = b""
-            async for chunk in stub.DownloadModel(
-                model_pb2.DownloadModelRequest(
-                    model_id=model_id,
-                    device_id=common_pb2.DeviceId(value=self.device_id),
-                )
-            ):
-                if chunk.HasField("chunk"):
-                    model_bytes += chunk.chunk
+    async def _download_model(self, stub, model_id: str) -> bytes:
+        """Download the global model, as a weight diff when a previous version is cached."""
+        current_digest, current_model = self._models.get(model_id, ("", b""))
+        metadata = None
+        chunks: list[bytes] = []
+        async for chunk in stub.DownloadModel(
+            model_pb2.DownloadModelRequest(
+                model_id=model_id,
+                device_id=common_pb2.DeviceId(value=self.device_id),
+                current_version=current_digest,
+            )
+        ):
+            if chunk.HasField("metadata"):
+                metadata = chunk.metadata
+            elif chunk.HasField("chunk"):
+                chunks.append(chunk.chunk)
+        payload = b"".join(chunks)
 
-            logger.info(
-                f"[{self.profile.name}] Model downloaded ({len(model_bytes)} bytes)"
+        payload_format = metadata.payload_format if metadata else 0
+        if payload_format == model_pb2.MODEL_PAYLOAD_FORMAT_UNSPECIFIED:
+            model_bytes = payload
+        else:
+            lr = metadata.hyperparameters.get("learning_rate")
+            model_bytes = apply_weight_payload(
+                current_model, payload,
+                diff=payload_format == model_pb2.MODEL_PAYLOAD_FORMAT_WEIGHT_DIFF,
+                learning_rate=float(lr) if lr else None,
             )
 
-            # Simulate local training
-            gradient_bytes, num_samples, metrics = await simulate_local_training(model_bytes)
+        if metadata and metadata.digest:
+            self._models[model_id] = (metadata.digest, model_bytes)
+        logger.info(
+            f"[{self.profile.name}] Model downloaded "
+            f"({len(payload)} bytes, format={payload_format})"
+        )
+        return model_bytes
 
-            # Submit gradients
-            response = await stub.SubmitGradients(
+    async def _submit_gradients(
+        self, stub, model_id: str, round_num: str, gradient_bytes: bytes,
+        num_samples: int, metrics: dict,
+    ):
+        """Unary SubmitGradients, or the chunked stream for large payloads."""
+        if len(gradient_bytes) <= STREAM_UPLOAD_THRESHOLD:
+            return await stub.SubmitGradients(
                 model_pb2.SubmitGradientsRequest(
                     device_id=common_pb2.DeviceId(value=self.device_id),
                     model_id=model_id,
@@ -200,6 +242,44 @@ class SimulatedWorker:
                 )
             )
 
+        def chunks():
+            yield model_pb2.GradientChunk(
+                header=model_pb2.GradientUploadHeader(
+                    device_id=common_pb2.DeviceId(value=self.device_id),
+                    model_id=model_id,
+                    training_round=round_num,
+                    num_samples=num_samples,
+                    metrics={k: v for k, v in metrics.items()},
+                    total_size=len(gradient_bytes),
+                )
+            )
+            view = memoryview(gradient_bytes)
+            for i in range(0, len(view), UPLOAD_CHUNK_SIZE):
+                yield model_pb2.GradientChunk(chunk=bytes(view[i : i + UPLOAD_CHUNK_SIZE]))
+
+        return await stub.SubmitGradientsStream(chunks())
+
+    async def _run_training_round(self, job_id: str, model_id: str, round_num: str) -> None:
+        try:
+            # Download global model
+            stub = model_pb2_grpc.ModelServiceStub(self._channel)
+            started = time.perf_counter()
+            model_bytes = await self._download_model(stub, model_id)
+            downloaded = time.perf_counter()
+
+            # Simulate local training
+            gradient_bytes, num_samples, metrics = await simulate_local_training(
+                model_bytes, compressor=self._compressor,
+            )
+            # Phase timings feed the server's completion-time predictions
+            metrics["download_seconds"] = round(downloaded - started, 3)
+            metrics["train_seconds"] = round(time.perf_counter() - downloaded, 3)
+
+            # Submit gradients
+            response = await self._submit_gradients(
+                stub, model_id, round_num, gradient_bytes, num_samples, metrics,
+            )
+
             self.metrics_sim.stop_training()
             logger.info(
                 f"[{self.profile.name}] Round {round_num} done - "